@@ -7,6 +7,8 @@ from flask import (
     Flask,
     abort,
     flash,
+    jsonify,
+    make_response,
     redirect,
     render_template,
     request,
@@ -19,16 +21,15 @@ from sqlalchemy.exc import SQLAlchemyError
 from wtforms import PasswordField, StringField, SubmitField
 from wtforms.validators import DataRequired
 
+import base_datos
+import cache_sesiones
 import config
 import db_manager
 import gestor_almacenamiento
 import gestor_tareas
+import indice_catalogos
 import session_manager
 import utils
-from catalogos.abogados import ABOGADOS
-from catalogos.dependencias import DEPENDENCIAS_POR_LOCALIDAD
-from catalogos.localidades import LOCALIDADES
-from catalogos.tipos_juicio import TIPOS_JUICIO
 from tasks import (
     fase_1_lista_task,
     fase_2_movimientos_task,
@@ -44,6 +45,20 @@ app.secret_key = os.environ.get(
     "FLASK_SECRET_KEY", "desarrollo-secreto-cambiar-en-prod-MUY-SECRETO"
 )
 
+app.jinja_env.globals["version_catalogos"] = indice_catalogos.VERSION
+
+
+@app.cli.command("init-db")
+def init_db():
+    """Crea las tablas faltantes y aplica las migraciones pendientes."""
+    if not base_datos.inicializar_esquema():
+        raise SystemExit(1)
+
+
+@app.teardown_appcontext
+def liberar_sesion_base_datos(_excepcion=None):
+    base_datos.Sesion.remove()
+
 
 class LoginForm(FlaskForm):
     """Formulario de autenticación del sistema."""
@@ -77,7 +92,7 @@ def login():
         password = form.password.data
 
         app.logger.info("Intento de login para usuario: %s", username)
-        cookies_dict = session_manager.autenticar_en_siped(username, password)
+        cookies_dict = session_manager.obtener_cookies_sesion(username, password)
 
         if cookies_dict:
             session["siped_cookies"] = cookies_dict
@@ -96,6 +111,7 @@ def login():
 @login_required
 def logout():
     username = session.get("username")
+    cache_sesiones.invalidar(username)
     session.pop("siped_cookies", None)
     session.pop("username", None)
     app.logger.info("Sesión cerrada para usuario: %s", username)
@@ -135,11 +151,6 @@ def indice():
     ruta_publico_csv = os.path.join(ruta_usuario, "expedientes_publicos.csv")
     existe_publico_csv = os.path.exists(ruta_publico_csv)
 
-    ruta_csv = os.path.join(ruta_usuario, config.LISTA_EXPEDIENTES_CSV)
-    expedientes_disponibles = utils.leer_csv_a_diccionario(ruta_csv)
-    if not expedientes_disponibles:
-        expedientes_disponibles = []
-
     estados_tareas = {
         "fase_1": gestor_tareas.obtener_estado_tarea(
             gestor_tareas.obtener_id_tarea("fase_1"), "fase_1"
@@ -175,14 +186,119 @@ def indice():
         lista_movimientos=lista_movimientos,
         estados_tareas=estados_tareas,
         username=session.get("username"),
-        expedientes_disponibles=expedientes_disponibles,
-        localidades=LOCALIDADES,
-        tipos_juicio=TIPOS_JUICIO,
-        abogados=ABOGADOS,
-        dependencias=DEPENDENCIAS_POR_LOCALIDAD,
     )
 
 
+@app.route("/fragmento/expedientes")
+@login_required
+def fragmento_expedientes():
+    texto = request.args.get("q", "")
+    despues_id = request.args.get("despues_id", type=int)
+    despues = None
+    if "despues" in request.args and despues_id is not None:
+        despues = (request.args["despues"], despues_id)
+    try:
+        expedientes, hay_mas = db_manager.buscar_expedientes(
+            session.get("username"),
+            texto,
+            despues=despues,
+            por_pagina=config.EXPEDIENTES_POR_PAGINA,
+        )
+    except SQLAlchemyError:
+        return '<div class="list-group-item text-muted small">Base de datos ocupada. Reintente en unos segundos.</div>'
+
+    return render_template(
+        "_fragmento_expedientes.html",
+        expedientes=expedientes,
+        hay_mas=hay_mas,
+        texto=texto,
+        primera_pagina=despues is None,
+    )
+
+
+def _respuesta_catalogo(nombre, formato, generar):
+    """
+    Responde un catálogo con ETag fuerte y caché privada del navegador.
+
+    Si la copia del navegador sigue vigente se devuelve 304 sin generar el cuerpo.
+    Las URLs de la interfaz incluyen la versión de los catálogos y de su
+    presentación, de modo que un despliegue con catálogos o plantillas nuevos no
+    espera a que venza el max-age.
+    """
+    variantes = [f"{clave}={valor}" for clave, valor in sorted(request.args.items())]
+    etiqueta = indice_catalogos.etag(nombre, formato, *variantes)
+    if request.if_none_match.contains(etiqueta):
+        respuesta = app.response_class(status=304)
+    else:
+        respuesta = make_response(generar())
+    respuesta.set_etag(etiqueta)
+    # Privada: el catálogo de abogados incluye DNIs y solo se sirve con sesión.
+    respuesta.cache_control.private = True
+    respuesta.cache_control.max_age = config.CATALOGOS_CACHE_SEGUNDOS
+    return respuesta
+
+
+@app.route("/catalogos/dependencias")
+@login_required
+def catalogo_dependencias():
+    dependencias = indice_catalogos.CATALOGOS["dependencias"].get(
+        request.args.get("id_localidad"), {}
+    )
+    return _respuesta_catalogo(
+        "dependencias",
+        "html",
+        lambda: render_template(
+            "_fragmento_opciones.html",
+            opciones=dependencias.items(),
+            vacio="Seleccione una dependencia...",
+        ),
+    )
+
+
+def _opciones_abogados():
+    texto = request.args.get("q", "")
+    if not texto.strip():
+        return [], "Escriba para buscar un abogado..."
+    opciones = indice_catalogos.buscar_abogados(texto)
+    return opciones, "Seleccione un abogado..." if opciones else "Sin coincidencias"
+
+
+@app.route("/catalogos/<nombre>")
+@login_required
+def catalogo_opciones(nombre):
+    catalogo = indice_catalogos.CATALOGOS.get(nombre)
+    if catalogo is None or nombre == "dependencias":
+        abort(404)
+
+    def generar():
+        opciones, vacio = catalogo.items(), ""
+        if nombre == "abogados" and "q" in request.args:
+            opciones, vacio = _opciones_abogados()
+        return render_template(
+            "_fragmento_opciones.html",
+            opciones=opciones,
+            vacio=vacio,
+            seleccionado=request.args.get("seleccionado", ""),
+        )
+
+    return _respuesta_catalogo(nombre, "html", generar)
+
+
+@app.route("/catalogos/<nombre>.json")
+@login_required
+def catalogo_json(nombre):
+    catalogo = indice_catalogos.CATALOGOS.get(nombre)
+    if catalogo is None:
+        abort(404)
+
+    def generar():
+        if nombre == "abogados" and "q" in request.args:
+            return jsonify(dict(_opciones_abogados()[0]))
+        return jsonify(catalogo)
+
+    return _respuesta_catalogo(nombre, "json", generar)
+
+
 @app.route("/iniciar/<nombre_fase>", methods=["POST"])
 @login_required
 def iniciar_fase(nombre_fase):
@@ -265,9 +381,8 @@ def descargar_por_expediente(nro_expediente):
     ruta_usuario = utils.obtener_ruta_usuario(usuario)
 
     try:
-        expedientes = db_manager.obtener_expedientes(usuario, origen="PRIVADO")
-        expediente_data = next(
-            (e for e in expedientes if e["expediente"] == nro_expediente), None
+        expediente_data = db_manager.obtener_expediente_por_numero(
+            usuario, nro_expediente, origen="PRIVADO"
         )
     except SQLAlchemyError:
         expediente_data = None
@@ -329,7 +444,8 @@ def iniciar_busqueda_avanzada():
     tarea = fase_busqueda_avanzada_task.delay(
         cookies=session["siped_cookies"],
         username=session["username"],
-        filtros=request.form.to_dict(),
+        # "q" es el texto del buscador de abogados; SIPED recibe solo el id elegido.
+        filtros={k: v for k, v in request.form.items() if k != "q"},
     )
     gestor_tareas.registrar_tarea_iniciada(nombre_fase, tarea)
 
@@ -453,8 +569,9 @@ def descargar_archivo(tipo, nombre_archivo):
 def debug_expediente(nro_expediente):
     usuario = session.get("username")
     try:
-        expedientes = db_manager.obtener_expedientes(usuario, origen="PRIVADO")
-        exp = next((e for e in expedientes if e["expediente"] == nro_expediente), None)
+        exp = db_manager.obtener_expediente_por_numero(
+            usuario, nro_expediente, origen="PRIVADO"
+        )
 
         if not exp:
             return f"Expediente '{nro_expediente}' no encontrado en la base de datos para el usuario '{usuario}'."
@@ -481,5 +598,6 @@ def debug_expediente(nro_expediente):
 
 
 if __name__ == "__main__":
+    base_datos.inicializar_esquema()
     app.run(debug=True, host="0.0.0.0", port=5000)
 
@@ -0,0 +1,159 @@
+"""Módulo de acceso a la base de datos con SQLAlchemy, independiente de Flask."""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import sqlalchemy.exc
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import DeclarativeBase, Session, scoped_session, sessionmaker
+
+import config
+import migraciones
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+_URI_POR_DEFECTO = "sqlite:////app/datos_usuarios/siped.db"
+
+
+class Base(DeclarativeBase):
+    """Base declarativa de los modelos del sistema."""
+
+
+# Una sesión por hilo: los workers de gunicorn y los hilos del motor asíncrono no
+# comparten estado de ORM. Flask la libera al cerrar cada petición.
+Sesion = scoped_session(sessionmaker(expire_on_commit=False))
+
+_engine: Optional[Engine] = None
+
+# Profundidad de bloques sesion() anidados en cada hilo.
+_anidamiento = threading.local()
+
+
+def opciones_motor(uri: str) -> Dict[str, Any]:
+    """
+    Devuelve las opciones de create_engine adecuadas al motor de la URI.
+
+    SQLite solo admite la espera por bloqueo; para PostgreSQL se configura el pool
+    compartido por los hilos de cada proceso, verificando las conexiones antes de
+    usarlas para sobrevivir a reinicios del servidor.
+
+    Args:
+        uri: URI de conexión de SQLAlchemy.
+
+    Returns:
+        Diccionario de opciones para create_engine.
+    """
+    if make_url(uri).get_backend_name() == "sqlite":
+        return {"connect_args": {"timeout": config.SQLITE_ESPERA_BLOQUEO_MS / 1000}}
+    return {
+        "pool_size": config.DB_POOL_TAMANO,
+        "max_overflow": config.DB_POOL_DESBORDE,
+        "pool_timeout": config.DB_POOL_ESPERA,
+        "pool_recycle": config.DB_POOL_RECICLAR,
+        "pool_pre_ping": True,
+    }
+
+
+def _configurar_conexion_sqlite(conexion_dbapi: Any, _registro: Any) -> None:
+    """
+    Ajusta cada conexión nueva a SQLite para el acceso simultáneo de web y worker.
+
+    Con WAL las lecturas de la interfaz no esperan a las escrituras de las fases y
+    synchronous=NORMAL evita un fsync por transacción sin arriesgar la integridad.
+    busy_timeout hace que un segundo escritor espere en lugar de fallar.
+    """
+    cursor = conexion_dbapi.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(config.SQLITE_ESPERA_BLOQUEO_MS)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(config.SQLITE_CACHE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(config.SQLITE_MMAP_MB) * 1024 * 1024}")
+    finally:
+        cursor.close()
+
+
+def configurar(uri: Optional[str] = None, **opciones: Any) -> Engine:
+    """
+    Crea el motor de la base de datos y asocia a él las sesiones del proceso.
+
+    Se invoca de forma perezosa en el primer acceso; llamarla explícitamente
+    permite apuntar a otra base (tests, simulador, migraciones).
+
+    Args:
+        uri: URI de conexión. Por defecto, `SQLALCHEMY_DATABASE_URI` del entorno.
+        **opciones: Opciones adicionales de create_engine, que prevalecen sobre
+            las de opciones_motor.
+
+    Returns:
+        El motor creado.
+    """
+    global _engine
+    uri = uri or os.environ.get("SQLALCHEMY_DATABASE_URI", _URI_POR_DEFECTO)
+    engine = create_engine(uri, **{**opciones_motor(uri), **opciones})
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _configurar_conexion_sqlite)
+
+    Sesion.remove()
+    Sesion.configure(bind=engine)
+    if _engine is not None:
+        _engine.dispose()
+    _engine = engine
+    return engine
+
+
+def obtener_engine() -> Engine:
+    """Devuelve el motor del proceso, creándolo si todavía no existe."""
+    if _engine is None:
+        configurar()
+    return _engine
+
+
+@contextmanager
+def sesion() -> Iterator[Session]:
+    """
+    Entrega la sesión del hilo actual y la libera al terminar.
+
+    Los bloques anidados comparten la sesión y solo el más externo la libera, de
+    modo que una función de db_manager invocada dentro de otro bloque no cierra
+    la sesión ni desvincula los objetos de quien la llamó. Si el bloque lanza una
+    excepción se revierten los cambios pendientes.
+    """
+    obtener_engine()
+    s = Sesion()
+    _anidamiento.nivel = getattr(_anidamiento, "nivel", 0) + 1
+    try:
+        yield s
+    except Exception:
+        s.rollback()
+        raise
+    finally:
+        _anidamiento.nivel -= 1
+        if _anidamiento.nivel == 0:
+            Sesion.remove()
+
+
+def inicializar_esquema() -> bool:
+    """
+    Crea las tablas faltantes y aplica las migraciones pendientes.
+
+    Se ejecuta una vez al arrancar la web, el worker o un script, nunca al
+    importar módulos.
+
+    Returns:
+        True si el esquema quedó al día, False si la base no está accesible.
+    """
+    import models  # Se importa para registrar las tablas en Base.metadata.
+
+    engine = obtener_engine()
+    try:
+        Base.metadata.create_all(engine)
+        migraciones.aplicar_migraciones(engine)
+    except sqlalchemy.exc.OperationalError as e:
+        logger.warning("No se pudo inicializar el esquema de la base de datos: %s", e)
+        return False
+    return True
@@ -0,0 +1,273 @@
+"""Módulo de caché HTTP persistente en SQLite para las páginas estables de SIPED."""
+
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import requests
+
+import config
+import parsers
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS respuestas (
+    clave TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    texto TEXT NOT NULL,
+    etag TEXT,
+    ultima_modificacion TEXT,
+    guardado REAL NOT NULL,
+    inmutable INTEGER NOT NULL DEFAULT 0,
+    vence REAL
+)
+"""
+
+# Cada cuántas escrituras se poda la caché, además de al abrirla por primera vez.
+_ESCRITURAS_ENTRE_PODAS = 200
+
+_esquema_creado = set()
+_escrituras = 0
+
+
+@contextmanager
+def _conectar() -> Iterator[sqlite3.Connection]:
+    ruta = config.CACHE_HTTP_RUTA
+    if ruta not in _esquema_creado:
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    conexion = sqlite3.connect(ruta, timeout=10)
+    conexion.row_factory = sqlite3.Row
+    try:
+        if ruta not in _esquema_creado:
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute(_ESQUEMA)
+            columnas = {
+                fila["name"] for fila in conexion.execute("PRAGMA table_info(respuestas)")
+            }
+            if "vence" not in columnas:
+                conexion.execute("ALTER TABLE respuestas ADD COLUMN vence REAL")
+            _podar(conexion)
+            _esquema_creado.add(ruta)
+        yield conexion
+        conexion.commit()
+    finally:
+        conexion.close()
+
+
+def _podar(conexion: sqlite3.Connection) -> None:
+    """
+    Elimina las entradas sin renovar dentro de la retención y, si la caché supera
+    su tamaño máximo, las menos recientes hasta volver al límite.
+
+    Los escritos inmutables no vencen por retención pero sí cuentan para el tamaño.
+    """
+    limite = time.time() - config.CACHE_HTTP_RETENCION_DIAS * 86400
+    conexion.execute(
+        "DELETE FROM respuestas WHERE inmutable = 0 AND guardado < ?", (limite,)
+    )
+    maximo = config.CACHE_HTTP_MAX_MB * 1024 * 1024
+    total = conexion.execute(
+        "SELECT COALESCE(SUM(LENGTH(texto)), 0) FROM respuestas"
+    ).fetchone()[0]
+    if total <= maximo:
+        return
+    eliminar = []
+    for fila in conexion.execute(
+        "SELECT clave, LENGTH(texto) FROM respuestas ORDER BY guardado"
+    ).fetchall():
+        if total <= maximo:
+            break
+        eliminar.append((fila[0],))
+        total -= fila[1]
+    conexion.executemany("DELETE FROM respuestas WHERE clave = ?", eliminar)
+    logger.info(
+        "Caché HTTP podada: %d entradas eliminadas por tamaño.", len(eliminar)
+    )
+
+
+def _clave_cache(
+    session: requests.Session, url: str, params: Optional[Dict[str, Any]]
+) -> Optional[Tuple[str, str]]:
+    """
+    Combina el usuario de la sesión y la URL normalizada en la clave de la entrada.
+
+    Devuelve None si la sesión no identifica a un usuario: sin él, las páginas
+    privadas de distintas identidades compartirían las mismas entradas.
+    """
+    usuario = getattr(session, "usuario", None)
+    if not usuario:
+        return None
+    if params:
+        params = sorted(params.items())
+    url_completa = requests.Request("GET", url, params=params).prepare().url
+    clave = hashlib.sha256(f"{usuario}\n{url_completa}".encode("utf-8")).hexdigest()
+    return clave, url_completa
+
+
+def _vigencia(respuesta: requests.Response) -> Optional[float]:
+    """
+    Calcula los segundos de vigencia que el servidor concede a la respuesta.
+
+    Returns:
+        None si la respuesta no debe almacenarse (no-store o private); si no,
+        max-age, lo que falte para Expires o, sin indicaciones, `CACHE_HTTP_TTL`.
+    """
+    directivas = {}
+    for parte in respuesta.headers.get("Cache-Control", "").split(","):
+        nombre, _, valor = parte.strip().lower().partition("=")
+        if nombre:
+            directivas[nombre] = valor.strip('"')
+
+    if "no-store" in directivas:
+        return None
+    if "no-cache" in directivas:
+        return 0
+    if directivas.get("max-age", "").isdigit():
+        return float(directivas["max-age"])
+    if respuesta.headers.get("Expires"):
+        try:
+            vence = parsedate_to_datetime(respuesta.headers["Expires"]).timestamp()
+        except (TypeError, ValueError):
+            return 0
+        return max(0.0, vence - time.time())
+    return float(config.CACHE_HTTP_TTL)
+
+
+def _leer(clave: str) -> Optional[sqlite3.Row]:
+    try:
+        with _conectar() as conexion:
+            return conexion.execute(
+                "SELECT * FROM respuestas WHERE clave = ?", (clave,)
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning("No se pudo leer la caché HTTP: %s", e)
+        return None
+
+
+def _ejecutar(sql: str, parametros: Tuple[Any, ...]) -> None:
+    try:
+        with _conectar() as conexion:
+            conexion.execute(sql, parametros)
+    except sqlite3.Error as e:
+        logger.warning("No se pudo escribir la caché HTTP: %s", e)
+
+
+def obtener_texto(
+    session: requests.Session,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: int = 30,
+) -> str:
+    """
+    Descarga una página GET sirviéndola desde la caché cuando es posible.
+
+    Las entradas inmutables o todavía vigentes se devuelven sin contactar a SIPED.
+    La vigencia la fijan Cache-Control (max-age, no-cache) o Expires y, si el
+    servidor no indica nada, `CACHE_HTTP_TTL`, que por defecto es 0: cada lectura
+    se revalida con If-None-Match/If-Modified-Since cuando hay ETag o
+    Last-Modified. Las respuestas no-store no se guardan, las entradas se separan
+    por usuario (sin usuario no se usa la caché) y nunca se guardan páginas de
+    login.
+
+    Args:
+        session: Sesión HTTP activa.
+        url: Dirección de la página.
+        params: Parámetros de la consulta.
+        timeout: Segundos máximos de espera de la petición.
+
+    Returns:
+        Contenido HTML de la página.
+
+    Raises:
+        requests.RequestException: Si la petición falla o responde con error.
+    """
+    clave_cache = _clave_cache(session, url, params)
+    if not config.CACHE_HTTP_HABILITADA or clave_cache is None:
+        respuesta = session.get(url, params=params, timeout=timeout)
+        respuesta.raise_for_status()
+        return respuesta.text
+
+    clave, url_completa = clave_cache
+    entrada = _leer(clave)
+
+    cabeceras = {}
+    if entrada is not None:
+        if entrada["inmutable"] or time.time() < (entrada["vence"] or 0):
+            return entrada["texto"]
+        if entrada["etag"]:
+            cabeceras["If-None-Match"] = entrada["etag"]
+        if entrada["ultima_modificacion"]:
+            cabeceras["If-Modified-Since"] = entrada["ultima_modificacion"]
+
+    respuesta = session.get(url, params=params, headers=cabeceras, timeout=timeout)
+    respuesta.raise_for_status()
+
+    vigencia = _vigencia(respuesta)
+    ahora = time.time()
+    if respuesta.status_code == 304 and entrada is not None:
+        _ejecutar(
+            "UPDATE respuestas SET guardado = ?, vence = ? WHERE clave = ?",
+            (ahora, ahora + (vigencia or 0), clave),
+        )
+        return entrada["texto"]
+
+    texto = respuesta.text
+    if vigencia is None:
+        if entrada is not None:
+            _ejecutar("DELETE FROM respuestas WHERE clave = ?", (clave,))
+    elif not parsers.es_pagina_login(texto):
+        _guardar(
+            (
+                clave,
+                url_completa,
+                texto,
+                respuesta.headers.get("ETag"),
+                respuesta.headers.get("Last-Modified"),
+                ahora,
+                ahora + vigencia,
+            )
+        )
+    return texto
+
+
+def _guardar(fila: Tuple[Any, ...]) -> None:
+    global _escrituras
+    try:
+        with _conectar() as conexion:
+            conexion.execute(
+                "INSERT OR REPLACE INTO respuestas (clave, url, texto, etag, "
+                "ultima_modificacion, guardado, vence, inmutable) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                fila,
+            )
+            _escrituras += 1
+            if _escrituras % _ESCRITURAS_ENTRE_PODAS == 0:
+                _podar(conexion)
+    except sqlite3.Error as e:
+        logger.warning("No se pudo escribir la caché HTTP: %s", e)
+
+
+def marcar_inmutable(
+    session: requests.Session, url: str, params: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Indica que una página cacheada ya no cambiará, por ejemplo un escrito firmado.
+
+    Args:
+        session: Sesión HTTP con la que se obtuvo la página.
+        url: Dirección de la página.
+        params: Parámetros de la consulta.
+    """
+    clave_cache = _clave_cache(session, url, params)
+    if not config.CACHE_HTTP_HABILITADA or clave_cache is None:
+        return
+    _ejecutar(
+        "UPDATE respuestas SET inmutable = 1 WHERE clave = ?", (clave_cache[0],)
+    )
+
@@ -0,0 +1,225 @@
+"""Módulo de caché cifrada en Redis para las sesiones autenticadas de SIPED."""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Dict, Optional
+
+import redis
+
+import config
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+    InvalidToken = Exception
+    logger.warning(
+        "'cryptography' no está instalado: la caché de sesiones queda deshabilitada."
+    )
+
+_cliente: Optional[redis.Redis] = None
+
+
+def _obtener_fernet() -> Optional["Fernet"]:
+    if Fernet is None or not config.CLAVE_CACHE_SESIONES:
+        return None
+    digest = hashlib.sha256(config.CLAVE_CACHE_SESIONES.encode("utf-8")).digest()
+    return Fernet(base64.urlsafe_b64encode(digest))
+
+
+def _obtener_fernet_boveda() -> Optional["Fernet"]:
+    if Fernet is None or not config.CLAVE_BOVEDA:
+        return None
+    if config.CLAVE_BOVEDA == config.CLAVE_CACHE_SESIONES:
+        logger.warning(
+            "SIPED_VAULT_KEY coincide con la clave de la caché de sesiones: "
+            "la bóveda de credenciales queda deshabilitada."
+        )
+        return None
+    digest = hashlib.sha256(config.CLAVE_BOVEDA.encode("utf-8")).digest()
+    return Fernet(base64.urlsafe_b64encode(digest))
+
+
+def _cifrar_credencial(clave: str) -> Optional[str]:
+    """Cifra la contraseña con la clave de la bóveda, independiente de la de la caché."""
+    fernet = _obtener_fernet_boveda()
+    if not fernet:
+        logger.warning(
+            "SIPED_BOVEDA_CREDENCIALES está activo sin una SIPED_VAULT_KEY propia: "
+            "no se guarda la contraseña."
+        )
+        return None
+    return fernet.encrypt(clave.encode("utf-8")).decode("ascii")
+
+
+def _obtener_cliente() -> redis.Redis:
+    global _cliente
+    if _cliente is None:
+        _cliente = redis.Redis.from_url(
+            config.REDIS_URL, socket_connect_timeout=1, socket_timeout=1
+        )
+    return _cliente
+
+
+def _clave_redis(usuario: str) -> str:
+    return "siped:sesion:" + hashlib.sha256(usuario.encode("utf-8")).hexdigest()
+
+
+def _verificador_clave(usuario: str, clave: str) -> str:
+    """Deriva un verificador de la contraseña para no aceptar la sesión con otra."""
+    sal = (config.CLAVE_CACHE_SESIONES + usuario).encode("utf-8")
+    return hashlib.pbkdf2_hmac("sha256", clave.encode("utf-8"), sal, 100_000).hex()
+
+
+def _escribir(usuario: str, entrada: Dict[str, Any]) -> None:
+    fernet = _obtener_fernet()
+    if not fernet or not usuario:
+        return
+    try:
+        token = fernet.encrypt(json.dumps(entrada).encode("utf-8"))
+        _obtener_cliente().set(
+            _clave_redis(usuario), token, ex=config.SESION_CACHE_TTL
+        )
+    except redis.RedisError as e:
+        logger.warning("No se pudo guardar la sesión en caché: %s", e)
+
+
+def guardar(
+    usuario: str, cookies: Dict[str, str], clave: Optional[str] = None
+) -> None:
+    """
+    Almacena cifradas las cookies de una sesión recién autenticada.
+
+    Args:
+        usuario: Identificador del usuario.
+        cookies: Cookies de la sesión SIPED.
+        clave: Contraseña usada en el login; permite verificarla en lecturas futuras
+            y, con `BOVEDA_CREDENCIALES` activo, reautenticar desde los workers.
+    """
+    _escribir(
+        usuario,
+        {
+            "cookies": cookies,
+            "validada": time.time(),
+            "verificador": _verificador_clave(usuario, clave) if clave else None,
+            "clave": (
+                _cifrar_credencial(clave)
+                if clave and config.BOVEDA_CREDENCIALES
+                else None
+            ),
+        },
+    )
+
+
+def actualizar_cookies(usuario: str, cookies: Dict[str, str]) -> None:
+    """
+    Reemplaza las cookies de la entrada cacheada conservando su verificador.
+
+    Args:
+        usuario: Identificador del usuario.
+        cookies: Cookies de la sesión renovada.
+    """
+    entrada = obtener(usuario) or {}
+    _escribir(usuario, dict(entrada, cookies=cookies, validada=time.time()))
+
+
+def marcar_validada(usuario: str, entrada: Dict[str, Any]) -> None:
+    """
+    Renueva la marca de última verificación de una entrada existente.
+
+    Args:
+        usuario: Identificador del usuario.
+        entrada: Entrada devuelta previamente por obtener().
+    """
+    _escribir(usuario, dict(entrada, validada=time.time()))
+
+
+def obtener(usuario: str, clave: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Recupera la sesión cacheada de un usuario.
+
+    Si se indica la contraseña, la entrada solo se devuelve cuando coincide con la
+    usada al autenticar. Los procesos internos (workers) pueden omitirla.
+
+    Args:
+        usuario: Identificador del usuario.
+        clave: Contraseña ingresada, si se dispone de ella.
+
+    Returns:
+        Diccionario con 'cookies' y 'validada', o None si no hay entrada utilizable.
+    """
+    fernet = _obtener_fernet()
+    if not fernet or not usuario:
+        return None
+
+    try:
+        token = _obtener_cliente().get(_clave_redis(usuario))
+    except redis.RedisError as e:
+        logger.warning("No se pudo consultar la caché de sesiones: %s", e)
+        return None
+
+    if not token:
+        return None
+
+    try:
+        entrada = json.loads(fernet.decrypt(token))
+    except (InvalidToken, ValueError):
+        logger.warning("Entrada de sesión ilegible en caché para %s.", usuario)
+        return None
+
+    if clave is not None:
+        verificador = entrada.get("verificador")
+        if not verificador or not hmac.compare_digest(
+            verificador, _verificador_clave(usuario, clave)
+        ):
+            return None
+
+    return entrada
+
+
+def obtener_credencial(usuario: str) -> Optional[str]:
+    """
+    Recupera la contraseña guardada en la bóveda para reautenticar al usuario.
+
+    La contraseña va cifrada dos veces: con la clave de la caché, como toda la
+    entrada, y con `CLAVE_BOVEDA`, de modo que quien solo conozca la primera no
+    puede leerla.
+
+    Args:
+        usuario: Identificador del usuario.
+
+    Returns:
+        Contraseña descifrada, o None si la bóveda está deshabilitada o vacía.
+    """
+    fernet = _obtener_fernet_boveda()
+    if not config.BOVEDA_CREDENCIALES or not fernet:
+        return None
+    entrada = obtener(usuario)
+    if not entrada or not entrada.get("clave"):
+        return None
+    try:
+        return fernet.decrypt(entrada["clave"].encode("ascii")).decode("utf-8")
+    except (InvalidToken, ValueError):
+        logger.warning("Credencial ilegible en la bóveda para %s.", usuario)
+        return None
+
+
+def invalidar(usuario: str) -> None:
+    """
+    Elimina la sesión cacheada de un usuario.
+
+    Args:
+        usuario: Identificador del usuario.
+    """
+    if not _obtener_fernet() or not usuario:
+        return
+    try:
+        _obtener_cliente().delete(_clave_redis(usuario))
+    except redis.RedisError as e:
+        logger.warning("No se pudo invalidar la sesión en caché: %s", e)
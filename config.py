@@ -5,7 +5,9 @@ from typing import Dict
 
 BASE_DIR: str = os.path.dirname(os.path.abspath(__file__))
 
-BASE_URL: str = "https://intranet.jussantacruz.gob.ar"
+BASE_URL: str = os.environ.get(
+    "SIPED_BASE_URL", "https://intranet.jussantacruz.gob.ar"
+).rstrip("/")
 LOGIN_URL: str = f"{BASE_URL}/servicios/controli2.php"
 LISTA_EXPEDIENTES_URL: str = (
     f"{BASE_URL}/siped/expediente/buscar/submit_buscar_abogado.php"
@@ -13,12 +15,97 @@ LISTA_EXPEDIENTES_URL: str = (
 AJAX_MOVIMIENTOS_URL: str = (
     f"{BASE_URL}/siped/expediente/buscar/ver_mas_escritosAjax.php"
 )
+VERIFICACION_SESION_URL: str = f"{BASE_URL}/siped/frame_principal.php"
 
 DATA_ROOT_DIR: str = os.path.join(BASE_DIR, "datos_usuarios")
 LISTA_EXPEDIENTES_CSV: str = "expedientes_completos.csv"
 MOVIMIENTOS_OUTPUT_DIR: str = "movimientos_expedientes"
 DOCUMENTOS_OUTPUT_DIR: str = "documentos_expedientes"
 
+CACHE_HTTP_HABILITADA: bool = os.environ.get("SIPED_CACHE_HTTP", "1").lower() in (
+    "1",
+    "true",
+    "si",
+)
+CACHE_HTTP_RUTA: str = os.environ.get(
+    "SIPED_CACHE_HTTP_RUTA", os.path.join(DATA_ROOT_DIR, "cache_http.sqlite3")
+)
+CACHE_HTTP_TTL: int = int(os.environ.get("SIPED_CACHE_HTTP_TTL", "0"))
+CACHE_HTTP_RETENCION_DIAS: int = int(
+    os.environ.get("SIPED_CACHE_HTTP_RETENCION_DIAS", "30")
+)
+CACHE_HTTP_MAX_MB: int = int(os.environ.get("SIPED_CACHE_HTTP_MAX_MB", "500"))
+
+SQLITE_ESPERA_BLOQUEO_MS: int = int(
+    os.environ.get("SIPED_SQLITE_ESPERA_BLOQUEO_MS", "30000")
+)
+SQLITE_CACHE_KB: int = int(os.environ.get("SIPED_SQLITE_CACHE_KB", "20000"))
+SQLITE_MMAP_MB: int = int(os.environ.get("SIPED_SQLITE_MMAP_MB", "256"))
+
+DB_POOL_TAMANO: int = int(os.environ.get("SIPED_DB_POOL_TAMANO", "5"))
+DB_POOL_DESBORDE: int = int(os.environ.get("SIPED_DB_POOL_DESBORDE", "10"))
+DB_POOL_ESPERA: int = int(os.environ.get("SIPED_DB_POOL_ESPERA", "30"))
+DB_POOL_RECICLAR: int = int(os.environ.get("SIPED_DB_POOL_RECICLAR", "1800"))
+
+CATALOGOS_CACHE_SEGUNDOS: int = int(
+    os.environ.get("SIPED_CATALOGOS_CACHE_SEGUNDOS", "604800")
+)
+
+EXPEDIENTES_POR_PAGINA: int = int(os.environ.get("SIPED_EXPEDIENTES_POR_PAGINA", "50"))
+
+PARSER_HTML: str = os.environ.get("SIPED_PARSER_HTML", "html.parser")
+
+HTTP_POOL_CONEXIONES: int = int(os.environ.get("SIPED_HTTP_POOL_CONEXIONES", "4"))
+HTTP_POOL_TAMANO_MAXIMO: int = int(os.environ.get("SIPED_HTTP_POOL_TAMANO_MAXIMO", "16"))
+
+MAX_CONCURRENCIA_POR_HOST: int = int(
+    os.environ.get("SIPED_MAX_CONCURRENCIA_POR_HOST", "4")
+)
+DEMORA_CORTESIA: float = float(os.environ.get("SIPED_DEMORA_CORTESIA", "0"))
+PAGINAS_LISTA_SIMULTANEAS: int = int(
+    os.environ.get("SIPED_PAGINAS_LISTA_SIMULTANEAS", "4")
+)
+VENTANA_MOVIMIENTOS: int = int(os.environ.get("SIPED_VENTANA_MOVIMIENTOS", "4"))
+FASE2_INCREMENTAL: bool = os.environ.get("SIPED_FASE2_INCREMENTAL", "1").lower() in (
+    "1",
+    "true",
+    "si",
+)
+
+REDIS_URL: str = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+LIMITES_TASA: Dict[str, float] = {
+    "lista": float(os.environ.get("SIPED_TASA_LISTA", "2")),
+    "movimientos": float(os.environ.get("SIPED_TASA_MOVIMIENTOS", "4")),
+    "descargas": float(os.environ.get("SIPED_TASA_DESCARGAS", "2")),
+    "general": float(os.environ.get("SIPED_TASA_GENERAL", "4")),
+}
+CAPACIDAD_RAFAGA: int = int(os.environ.get("SIPED_CAPACIDAD_RAFAGA", "4"))
+
+CLAVE_CACHE_SESIONES: str = os.environ.get(
+    "SIPED_CLAVE_CACHE_SESIONES"
+) or os.environ.get("FLASK_SECRET_KEY", "")
+SESION_CACHE_TTL: int = int(os.environ.get("SIPED_SESION_CACHE_TTL", "28800"))
+SESION_REVALIDAR_CADA: int = int(os.environ.get("SIPED_SESION_REVALIDAR_CADA", "300"))
+BOVEDA_CREDENCIALES: bool = os.environ.get(
+    "SIPED_BOVEDA_CREDENCIALES", "0"
+).lower() in ("1", "true", "si")
+# Clave propia de la bóveda: nunca se deriva de FLASK_SECRET_KEY ni de la clave de
+# la caché de sesiones, para que filtrar una de ellas no exponga las contraseñas.
+CLAVE_BOVEDA: str = os.environ.get("SIPED_VAULT_KEY", "")
+
+REINTENTOS_MAXIMOS: int = int(os.environ.get("SIPED_REINTENTOS_MAXIMOS", "4"))
+REINTENTOS_BACKOFF_BASE: float = float(
+    os.environ.get("SIPED_REINTENTOS_BACKOFF_BASE", "0.5")
+)
+REINTENTOS_ESPERA_MAXIMA: float = float(
+    os.environ.get("SIPED_REINTENTOS_ESPERA_MAXIMA", "30")
+)
+
+AIMD_LATENCIA_OBJETIVO: float = float(os.environ.get("SIPED_LATENCIA_OBJETIVO", "1.5"))
+AIMD_TASA_MINIMA: float = float(os.environ.get("SIPED_AIMD_TASA_MINIMA", "0.5"))
+AIMD_TASA_MAXIMA: float = float(os.environ.get("SIPED_AIMD_TASA_MAXIMA", "10"))
+
 BROWSER_HEADERS: Dict[str, str] = {
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange=vb3;q=0.7",
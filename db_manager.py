@@ -1,29 +1,52 @@
 """Módulo para la gestión de la base de datos y persistencia de expedientes."""
 
-import os
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-import sqlalchemy.exc
-from flask import Flask
+from sqlalchemy import bindparam, func, or_, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 
-from extensions import db
+import base_datos
+import utils
+from logger import get_logger
 from models import Expediente, Movimiento
 
-app = Flask(__name__)
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
-    "SQLALCHEMY_DATABASE_URI", "sqlite:////app/datos_usuarios/siped.db"
-)
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+logger = get_logger(__name__)
+
+_TAMANO_LOTE = 500
+_CAMPOS_ACTUALIZABLES = ("caratula", "estado", "fec_ult_mov", "link_detalle")
+_INSERT_POR_DIALECTO = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
 
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"connect_args": {"timeout": 30}}
 
-db.init_app(app)
+def _sentencia_upsert_expedientes(dialecto: str) -> Any:
+    """
+    Arma el INSERT ... ON CONFLICT DO UPDATE de expedientes para executemany.
+
+    SQLite y PostgreSQL comparten la sintaxis, pero cada uno requiere su propia
+    construcción de insert. Al actualizar solo se pisan carátula, estado, fecha de
+    último movimiento y enlace, y únicamente con los valores informados (los
+    ausentes llegan como None y COALESCE conserva el almacenado).
+
+    Args:
+        dialecto: Nombre del dialecto del motor (sqlite o postgresql).
+    """
+    tabla = Expediente.__table__
+    sentencia = _INSERT_POR_DIALECTO[dialecto](tabla)
+    return sentencia.on_conflict_do_update(
+        index_elements=["usuario_asignado", "numero_expediente", "origen"],
+        set_={
+            campo: func.coalesce(bindparam(f"nuevo_{campo}"), tabla.c[campo])
+            for campo in _CAMPOS_ACTUALIZABLES
+        },
+    )
 
-with app.app_context():
-    try:
-        db.create_all()
-    except sqlalchemy.exc.OperationalError:
-        pass
+
+def _valores_actualizables(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "caratula": data.get("caratula"),
+        "estado": data.get("estado"),
+        "fec_ult_mov": data.get("fec_ult_mov") or data.get("fecha_alta") or None,
+        "link_detalle": data.get("link_detalle"),
+    }
 
 
 def upsert_expedientes(
@@ -32,44 +55,82 @@ def upsert_expedientes(
     """
     Inserta o actualiza una lista de expedientes asociados a un usuario.
 
+    Los expedientes ya registrados se leen en una sola consulta para descartar los
+    que no cambiaron; el resto se escribe con INSERT ... ON CONFLICT DO UPDATE en
+    lotes ejecutados con executemany. Cada lote se confirma por separado para no
+    retener el bloqueo de escritura de SQLite durante toda la sincronización.
+
     Args:
         username: Identificador del usuario propietario de los datos.
         lista_datos: Lista de diccionarios con la información de cada expediente.
         origen: Clasificador del origen de los datos (e.g., PRIVADO, PUBLICO, BUSQUEDA_AVANZADA).
     """
-    with app.app_context():
+    with base_datos.sesion() as sesion:
+        tabla = Expediente.__table__
+        consulta = select(
+            tabla.c.numero_expediente, *(tabla.c[c] for c in _CAMPOS_ACTUALIZABLES)
+        ).where(tabla.c.usuario_asignado == username, tabla.c.origen == origen)
+        existentes = {
+            fila.numero_expediente: fila for fila in sesion.execute(consulta)
+        }
+
+        filas: Dict[str, Dict[str, Any]] = {}
         for data in lista_datos:
             nro_exp = data.get("expediente")
             if not nro_exp:
                 continue
 
-            exp = Expediente.query.filter_by(
-                usuario_asignado=username, numero_expediente=nro_exp, origen=origen
-            ).first()
-            if not exp:
-                exp = Expediente(
-                    usuario_asignado=username,
-                    numero_expediente=nro_exp,
-                    caratula=data.get("caratula", ""),
-                    partes=data.get("partes", "") or data.get("partes_count", ""),
-                    estado=data.get("estado", ""),
-                    fec_ult_mov=data.get("fec_ult_mov", "")
-                    or data.get("fecha_alta", ""),
-                    localidad=data.get("localidad", ""),
-                    dependencia=data.get("dependencia", ""),
-                    secretaria=data.get("secretaria", ""),
-                    link_detalle=data.get("link_detalle", ""),
-                    origen=origen,
-                )
-                db.session.add(exp)
-            else:
-                exp.caratula = data.get("caratula", exp.caratula)
-                exp.estado = data.get("estado", exp.estado)
-                exp.fec_ult_mov = data.get("fec_ult_mov", exp.fec_ult_mov) or data.get(
-                    "fecha_alta", exp.fec_ult_mov
-                )
-                exp.link_detalle = data.get("link_detalle", exp.link_detalle)
-        db.session.commit()
+            actualizables = _valores_actualizables(data)
+            anterior = existentes.get(nro_exp)
+            if anterior is not None and all(
+                valor is None or getattr(anterior, campo) == valor
+                for campo, valor in actualizables.items()
+            ):
+                continue
+
+            filas[nro_exp] = {
+                "usuario_asignado": username,
+                "numero_expediente": nro_exp,
+                "caratula": data.get("caratula", ""),
+                "partes": data.get("partes", "") or data.get("partes_count", ""),
+                "estado": data.get("estado", ""),
+                "fec_ult_mov": data.get("fec_ult_mov", "") or data.get("fecha_alta", ""),
+                "localidad": data.get("localidad", ""),
+                "dependencia": data.get("dependencia", ""),
+                "secretaria": data.get("secretaria", ""),
+                "link_detalle": data.get("link_detalle", ""),
+                "origen": origen,
+                **{f"nuevo_{c}": v for c, v in actualizables.items()},
+            }
+
+        if not filas:
+            return
+
+        sentencia = _sentencia_upsert_expedientes(sesion.get_bind().dialect.name)
+        lote = list(filas.values())
+        for inicio in range(0, len(lote), _TAMANO_LOTE):
+            sesion.execute(sentencia, lote[inicio : inicio + _TAMANO_LOTE])
+            sesion.commit()
+        logger.info(
+            "Expedientes %s de %s: %d nuevos, %d actualizados, %d sin cambios.",
+            origen,
+            username,
+            sum(1 for n in filas if n not in existentes),
+            sum(1 for n in filas if n in existentes),
+            len(lista_datos) - len(filas),
+        )
+
+
+def _expediente_a_dict(e: Expediente) -> Dict[str, Any]:
+    return {
+        "id": e.id,
+        "expediente": e.numero_expediente,
+        "caratula": e.caratula,
+        "link_detalle": e.link_detalle,
+        "fec_ult_mov": e.fec_ult_mov,
+        "fec_ult_mov_sincronizado": e.fec_ult_mov_sincronizado,
+        "movimientos_sincronizados": e.movimientos_sincronizados,
+    }
 
 
 def obtener_expedientes(username: str, origen: str = "PRIVADO") -> List[Dict[str, Any]]:
@@ -83,53 +144,227 @@ def obtener_expedientes(username: str, origen: str = "PRIVADO") -> List[Dict[str
     Returns:
         Lista de diccionarios con los metadatos básicos de los expedientes.
     """
-    with app.app_context():
-        expedientes = Expediente.query.filter_by(
+    with base_datos.sesion() as sesion:
+        expedientes = sesion.query(Expediente).filter_by(
             usuario_asignado=username, origen=origen
         ).all()
-        return [
-            {
-                "id": e.id,
-                "expediente": e.numero_expediente,
-                "caratula": e.caratula,
-                "link_detalle": e.link_detalle,
-            }
-            for e in expedientes
-        ]
+        return [_expediente_a_dict(e) for e in expedientes]
+
+
+def obtener_expediente_por_numero(
+    username: str, numero: str, origen: str = "PRIVADO"
+) -> Optional[Dict[str, Any]]:
+    """
+    Busca un expediente puntual del usuario por su número.
+
+    La consulta se resuelve con el índice único de usuario, número y origen, sin
+    cargar el resto de los expedientes.
+
+    Args:
+        username: Identificador del usuario.
+        numero: Número de expediente tal como figura en SIPED.
+        origen: Clasificador del origen de los datos a filtrar.
+
+    Returns:
+        Diccionario con la misma forma que los de obtener_expedientes, o None.
+    """
+    with base_datos.sesion() as sesion:
+        expediente = sesion.query(Expediente).filter_by(
+            usuario_asignado=username, origen=origen, numero_expediente=numero
+        ).first()
+        return _expediente_a_dict(expediente) if expediente else None
+
+
+def obtener_expediente_por_link(
+    username: str, link_detalle: str, origen: str = "PRIVADO"
+) -> Optional[Dict[str, Any]]:
+    """
+    Busca un expediente puntual del usuario por su enlace de detalle.
+
+    Args:
+        username: Identificador del usuario.
+        link_detalle: Enlace a la página de detalle en SIPED.
+        origen: Clasificador del origen de los datos a filtrar.
+
+    Returns:
+        Diccionario con la misma forma que los de obtener_expedientes, o None.
+    """
+    with base_datos.sesion() as sesion:
+        expediente = sesion.query(Expediente).filter_by(
+            usuario_asignado=username, origen=origen, link_detalle=link_detalle
+        ).first()
+        return _expediente_a_dict(expediente) if expediente else None
+
+
+def buscar_expedientes(
+    username: str,
+    texto: str = "",
+    origen: str = "PRIVADO",
+    despues: Optional[Tuple[str, int]] = None,
+    por_pagina: int = 50,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Recupera una página de los expedientes de un usuario, opcionalmente filtrada.
+
+    Cada palabra del texto debe ser el comienzo del número o de alguna palabra de
+    la carátula, sin distinguir mayúsculas: "per suc" encuentra "PEREZ S/
+    SUCESION". La paginación continúa desde el último expediente mostrado
+    (número, id) en lugar de saltear filas con OFFSET, de modo que cada página
+    recorre el índice único del usuario desde donde quedó la anterior. Se pide una
+    fila de más para saber si existe otra página sin contar el total.
+
+    Args:
+        username: Identificador del usuario.
+        texto: Palabras a buscar en número o carátula. Vacío devuelve todos.
+        origen: Clasificador del origen de los datos a filtrar.
+        despues: Número e id del último expediente de la página anterior, o None
+            para la primera página.
+        por_pagina: Cantidad de expedientes por página.
+
+    Returns:
+        Tupla con la lista de expedientes de la página (misma forma que
+        obtener_expedientes) y un indicador de si hay más páginas.
+    """
+    with base_datos.sesion() as sesion:
+        consulta = sesion.query(Expediente).filter_by(
+            usuario_asignado=username, origen=origen
+        )
+        for palabra in texto.split():
+            for especial in ("\\", "%", "_"):
+                palabra = palabra.replace(especial, "\\" + especial)
+            consulta = consulta.filter(
+                or_(
+                    Expediente.numero_expediente.ilike(f"{palabra}%", escape="\\"),
+                    Expediente.caratula.ilike(f"{palabra}%", escape="\\"),
+                    Expediente.caratula.ilike(f"% {palabra}%", escape="\\"),
+                )
+            )
+        if despues is not None:
+            consulta = consulta.filter(
+                tuple_(Expediente.numero_expediente, Expediente.id) > tuple_(*despues)
+            )
+        expedientes = (
+            consulta.order_by(Expediente.numero_expediente, Expediente.id)
+            .limit(por_pagina + 1)
+            .all()
+        )
+        return (
+            [_expediente_a_dict(e) for e in expedientes[:por_pagina]],
+            len(expedientes) > por_pagina,
+        )
+
+
+def marcar_expediente_sincronizado(
+    expediente_id: int, fec_ult_mov: str, cantidad_movimientos: int
+) -> None:
+    """
+    Registra el estado de SIPED con el que quedó sincronizado un expediente.
+
+    Args:
+        expediente_id: ID interno del expediente.
+        fec_ult_mov: Fecha de último movimiento informada por la bandeja.
+        cantidad_movimientos: Movimientos almacenados tras la sincronización.
+    """
+    with base_datos.sesion() as sesion:
+        exp = sesion.get(Expediente, expediente_id)
+        if not exp:
+            return
+        exp.fec_ult_mov_sincronizado = fec_ult_mov
+        exp.movimientos_sincronizados = cantidad_movimientos
+        sesion.commit()
+
+
+_CAMPOS_MOVIMIENTO = (
+    "fecha_presentacion",
+    "nombre_escrito",
+    "tipo",
+    "estado",
+    "generado_por",
+    "descripcion",
+    "fecha_firma",
+    "fecha_publicacion",
+    "link_escrito",
+)
+
+
+def _claves_de_movimientos(movimientos: Iterable[Any]) -> List[str]:
+    """
+    Calcula la clave natural de cada movimiento de un historial.
+
+    Los movimientos idénticos se distinguen por su número de aparición, contado
+    desde el más antiguo para que no cambie al publicarse movimientos nuevos.
+    """
+    movimientos = list(movimientos)
+    claves = []
+    apariciones: Dict[str, int] = {}
+    for movimiento in reversed(movimientos):
+        datos = movimiento if isinstance(movimiento, dict) else vars(movimiento)
+        base = utils.generar_clave_movimiento(datos)
+        apariciones[base] = apariciones.get(base, 0) + 1
+        n = apariciones[base]
+        claves.append(base if n == 1 else f"{base}#{n}")
+    return claves[::-1]
 
 
 def upsert_movimientos(
     expediente_id: int, lista_movimientos: List[Dict[str, Any]]
-) -> None:
+) -> int:
     """
-    Sincroniza el historial de movimientos reemplazando los registros anteriores del expediente.
+    Sincroniza el historial de movimientos de un expediente aplicando solo las diferencias.
+
+    Cada movimiento se identifica por su clave natural: los nuevos se insertan, los
+    existentes solo se actualizan si cambió algún campo y los que ya no figuran en
+    el historial se eliminan. Los IDs de los movimientos que persisten no cambian.
 
     Args:
         expediente_id: ID interno (clave primaria) del expediente en la tabla padre.
-        lista_movimientos: Lista de diccionarios representando los movimientos actuales.
+        lista_movimientos: Historial completo actual, en el orden publicado por SIPED.
+
+    Returns:
+        Cantidad de movimientos de la lista que no estaban almacenados.
     """
-    with app.app_context():
+    with base_datos.sesion() as sesion:
         if not lista_movimientos:
-            return
+            return 0
 
-        Movimiento.query.filter_by(expediente_id=expediente_id).delete()
-
-        for data in lista_movimientos:
-            mov = Movimiento(
-                expediente_id=expediente_id,
-                fecha_presentacion=data.get("fecha_presentacion", ""),
-                nombre_escrito=data.get("nombre_escrito", ""),
-                tipo=data.get("tipo", ""),
-                estado=data.get("estado", ""),
-                generado_por=data.get("generado_por", ""),
-                descripcion=data.get("descripcion", ""),
-                fecha_firma=data.get("fecha_firma", ""),
-                fecha_publicacion=data.get("fecha_publicacion", ""),
-                link_escrito=data.get("link_escrito", ""),
-            )
-            db.session.add(mov)
+        # Las filas previas a la clave natural se insertaron en el orden de SIPED,
+        # que es el que espera _claves_de_movimientos para numerar los repetidos.
+        almacenados = (
+            sesion.query(Movimiento)
+            .filter_by(expediente_id=expediente_id)
+            .order_by(Movimiento.id)
+            .all()
+        )
+        sin_clave = [m for m in almacenados if m.clave is None]
+        if sin_clave:
+            for mov, clave in zip(sin_clave, _claves_de_movimientos(sin_clave)):
+                mov.clave = clave
+        existentes = {m.clave: m for m in almacenados}
+
+        nuevos = 0
+        total = len(lista_movimientos)
+        claves = _claves_de_movimientos(lista_movimientos)
+        for indice, (data, clave) in enumerate(zip(lista_movimientos, claves)):
+            valores = {campo: data.get(campo, "") for campo in _CAMPOS_MOVIMIENTO}
+            valores["posicion"] = total - 1 - indice
 
-        db.session.commit()
+            mov = existentes.pop(clave, None)
+            if mov is None:
+                sesion.add(
+                    Movimiento(expediente_id=expediente_id, clave=clave, **valores)
+                )
+                nuevos += 1
+                continue
+
+            for campo, valor in valores.items():
+                if getattr(mov, campo) != valor:
+                    setattr(mov, campo, valor)
+
+        for mov in existentes.values():
+            sesion.delete(mov)
+
+        sesion.commit()
+        return nuevos
 
 
 def obtener_movimientos(expediente_id: int) -> List[Dict[str, Any]]:
@@ -140,16 +375,23 @@ def obtener_movimientos(expediente_id: int) -> List[Dict[str, Any]]:
         expediente_id: ID interno del expediente.
 
     Returns:
-        Lista de diccionarios ordenados cronológicamente con la información de los movimientos.
+        Lista de diccionarios ordenados cronológicamente con la información de los
+        movimientos, con las mismas columnas que los descargados de SIPED.
     """
-    with app.app_context():
+    with base_datos.sesion() as sesion:
+        numero = (
+            sesion.query(Expediente.numero_expediente)
+            .filter_by(id=expediente_id)
+            .scalar()
+        )
         movs = (
-            Movimiento.query.filter_by(expediente_id=expediente_id)
-            .order_by(Movimiento.id.asc())
+            sesion.query(Movimiento).filter_by(expediente_id=expediente_id)
+            .order_by(Movimiento.posicion.desc(), Movimiento.id.asc())
             .all()
         )
         return [
             {
+                "expediente_nro": numero,
                 "fecha_presentacion": m.fecha_presentacion,
                 "nombre_escrito": m.nombre_escrito,
                 "tipo": m.tipo,
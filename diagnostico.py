@@ -4,6 +4,7 @@ import os
 
 os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite:///datos_usuarios/siped.db"
 
+import base_datos
 import db_manager
 
 
@@ -15,8 +16,9 @@ def ejecutar_diagnostico(usuario: str, nro_expediente: str) -> None:
         usuario: Identificador del usuario propietario.
         nro_expediente: Número de expediente a auditar.
     """
-    expedientes = db_manager.obtener_expedientes(usuario, origen="PRIVADO")
-    exp = next((e for e in expedientes if e["expediente"] == nro_expediente), None)
+    exp = db_manager.obtener_expediente_por_numero(
+        usuario, nro_expediente, origen="PRIVADO"
+    )
 
     if exp:
         movs = db_manager.obtener_movimientos(exp["id"])
@@ -38,5 +40,6 @@ if __name__ == "__main__":
     USUARIO_PRUEBA = "SU_USUARIO_AQUI"
     EXPEDIENTE_PRUEBA = "NRO_DEL_EXPEDIENTE_AQUI"
 
+    base_datos.inicializar_esquema()
     ejecutar_diagnostico(USUARIO_PRUEBA, EXPEDIENTE_PRUEBA)
 
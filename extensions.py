@@ -1,6 +0,0 @@
-"""Módulo para instanciar las extensiones de Flask."""
-
-from flask_sqlalchemy import SQLAlchemy
-
-db = SQLAlchemy()
-
@@ -1,13 +1,16 @@
 """Módulo correspondiente a la Fase 2: Extracción y actualización de movimientos."""
 
+import asyncio
 import os
+from typing import Any, Dict, List, Optional, Tuple
 import requests
 from celery.utils.log import get_task_logger
 
 import config
 import db_manager
-import scraper_tasks
+import motor_async
 import utils
+from session_manager import SesionExpiradaError
 from utils import manejar_fase_con_sesion
 
 logger = get_task_logger(__name__)
@@ -18,6 +21,10 @@ def ejecutar_fase_2_movimientos(session: requests.Session, username: str) -> str
     """
     Extrae y sincroniza el historial de movimientos para cada expediente registrado.
 
+    En modo incremental (`FASE2_INCREMENTAL`) se omiten los expedientes cuya fecha
+    de último movimiento no cambió desde la sincronización anterior, y en los
+    demás solo se descargan los movimientos posteriores al último conocido.
+
     Args:
         session: Sesión HTTP activa.
         username: Identificador del usuario actual.
@@ -38,11 +45,91 @@ def ejecutar_fase_2_movimientos(session: requests.Session, username: str) -> str
 
     dir_movimientos = os.path.join(ruta_usuario, config.MOVIMIENTOS_OUTPUT_DIR)
     os.makedirs(dir_movimientos, exist_ok=True)
+
+    historiales_previos = {}
+    if config.FASE2_INCREMENTAL:
+        pendientes = [e for e in expedientes_a_procesar if not _sin_cambios(e)]
+        for expediente in pendientes:
+            if expediente.get("movimientos_sincronizados"):
+                historiales_previos[expediente.get("id")] = (
+                    db_manager.obtener_movimientos(expediente.get("id"))
+                )
+        logger.info(
+            "Sincronización incremental: %d sin cambios, %d a actualizar.",
+            total_expedientes - len(pendientes),
+            len(pendientes),
+        )
+        expedientes_a_procesar = pendientes
+
+    # Los hilos del motor comparten la sesión: SesionSiped está preparada para ello
+    # y así una expiración se renueva una sola vez para toda la fase.
+    contador_movimientos = asyncio.run(
+        _sincronizar_expedientes(
+            session, expedientes_a_procesar, dir_movimientos, historiales_previos
+        )
+    )
+
+    return f"Proceso de actualización de movimientos completado. Movimientos analizados: {contador_movimientos}"
+
+
+def _sin_cambios(expediente: Dict[str, Any]) -> bool:
+    """Indica si la bandeja no informó movimientos desde la última sincronización."""
+    fec_ult_mov = expediente.get("fec_ult_mov")
+    return (
+        bool(fec_ult_mov)
+        and fec_ult_mov == expediente.get("fec_ult_mov_sincronizado")
+        and expediente.get("movimientos_sincronizados") is not None
+    )
+
+
+async def _sincronizar_expedientes(
+    session: requests.Session,
+    expedientes: List[Dict[str, Any]],
+    dir_movimientos: str,
+    historiales_previos: Optional[Dict[Any, List[Dict[str, Any]]]] = None,
+) -> int:
+    """
+    Extrae en paralelo los movimientos de cada expediente y los persiste al finalizar.
+
+    Args:
+        session: Sesión HTTP activa.
+        expedientes: Expedientes registrados del usuario.
+        dir_movimientos: Directorio de salida de los CSV de movimientos.
+        historiales_previos: Movimientos almacenados de los expedientes que se
+            sincronizan de forma incremental.
+
+    Returns:
+        Cantidad total de movimientos guardados.
+    """
+    total_expedientes = len(expedientes)
     contador_movimientos = 0
+    procesados = 0
 
-    for i, expediente in enumerate(expedientes_a_procesar):
+    historiales_previos = historiales_previos or {}
+    async for expediente, movimientos, error in motor_async.raspar_movimientos_en_lote(
+        session, expedientes, historiales_previos=historiales_previos
+    ):
+        procesados += 1
         nro_expediente = expediente.get("expediente", "Desconocido")
-        logger.info("Procesando %d/%d: %s", i + 1, total_expedientes, nro_expediente)
+        logger.info("Procesado %d/%d: %s", procesados, total_expedientes, nro_expediente)
+
+        if isinstance(error, SesionExpiradaError):
+            raise error
+        if error:
+            logger.error(
+                "  > !!! ERROR al procesar %s: %s",
+                nro_expediente,
+                error,
+                exc_info=error,
+            )
+            continue
+        if movimientos is None:
+            # Un fallo de red o de formato no equivale a un historial vacío: el
+            # expediente queda pendiente para la próxima ejecución.
+            logger.error(
+                "  > !!! No se pudo consultar el historial de %s.", nro_expediente
+            )
+            continue
 
         nro = utils.limpiar_nombre_archivo(nro_expediente)
         caratula_limpia = utils.limpiar_nombre_archivo(
@@ -50,32 +137,52 @@ def ejecutar_fase_2_movimientos(session: requests.Session, username: str) -> str
         )
         nombre_archivo = f"{nro} - {caratula_limpia}.csv"
 
-        logger.info("  > Extrayendo/Actualizando historial de '%s'...", nombre_archivo)
-
         try:
-            movimientos = scraper_tasks.raspar_movimientos_de_expediente(
-                session, expediente
-            )
-
-            if movimientos:
+            previos = historiales_previos.get(expediente.get("id"))
+            if previos and _mismo_historial(movimientos, previos):
+                logger.info("  > Sin movimientos nuevos ni modificados.")
+            elif movimientos:
                 utils.guardar_a_csv(
                     movimientos,
                     nombre_archivo,
                     subdirectory=dir_movimientos,
                 )
 
-                db_manager.upsert_movimientos(expediente.get("id"), movimientos)
+                nuevos = db_manager.upsert_movimientos(
+                    expediente.get("id"), movimientos
+                )
 
                 cantidad = len(movimientos)
                 contador_movimientos += cantidad
-                logger.info("  > Guardados/Actualizados %d movimientos.", cantidad)
+                logger.info(
+                    "  > Guardados %d movimientos (%d nuevos) en '%s'.",
+                    cantidad,
+                    nuevos,
+                    nombre_archivo,
+                )
             else:
                 logger.info("  > No se encontraron movimientos.")
 
+            if expediente.get("id") is not None:
+                db_manager.marcar_expediente_sincronizado(
+                    expediente.get("id"), expediente.get("fec_ult_mov"), len(movimientos)
+                )
+
         except Exception as e:
             logger.error(
                 "  > !!! ERROR al procesar %s: %s", nro_expediente, e, exc_info=True
             )
 
-    return f"Proceso de actualización de movimientos completado. Movimientos analizados: {contador_movimientos}"
+    return contador_movimientos
+
+
+def _mismo_historial(
+    movimientos: Optional[List[Dict[str, Any]]], previos: List[Dict[str, Any]]
+) -> bool:
+    """Indica si lo descargado coincide campo a campo con el historial almacenado."""
+    campos = previos[0].keys()
+
+    def _valores(lista: List[Dict[str, Any]]) -> List[Tuple[str, ...]]:
+        return [tuple(str(m.get(c) or "") for c in campos) for m in lista]
 
+    return _valores(movimientos or []) == _valores(previos)
@@ -1,7 +1,6 @@
 """Módulo correspondiente a la Fase 3: Extracción y consolidación masiva de documentos PDF."""
 
 import os
-import time
 import requests
 from celery.utils.log import get_task_logger
 
@@ -9,6 +8,7 @@ import config
 import db_manager
 import scraper_tasks
 import utils
+from session_manager import SesionExpiradaError
 from utils import manejar_fase_con_sesion
 
 logger = get_task_logger(__name__)
@@ -150,8 +150,8 @@ def ejecutar_fase_3_documentos(session: requests.Session, username: str) -> str:
                                         pdf_info["tipo"],
                                         pdf_info["nombre"],
                                     )
-                    time.sleep(0.5)
-
+                except SesionExpiradaError:
+                    raise
                 except Exception as e:
                     logger.error(
                         "    > !!! ERROR (Doc %s) en %s: %s",
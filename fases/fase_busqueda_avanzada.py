@@ -27,7 +27,7 @@ def ejecutar_fase_busqueda_avanzada(
         Diccionario con el estado de la operación, total de resultados y archivo de volcado.
     """
     logger.info("--- Iniciando Búsqueda Avanzada para el usuario: %s ---", username)
-    session = session_manager.crear_sesion_con_cookies(cookies)
+    session = session_manager.crear_sesion_con_cookies(cookies, username)
 
     try:
         expedientes_filtrados = scraper_tasks.raspar_busqueda_parametrizada(
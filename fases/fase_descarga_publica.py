@@ -1,7 +1,6 @@
 """Módulo para la descarga y consolidación de documentos de un expediente público."""
 
 import os
-import time
 import requests
 from celery.utils.log import get_task_logger
 
@@ -10,6 +9,7 @@ import db_manager
 import parsers
 import scraper_tasks
 import utils
+from session_manager import SesionExpiradaError
 from utils import manejar_fase_con_sesion
 
 logger = get_task_logger(__name__)
@@ -31,9 +31,8 @@ def ejecutar_fase_descarga_publica(
         Cadena de texto informando el estado y la cantidad de descargas realizadas.
     """
     ruta_usuario = utils.obtener_ruta_usuario(username)
-    expedientes = db_manager.obtener_expedientes(username, origen="BUSQUEDA_AVANZADA")
-    expediente_data = next(
-        (e for e in expedientes if e.get("link_detalle") == link_detalle_objetivo), None
+    expediente_data = db_manager.obtener_expediente_por_link(
+        username, link_detalle_objetivo, origen="BUSQUEDA_AVANZADA"
     )
 
     if not expediente_data:
@@ -49,54 +48,37 @@ def ejecutar_fase_descarga_publica(
     logger.info("Iniciando proceso para expediente público: %s", nombre_base)
 
     r_detalle = session.get(link_detalle_objetivo)
-    html_detalle = r_detalle.text
+    detalle = parsers.PaginaSiped(r_detalle.text, parsers.REGION_PARAMETROS)
 
-    if '<frame name="sup"' in html_detalle.lower():
+    if detalle.marco_superior:
         movimientos = scraper_tasks.raspar_movimientos_de_expediente(
             session, expediente_data
         )
     else:
-        ajax_params_base = parsers.parsear_detalle_para_ajax_params(html_detalle)
+        ajax_params_base = detalle.ajax_params
         if "exp_id" not in ajax_params_base:
             logger.error(
                 "No se pudieron extraer los params de AJAX para %s.", nro_expediente
             )
             movimientos = []
         else:
-            offset = 0
-            mov_page_count = 1
-            movimientos = []
-
-            while True:
-                ajax_params = ajax_params_base.copy()
-                ajax_params.update(
-                    {
-                        "numerodemas": mov_page_count,
-                        "offset": offset,
-                        "usuariointerno": 0,
-                        "tipof": "",
-                        "estadose": "",
-                        "descripcorta": "",
-                        "contenido": "",
-                        "pe": "",
-                        "acumulados": "",
-                    }
+            try:
+                movimientos = scraper_tasks.raspar_paginas_movimientos(
+                    session, ajax_params_base, nro_expediente
                 )
-
-                r_movs = session.get(config.AJAX_MOVIMIENTOS_URL, params=ajax_params)
-                if len(r_movs.text) < 200:
-                    break
-
-                movs_pagina = parsers.parsear_movimientos_de_ajax_html(
-                    r_movs.text, nro_expediente
+            except requests.RequestException as e:
+                logger.error(
+                    "Error de red obteniendo movimientos de %s: %s", nro_expediente, e
                 )
-                if not movs_pagina:
-                    break
-
-                movimientos.extend(movs_pagina)
-                offset += 10
-                mov_page_count += 1
-                time.sleep(0.25)
+                movimientos = None
+
+    # Un historial que no pudo descargarse no equivale a uno vacío: el expediente
+    # queda pendiente en lugar de consolidarse con datos viejos o incompletos.
+    if movimientos is None:
+        return (
+            f"Error: No se pudieron obtener los movimientos de {nombre_base}. "
+            "Intente nuevamente."
+        )
 
     dir_movimientos = os.path.join(ruta_usuario, config.MOVIMIENTOS_OUTPUT_DIR)
     dir_docs = os.path.join(ruta_usuario, config.DOCUMENTOS_OUTPUT_DIR)
@@ -160,8 +142,9 @@ def ejecutar_fase_descarga_publica(
                                 session, p["url"], ruta_pdf
                             ):
                                 total_descargados += 1
-                                time.sleep(0.2)
 
+            except SesionExpiradaError:
+                raise
             except Exception as e:
                 logger.error("Error procesando doc %s: %s", id_correlativo, e)
 
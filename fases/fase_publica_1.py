@@ -25,7 +25,7 @@ def ejecutar_fase_publica(cookies: dict, username: str) -> Dict[str, Any]:
         Diccionario con el estado de la operación, conteo de expedientes y archivo generado.
     """
     logger.info("--- Iniciando Fase Publica Masiva para el usuario: %s ---", username)
-    session = session_manager.crear_sesion_con_cookies(cookies)
+    session = session_manager.crear_sesion_con_cookies(cookies, username)
 
     try:
         expedientes_totales = []
@@ -1,7 +1,6 @@
 """Módulo para la sincronización y descarga de un expediente privado individual."""
 
 import os
-import time
 import requests
 from celery.utils.log import get_task_logger
 
@@ -9,6 +8,7 @@ import config
 import db_manager
 import scraper_tasks
 import utils
+from session_manager import SesionExpiradaError
 from utils import manejar_fase_con_sesion
 
 logger = get_task_logger(__name__)
@@ -30,9 +30,8 @@ def ejecutar_fase_unico(
         Cadena de texto con las métricas finales de la operación.
     """
     ruta_usuario = utils.obtener_ruta_usuario(username)
-    expedientes = db_manager.obtener_expedientes(username, origen="PRIVADO")
-    expediente_data = next(
-        (e for e in expedientes if e.get("expediente") == nro_expediente_objetivo), None
+    expediente_data = db_manager.obtener_expediente_por_numero(
+        username, nro_expediente_objetivo, origen="PRIVADO"
     )
 
     if not expediente_data:
@@ -52,11 +51,14 @@ def ejecutar_fase_unico(
     )
 
     if movimientos_nuevos:
+        registrados = db_manager.upsert_movimientos(
+            expediente_data.get("id"), movimientos_nuevos
+        )
         logger.info(
-            "  > Insertando %d movimientos en la base de datos.",
+            "  > %d movimientos leídos, %d nuevos en la base de datos.",
             len(movimientos_nuevos),
+            registrados,
         )
-        db_manager.upsert_movimientos(expediente_data.get("id"), movimientos_nuevos)
 
     movimientos_completos = db_manager.obtener_movimientos(expediente_data.get("id"))
     if not movimientos_completos:
@@ -122,8 +124,9 @@ def ejecutar_fase_unico(
                                 session, p["url"], ruta_pdf
                             ):
                                 total_descargados += 1
-                                time.sleep(0.2)
 
+            except SesionExpiradaError:
+                raise
             except Exception as e:
                 logger.error("    > Error procesando doc %s: %s", id_correlativo, e)
 
@@ -0,0 +1,10 @@
+"""Configuración de gunicorn, que la lee al iniciar desde el directorio de trabajo."""
+
+import base_datos
+
+
+def on_starting(_server):
+    """Deja el esquema al día una sola vez, antes de que el maestro cree los workers."""
+    base_datos.inicializar_esquema()
+    # Los workers abren sus propias conexiones; no deben heredar las del maestro.
+    base_datos.obtener_engine().dispose()
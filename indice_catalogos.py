@@ -0,0 +1,127 @@
+"""Módulo que expone los catálogos estáticos a la interfaz web con versión e índice de búsqueda."""
+
+import bisect
+import hashlib
+import itertools
+import json
+import os
+import unicodedata
+from typing import Dict, List, Set, Tuple
+
+from catalogos.abogados import ABOGADOS
+from catalogos.dependencias import DEPENDENCIAS_POR_LOCALIDAD
+from catalogos.localidades import LOCALIDADES
+from catalogos.tipos_juicio import TIPOS_JUICIO
+
+CATALOGOS: Dict[str, Dict] = {
+    "localidades": LOCALIDADES,
+    "tipos_juicio": TIPOS_JUICIO,
+    "abogados": ABOGADOS,
+    "dependencias": DEPENDENCIAS_POR_LOCALIDAD,
+}
+
+LIMITE_SUGERENCIAS: int = 30
+
+_DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Archivos que dan forma a las respuestas de /catalogos: la plantilla de opciones
+# y las vistas que la completan. Un cambio en ellos altera la respuesta aunque los
+# datos sean los mismos.
+_ARCHIVOS_PRESENTACION = (
+    os.path.join(_DIRECTORIO, "templates", "_fragmento_opciones.html"),
+    os.path.join(_DIRECTORIO, "app.py"),
+)
+
+
+def _huella(contenido: object) -> str:
+    serializado = json.dumps(contenido, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(serializado.encode("utf-8")).hexdigest()
+
+
+def _huella_archivos(rutas: Tuple[str, ...]) -> str:
+    digest = hashlib.sha1()
+    for ruta in rutas:
+        with open(ruta, "rb") as archivo:
+            digest.update(archivo.read())
+    return digest.hexdigest()
+
+
+# Los catálogos y su presentación solo cambian con un despliegue: las huellas se
+# calculan una vez por proceso y bastan para validar las copias de los navegadores.
+_VERSIONES: Dict[str, str] = {nombre: _huella(c) for nombre, c in CATALOGOS.items()}
+_VERSION_PRESENTACION: str = _huella_archivos(_ARCHIVOS_PRESENTACION)
+VERSION: str = _huella([_VERSIONES, _VERSION_PRESENTACION])[:12]
+
+
+def etag(nombre: str, *variantes: str) -> str:
+    """
+    Calcula la ETag fuerte de una representación de un catálogo.
+
+    Args:
+        nombre: Nombre del catálogo en CATALOGOS.
+        *variantes: Formato y parámetros que alteran la respuesta (filtro,
+            opción seleccionada, etc.).
+
+    Returns:
+        Hash hexadecimal que cambia si cambia el catálogo, la plantilla o las
+        vistas que lo presentan, o alguna variante.
+    """
+    partes = "\x1f".join((_VERSIONES[nombre], _VERSION_PRESENTACION) + variantes)
+    return hashlib.sha1(partes.encode("utf-8")).hexdigest()
+
+
+def _normalizar(texto: str) -> str:
+    descompuesto = unicodedata.normalize("NFKD", texto.upper())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def _tokens(texto: str) -> List[str]:
+    return [t for t in _normalizar(texto).replace("-", " ").split() if t]
+
+
+def _construir_indice(catalogo: Dict[str, str]) -> List[Tuple[str, str]]:
+    # Lista ordenada de (token, id): los tokens que empiezan con un prefijo quedan
+    # contiguos y se ubican con dos búsquedas binarias.
+    return sorted(
+        {(token, clave) for clave, texto in catalogo.items() for token in _tokens(texto)}
+    )
+
+
+_INDICE_ABOGADOS: List[Tuple[str, str]] = _construir_indice(ABOGADOS)
+
+
+def _claves_con_prefijo(indice: List[Tuple[str, str]], prefijo: str) -> Set[str]:
+    inicio = bisect.bisect_left(indice, (prefijo, ""))
+    claves: Set[str] = set()
+    for token, clave in itertools.islice(indice, inicio, None):
+        if not token.startswith(prefijo):
+            break
+        claves.add(clave)
+    return claves
+
+
+def buscar_abogados(texto: str, limite: int = LIMITE_SUGERENCIAS) -> List[Tuple[str, str]]:
+    """
+    Busca abogados cuyo apellido, nombre, DNI o matrícula empiecen con cada palabra.
+
+    La comparación ignora mayúsculas y tildes: "acev" encuentra a "ACEVEDO" y
+    "perez mar" exige ambos prefijos en el mismo abogado.
+
+    Args:
+        texto: Palabras ingresadas por el usuario.
+        limite: Máximo de resultados a devolver.
+
+    Returns:
+        Lista de pares (id, descripción) ordenada por descripción.
+    """
+    prefijos = _tokens(texto)
+    if not prefijos:
+        return []
+
+    claves = _claves_con_prefijo(_INDICE_ABOGADOS, prefijos[0])
+    for prefijo in prefijos[1:]:
+        if not claves:
+            break
+        claves &= _claves_con_prefijo(_INDICE_ABOGADOS, prefijo)
+
+    return sorted(((c, ABOGADOS[c]) for c in claves), key=lambda par: par[1])[:limite]
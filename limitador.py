@@ -0,0 +1,226 @@
+"""Módulo de limitación de tasa compartida entre workers para las peticiones a SIPED."""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import redis
+
+import config
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Cubeta de tokens con deuda: cada petición consume un token aunque la cubeta esté
+# vacía y recibe el tiempo que debe esperar hasta que ese token se genere. Así el
+# turno queda reservado en una sola ida y vuelta a Redis y sin sondeos.
+_SCRIPT_CUBETA = """
+local tasa = tonumber(ARGV[1])
+local capacidad = tonumber(ARGV[2])
+local reloj = redis.call('TIME')
+local ahora = tonumber(reloj[1]) + tonumber(reloj[2]) / 1000000
+local datos = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(datos[1]) or capacidad
+local ts = tonumber(datos[2]) or ahora
+tokens = math.min(capacidad, tokens + math.max(0, ahora - ts) * tasa) - 1
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', ahora)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacidad / tasa) + 60)
+if tokens >= 0 then
+    return '0'
+end
+return tostring(-tokens / tasa)
+"""
+
+_PAUSA_TRAS_FALLO_REDIS = 30.0
+
+
+def categoria_de_url(url: str) -> Optional[str]:
+    """
+    Clasifica una petición según el presupuesto de tasa que le corresponde.
+
+    Args:
+        url: Dirección de la petición.
+
+    Returns:
+        Nombre de la categoría, o None si el destino no es SIPED.
+    """
+    partes = urlparse(url)
+    if partes.netloc != urlparse(config.BASE_URL).netloc:
+        return None
+
+    ruta = partes.path.lower()
+    if "ver_mas_escritosajax.php" in ruta:
+        return "movimientos"
+    if "submit_buscar_abogado.php" in ruta or ruta.endswith("/buscar/submit.php"):
+        return "lista"
+    if (
+        "pdfabogado" in ruta
+        or "agrega_plantilla" in ruta
+        or "ver_adjunto_escrito" in ruta
+        or "descargar" in ruta
+    ):
+        return "descargas"
+    return "general"
+
+
+class _CubetaLocal:
+    """Cubeta de tokens en memoria usada cuando Redis no está disponible."""
+
+    def __init__(self, tasa: float, capacidad: int) -> None:
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self.tokens = float(capacidad)
+        self.ts = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reservar(self) -> float:
+        with self._lock:
+            ahora = time.monotonic()
+            self.tokens = (
+                min(self.capacidad, self.tokens + (ahora - self.ts) * self.tasa) - 1
+            )
+            self.ts = ahora
+            return max(0.0, -self.tokens / self.tasa)
+
+
+class LimitadorTasa:
+    """
+    Limitador de tasa por categoría de endpoint respaldado en Redis.
+
+    Todos los workers que comparten `REDIS_URL` consumen de las mismas cubetas, por
+    lo que la tasa total contra SIPED se mantiene al escalar horizontalmente. Si
+    Redis no responde se degrada a cubetas locales del proceso.
+    """
+
+    def __init__(
+        self,
+        url_redis: Optional[str] = None,
+        limites: Optional[Dict[str, float]] = None,
+        capacidad: Optional[int] = None,
+    ) -> None:
+        self.url_redis = url_redis or config.REDIS_URL
+        self.limites = limites or config.LIMITES_TASA
+        self.capacidad = capacidad or config.CAPACIDAD_RAFAGA
+        self._cliente: Optional[redis.Redis] = None
+        self._script = None
+        self._redis_suspendido_hasta = 0.0
+        self._cubetas_locales: Dict[str, _CubetaLocal] = {}
+        self._lock = threading.Lock()
+
+    def _limites_de(self, categoria: str) -> Tuple[float, int]:
+        tasa = self.limites.get(categoria) or self.limites.get("general", 1.0)
+        return float(tasa), self.capacidad
+
+    def _reservar_en_redis(self, categoria: str) -> Optional[float]:
+        if time.monotonic() < self._redis_suspendido_hasta:
+            return None
+
+        try:
+            if self._cliente is None:
+                self._cliente = redis.Redis.from_url(
+                    self.url_redis, socket_connect_timeout=1, socket_timeout=1
+                )
+                self._script = self._cliente.register_script(_SCRIPT_CUBETA)
+
+            tasa, capacidad = self._limites_de(categoria)
+            espera = self._script(
+                keys=[f"siped:limitador:{categoria}"], args=[tasa, capacidad]
+            )
+            return float(espera)
+        except redis.RedisError as e:
+            logger.warning(
+                "Limitador sin acceso a Redis (%s). Se usan cubetas locales por %ds.",
+                e,
+                _PAUSA_TRAS_FALLO_REDIS,
+            )
+            self._redis_suspendido_hasta = time.monotonic() + _PAUSA_TRAS_FALLO_REDIS
+            return None
+
+    def _reservar_local(self, categoria: str) -> float:
+        with self._lock:
+            if categoria not in self._cubetas_locales:
+                self._cubetas_locales[categoria] = _CubetaLocal(
+                    *self._limites_de(categoria)
+                )
+            cubeta = self._cubetas_locales[categoria]
+        return cubeta.reservar()
+
+    def adquirir(self, categoria: Optional[str]) -> float:
+        """
+        Bloquea hasta que la categoría disponga de un token para emitir la petición.
+
+        Args:
+            categoria: Presupuesto a consumir; None no aplica limitación.
+
+        Returns:
+            Segundos efectivamente esperados.
+        """
+        if categoria is None:
+            return 0.0
+
+        espera = self._reservar_en_redis(categoria)
+        if espera is None:
+            espera = self._reservar_local(categoria)
+
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+
+class PacerAIMD:
+    """
+    Regula el ritmo de peticiones del proceso según la latencia de SIPED.
+
+    Sigue el esquema AIMD: mientras la latencia se mantiene bajo el objetivo la
+    tasa crece de forma aditiva; ante latencias altas o señales de sobrecarga se
+    reduce de forma multiplicativa. Actúa por debajo del tope global del limitador.
+    """
+
+    def __init__(
+        self,
+        latencia_objetivo: Optional[float] = None,
+        tasa_minima: Optional[float] = None,
+        tasa_maxima: Optional[float] = None,
+        incremento: float = 0.5,
+        factor_reduccion: float = 0.5,
+    ) -> None:
+        self.latencia_objetivo = latencia_objetivo or config.AIMD_LATENCIA_OBJETIVO
+        self.tasa_minima = tasa_minima or config.AIMD_TASA_MINIMA
+        self.tasa_maxima = tasa_maxima or config.AIMD_TASA_MAXIMA
+        self.incremento = incremento
+        self.factor_reduccion = factor_reduccion
+        self.tasa = self.tasa_maxima
+        self._proximo_turno = 0.0
+        self._lock = threading.Lock()
+
+    def esperar_turno(self) -> float:
+        """
+        Bloquea hasta respetar el intervalo correspondiente a la tasa actual.
+
+        Returns:
+            Segundos esperados.
+        """
+        with self._lock:
+            ahora = time.monotonic()
+            inicio = max(ahora, self._proximo_turno)
+            self._proximo_turno = inicio + 1.0 / self.tasa
+            espera = inicio - ahora
+
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+    def registrar(self, latencia: float, sobrecarga: bool = False) -> None:
+        """
+        Ajusta la tasa a partir del resultado de una petición.
+
+        Args:
+            latencia: Segundos hasta recibir la respuesta.
+            sobrecarga: True ante timeouts o estados 429/503.
+        """
+        with self._lock:
+            if sobrecarga or latencia > self.latencia_objetivo:
+                self.tasa = max(self.tasa_minima, self.tasa * self.factor_reduccion)
+            else:
+                self.tasa = min(self.tasa_maxima, self.tasa + self.incremento)
@@ -0,0 +1,227 @@
+"""Módulo de migraciones versionadas del esquema de la base de datos."""
+
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, List, Tuple, Union
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+_TABLA_VERSION = "esquema_version"
+
+
+def _agregar_columna(conexion: Connection, tabla: str, columna: str, tipo: str) -> None:
+    existentes = {c["name"] for c in inspect(conexion).get_columns(tabla)}
+    if columna not in existentes:
+        conexion.execute(text(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}"))
+
+
+def _columnas_sincronizacion(conexion: Connection) -> None:
+    _agregar_columna(
+        conexion, "expedientes", "fec_ult_mov_sincronizado", "VARCHAR(20)"
+    )
+    _agregar_columna(conexion, "expedientes", "movimientos_sincronizados", "INTEGER")
+
+
+def _columnas_clave_movimiento(conexion: Connection) -> None:
+    _agregar_columna(conexion, "movimientos", "clave", "VARCHAR(48)")
+    _agregar_columna(conexion, "movimientos", "posicion", "INTEGER")
+
+
+def _unicidad_expedientes(conexion: Connection) -> None:
+    # Versiones anteriores podían registrar el mismo expediente dos veces. Las copias
+    # se fusionan en la de menor id: sus movimientos pasan a ella salvo los que ya
+    # tiene (por clave o, si aún no la tienen, por contenido) y luego se eliminan.
+    grupos: Dict[Tuple[Any, ...], List[int]] = defaultdict(list)
+    for fila in conexion.execute(
+        text(
+            "SELECT id, usuario_asignado, numero_expediente, origen "
+            "FROM expedientes ORDER BY id"
+        )
+    ):
+        grupos[tuple(fila[1:])].append(fila[0])
+
+    columnas = [
+        c["name"]
+        for c in inspect(conexion).get_columns("movimientos")
+        if c["name"] not in ("id", "expediente_id", "clave", "posicion")
+    ]
+    seleccion = text(
+        f"SELECT {', '.join(['id', 'clave'] + columnas)} FROM movimientos "
+        "WHERE expediente_id = :expediente_id ORDER BY id"
+    )
+
+    def _identidad(movimiento: Any) -> Any:
+        return movimiento["clave"] or tuple(movimiento[c] for c in columnas)
+
+    fusionados = 0
+    for conservado, *copias in (ids for ids in grupos.values() if len(ids) > 1):
+        presentes = Counter(
+            _identidad(m)
+            for m in conexion.execute(
+                seleccion, {"expediente_id": conservado}
+            ).mappings()
+        )
+        for copia in copias:
+            trasladados = []
+            for movimiento in conexion.execute(
+                seleccion, {"expediente_id": copia}
+            ).mappings().all():
+                identidad = _identidad(movimiento)
+                if presentes[identidad]:
+                    presentes[identidad] -= 1
+                    conexion.execute(
+                        text("DELETE FROM movimientos WHERE id = :id"),
+                        {"id": movimiento["id"]},
+                    )
+                    continue
+                conexion.execute(
+                    text(
+                        "UPDATE movimientos SET expediente_id = :destino "
+                        "WHERE id = :id"
+                    ),
+                    {"destino": conservado, "id": movimiento["id"]},
+                )
+                trasladados.append(identidad)
+            presentes.update(trasladados)
+            conexion.execute(
+                text("DELETE FROM expedientes WHERE id = :id"), {"id": copia}
+            )
+            fusionados += 1
+
+    if fusionados:
+        logger.warning(
+            "Se fusionaron %d expedientes duplicados con su primer registro.",
+            fusionados,
+        )
+    conexion.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_expedientes_usuario_numero_origen "
+            "ON expedientes (usuario_asignado, numero_expediente, origen)"
+        )
+    )
+
+
+def _indices_compuestos(conexion: Connection) -> None:
+    # obtener_expedientes filtra por usuario y origen, y la descarga de resultados
+    # públicos ubica el expediente por su enlace; el índice único cubre las
+    # búsquedas por número. Los movimientos se leen siempre por expediente y en el
+    # orden de SIPED, y el upsert los cruza por clave dentro del expediente.
+    conexion.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_expedientes_usuario_origen_link "
+            "ON expedientes (usuario_asignado, origen, link_detalle)"
+        )
+    )
+    conexion.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_movimientos_expediente_posicion "
+            "ON movimientos (expediente_id, posicion)"
+        )
+    )
+    conexion.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_movimientos_expediente_clave "
+            "ON movimientos (expediente_id, clave)"
+        )
+    )
+    for redundante in (
+        "ix_expedientes_usuario_asignado",
+        "ix_expedientes_origen",
+        "ix_movimientos_clave",
+    ):
+        conexion.execute(text(f"DROP INDEX IF EXISTS {redundante}"))
+
+
+MIGRACIONES: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Estado de sincronización de expedientes", _columnas_sincronizacion),
+    (2, "Clave natural y posición de movimientos", _columnas_clave_movimiento),
+    (3, "Unicidad de expedientes por usuario, número y origen", _unicidad_expedientes),
+    (4, "Índices compuestos según los patrones de consulta", _indices_compuestos),
+]
+
+
+def _conectar(destino: Union[Engine, Connection]) -> ContextManager[Connection]:
+    return nullcontext(destino) if isinstance(destino, Connection) else destino.connect()
+
+
+def _transaccion(destino: Union[Engine, Connection]) -> ContextManager[Connection]:
+    return nullcontext(destino) if isinstance(destino, Connection) else destino.begin()
+
+
+def obtener_version(engine: Union[Engine, Connection]) -> int:
+    """
+    Devuelve la última migración aplicada sobre la base.
+
+    Args:
+        engine: Motor de la base de datos, o una conexión abierta sobre ella.
+
+    Returns:
+        Número de versión, o 0 si nunca se aplicaron migraciones.
+    """
+    if not inspect(engine).has_table(_TABLA_VERSION):
+        return 0
+    with _conectar(engine) as conexion:
+        version = conexion.execute(
+            text(f"SELECT MAX(version) FROM {_TABLA_VERSION}")
+        ).scalar()
+    return version or 0
+
+
+def aplicar_migraciones(engine: Union[Engine, Connection]) -> int:
+    """
+    Aplica en orden las migraciones pendientes, cada una en su propia transacción.
+
+    Las migraciones son idempotentes: una base creada desde cero con create_all
+    ya tiene el esquema final y solo se registran sus versiones.
+
+    Args:
+        engine: Motor de la base de datos. Si se pasa una conexión, todas las
+            migraciones se aplican dentro de su transacción en curso.
+
+    Returns:
+        Cantidad de migraciones aplicadas.
+    """
+    with _transaccion(engine) as conexion:
+        conexion.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {_TABLA_VERSION} ("
+                "version INTEGER PRIMARY KEY, descripcion VARCHAR(255) NOT NULL, "
+                "aplicada FLOAT NOT NULL)"
+            )
+        )
+
+    version_actual = obtener_version(engine)
+    aplicadas = 0
+    for version, descripcion, migracion in MIGRACIONES:
+        if version <= version_actual:
+            continue
+        logger.info("Aplicando migración %d: %s.", version, descripcion)
+        try:
+            with _transaccion(engine) as conexion:
+                migracion(conexion)
+                conexion.execute(
+                    text(
+                        f"INSERT INTO {_TABLA_VERSION} (version, descripcion, aplicada) "
+                        "VALUES (:version, :descripcion, :aplicada)"
+                    ),
+                    {
+                        "version": version,
+                        "descripcion": descripcion,
+                        "aplicada": time.time(),
+                    },
+                )
+        except IntegrityError:
+            if isinstance(engine, Connection):
+                raise
+            # Otro proceso (web o worker) la registró en paralelo.
+            logger.info("La migración %d ya fue aplicada por otro proceso.", version)
+            continue
+        aplicadas += 1
+    return aplicadas
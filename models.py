@@ -1,27 +1,47 @@
 """Modelos de la base de datos para la aplicación SIPED."""
 
-from extensions import db
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
 
+from base_datos import Base
 
-class Expediente(db.Model):
+
+class Expediente(Base):
     """Modelo que representa un expediente judicial en el sistema."""
 
     __tablename__ = "expedientes"
+    __table_args__ = (
+        Index(
+            "uq_expedientes_usuario_numero_origen",
+            "usuario_asignado",
+            "numero_expediente",
+            "origen",
+            unique=True,
+        ),
+        Index(
+            "ix_expedientes_usuario_origen_link",
+            "usuario_asignado",
+            "origen",
+            "link_detalle",
+        ),
+    )
 
-    id = db.Column(db.Integer, primary_key=True)
-    usuario_asignado = db.Column(db.String(50), nullable=False, index=True)
-    numero_expediente = db.Column(db.String(50), nullable=False)
-    caratula = db.Column(db.String(255), nullable=False)
-    partes = db.Column(db.String(255), nullable=True)
-    estado = db.Column(db.String(50), nullable=True)
-    fec_ult_mov = db.Column(db.String(20), nullable=True)
-    localidad = db.Column(db.String(100), nullable=True)
-    dependencia = db.Column(db.String(100), nullable=True)
-    secretaria = db.Column(db.String(100), nullable=True)
-    link_detalle = db.Column(db.String(255), nullable=True)
-
-    origen = db.Column(db.String(50), default="PRIVADO", index=True)
-    movimientos = db.relationship(
+    id = Column(Integer, primary_key=True)
+    usuario_asignado = Column(String(50), nullable=False)
+    numero_expediente = Column(String(50), nullable=False)
+    caratula = Column(String(255), nullable=False)
+    partes = Column(String(255), nullable=True)
+    estado = Column(String(50), nullable=True)
+    fec_ult_mov = Column(String(20), nullable=True)
+    localidad = Column(String(100), nullable=True)
+    dependencia = Column(String(100), nullable=True)
+    secretaria = Column(String(100), nullable=True)
+    link_detalle = Column(String(255), nullable=True)
+    fec_ult_mov_sincronizado = Column(String(20), nullable=True)
+    movimientos_sincronizados = Column(Integer, nullable=True)
+
+    origen = Column(String(50), default="PRIVADO")
+    movimientos = relationship(
         "Movimiento", backref="expediente", lazy=True, cascade="all, delete-orphan"
     )
 
@@ -29,24 +49,32 @@ class Expediente(db.Model):
         return f"<Expediente {self.numero_expediente} ({self.usuario_asignado}) - {self.origen}>"
 
 
-class Movimiento(db.Model):
+class Movimiento(Base):
     """Modelo que representa un movimiento o escrito dentro de un expediente."""
 
     __tablename__ = "movimientos"
+    __table_args__ = (
+        Index("ix_movimientos_expediente_posicion", "expediente_id", "posicion"),
+        Index(
+            "uq_movimientos_expediente_clave", "expediente_id", "clave", unique=True
+        ),
+    )
 
-    id = db.Column(db.Integer, primary_key=True)
-    expediente_id = db.Column(
-        db.Integer, db.ForeignKey("expedientes.id"), nullable=False
+    id = Column(Integer, primary_key=True)
+    expediente_id = Column(
+        Integer, ForeignKey("expedientes.id"), nullable=False
     )
-    fecha_presentacion = db.Column(db.String(50), nullable=True)
-    nombre_escrito = db.Column(db.String(255), nullable=True)
-    tipo = db.Column(db.String(100), nullable=True)
-    estado = db.Column(db.String(50), nullable=True)
-    generado_por = db.Column(db.String(100), nullable=True)
-    descripcion = db.Column(db.Text, nullable=True)
-    fecha_firma = db.Column(db.String(50), nullable=True)
-    fecha_publicacion = db.Column(db.String(50), nullable=True)
-    link_escrito = db.Column(db.String(255), nullable=True)
+    clave = Column(String(48), nullable=True)
+    posicion = Column(Integer, nullable=True)
+    fecha_presentacion = Column(String(50), nullable=True)
+    nombre_escrito = Column(String(255), nullable=True)
+    tipo = Column(String(100), nullable=True)
+    estado = Column(String(50), nullable=True)
+    generado_por = Column(String(100), nullable=True)
+    descripcion = Column(Text, nullable=True)
+    fecha_firma = Column(String(50), nullable=True)
+    fecha_publicacion = Column(String(50), nullable=True)
+    link_escrito = Column(String(255), nullable=True)
 
     def __repr__(self) -> str:
         return f"<Movimiento {self.nombre_escrito} - {self.fecha_presentacion}>"
@@ -0,0 +1,137 @@
+"""Motor asíncrono que expone las tareas de scraping como corrutinas."""
+
+import asyncio
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import requests
+
+import config
+import scraper_tasks
+
+
+async def descargar_archivo(
+    session: requests.Session, url: str, ruta_destino: str
+) -> bool:
+    """Versión asíncrona de scraper_tasks.descargar_archivo."""
+    return await asyncio.to_thread(
+        scraper_tasks.descargar_archivo, session, url, ruta_destino
+    )
+
+
+async def raspar_movimientos_de_expediente(
+    session: requests.Session,
+    expediente_dict: Dict[str, Any],
+    previos: Optional[List[Dict[str, Any]]] = None,
+) -> Optional[List[Dict[str, str]]]:
+    """Versión asíncrona de scraper_tasks.raspar_movimientos_de_expediente."""
+    argumentos = (session, expediente_dict) + ((previos,) if previos else ())
+    return await asyncio.to_thread(
+        scraper_tasks.raspar_movimientos_de_expediente, *argumentos
+    )
+
+
+async def raspar_contenido_documento(
+    session: requests.Session, document_url: str
+) -> Optional[Dict[str, Any]]:
+    """Versión asíncrona de scraper_tasks.raspar_contenido_documento."""
+    return await asyncio.to_thread(
+        scraper_tasks.raspar_contenido_documento, session, document_url
+    )
+
+
+def _obtener_texto(
+    session: requests.Session, url: str, params: Dict[str, Any]
+) -> str:
+    respuesta = session.get(url, params=params, timeout=30)
+    respuesta.raise_for_status()
+    return respuesta.text
+
+
+async def obtener_paginas(
+    session: requests.Session,
+    url: str,
+    lista_params: Sequence[Dict[str, Any]],
+    max_simultaneos: Optional[int] = None,
+) -> List[Tuple[Optional[str], Optional[Exception]]]:
+    """
+    Descarga en paralelo varias páginas de un mismo listado.
+
+    Args:
+        session: Sesión HTTP activa.
+        url: Dirección del listado.
+        lista_params: Parámetros de consulta de cada página.
+        max_simultaneos: Páginas en curso como máximo.
+
+    Returns:
+        Tuplas (html, error) en el mismo orden que `lista_params`.
+    """
+    limite = asyncio.Semaphore(max_simultaneos or config.PAGINAS_LISTA_SIMULTANEAS)
+
+    async def _obtener(
+        params: Dict[str, Any],
+    ) -> Tuple[Optional[str], Optional[Exception]]:
+        async with limite:
+            try:
+                return (
+                    await asyncio.to_thread(_obtener_texto, session, url, params),
+                    None,
+                )
+            except Exception as e:
+                return None, e
+
+    return await asyncio.gather(*(_obtener(p) for p in lista_params))
+
+
+async def raspar_movimientos_en_lote(
+    session: requests.Session,
+    expedientes: Sequence[Dict[str, Any]],
+    max_simultaneos: Optional[int] = None,
+    historiales_previos: Optional[Mapping[Any, List[Dict[str, Any]]]] = None,
+) -> AsyncIterator[
+    Tuple[Dict[str, Any], Optional[List[Dict[str, str]]], Optional[Exception]]
+]:
+    """
+    Extrae los movimientos de varios expedientes en paralelo.
+
+    La cantidad de peticiones simultáneas contra cada host y la demora entre ellas
+    las impone el planificador del adaptador HTTP; este parámetro solo acota cuántos
+    expedientes se mantienen en curso a la vez.
+
+    Args:
+        session: Sesión HTTP activa.
+        expedientes: Diccionarios de expedientes a procesar.
+        max_simultaneos: Expedientes en curso como máximo.
+        historiales_previos: Movimientos almacenados por ID de expediente; los
+            expedientes presentes se sincronizan de forma incremental.
+
+    Yields:
+        Tuplas (expediente, movimientos, error) a medida que cada uno finaliza.
+    """
+    limite = asyncio.Semaphore(max_simultaneos or config.MAX_CONCURRENCIA_POR_HOST)
+
+    async def _procesar(
+        expediente: Dict[str, Any],
+    ) -> Tuple[Dict[str, Any], Optional[List[Dict[str, str]]], Optional[Exception]]:
+        async with limite:
+            try:
+                movimientos = await raspar_movimientos_de_expediente(
+                    session,
+                    expediente,
+                    (historiales_previos or {}).get(expediente.get("id")),
+                )
+                return expediente, movimientos, None
+            except Exception as e:
+                return expediente, None, e
+
+    tareas = [asyncio.create_task(_procesar(e)) for e in expedientes]
+    for tarea in asyncio.as_completed(tareas):
+        yield await tarea
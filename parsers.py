@@ -1,17 +1,171 @@
 """Módulo de análisis HTML para extraer estructuras y datos del sistema judicial."""
 
+import functools
+import html
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
 
 import config
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+ContenidoHtml = Union[str, BeautifulSoup]
+
+# Regiones que algunos analizadores necesitan; el resto del marcado no se materializa.
+REGION_TABLAS = "tablas"
+REGION_PARAMETROS = "parametros"
+_FILTROS_REGION = {
+    REGION_TABLAS: SoupStrainer("table"),
+    REGION_PARAMETROS: SoupStrainer(["input", "script", "frame"]),
+}
+_PATRON_COMENTARIO = re.compile(r"<!--.*?-->", re.DOTALL)
+_PATRON_ATRIBUTO = re.compile(
+    r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?"""
+)
+_PATRON_SCRIPT = re.compile(
+    r"<script\b[^>]*>(.*?)</script\s*>", re.IGNORECASE | re.DOTALL
+)
+_PATRON_URL_REFRESH = re.compile(r'url=\s*[\'"]?([^\'">\s]+)', re.IGNORECASE)
+_PATRONES_SCRIPT_AJAX = {
+    "dependencia_ide": re.compile(r"dependencia_ide=(\d+)"),
+    "tj_fuero": re.compile(r"tj_fuero=(\d+)"),
+    "exp_organismo_origen": re.compile(r"exp_organismo_origen=(\d+)"),
+}
+_CLAVES_AJAX = frozenset({"exp_id", *_PATRONES_SCRIPT_AJAX})
+_PATRON_INICIO_TABLA = re.compile(r"<table", re.IGNORECASE)
+_PATRON_FIN_TABLA = re.compile(r"</table\s*>", re.IGNORECASE)
+
+# El formulario de acceso de SIPED envía "usuario" y "pass" a controli2.php. Otros
+# campos de contraseña (cambio de clave, firma) no indican una sesión expirada.
+_PATRON_CAMPO_CLAVE_LOGIN = re.compile(
+    r"<input(?=[^>]*\btype\s*=\s*[\'\"]?password)"
+    r"(?=[^>]*\bname\s*=\s*[\'\"]?pass[\'\"\s/>])",
+    re.IGNORECASE,
+)
+_PATRON_ACCION_FORMULARIO = re.compile(
+    r"<form[^>]+action\s*=\s*[\'\"]?([^\'\">\s]+)", re.IGNORECASE
+)
+_PATRON_META_REFRESH_URL = re.compile(
+    r"<meta[^>]+http-equiv\s*=\s*[\'\"]?refresh[^>]*url=\s*[\'\"]?([^\'\">\s]+)",
+    re.IGNORECASE,
+)
+_PATRON_DESTINO_LOGIN = re.compile(
+    r"login|controli|/servicios/?(index\.php)?$", re.IGNORECASE
+)
+_PATRON_INICIO = re.compile(r"inicio[=\s'\"]+(\d+)", re.IGNORECASE)
+_PATRON_TOTAL_REGISTROS = re.compile(
+    r"(?:\bde|total(?:\s+de)?:?)\s*(\d+)\s*(?:registros|expedientes|resultados)",
+    re.IGNORECASE,
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _resolver_motor(motor: str) -> str:
+    """Verifica que el motor de parsing esté instalado; si no, usa html.parser."""
+    if builder_registry.lookup(motor) is None:
+        logger.warning(
+            "Motor de parsing '%s' no disponible. Se usa 'html.parser'.", motor
+        )
+        return "html.parser"
+    return motor
+
+
+def _recortar_tablas(html_content: str) -> str:
+    """Descarta el texto anterior a la primera tabla y posterior a la última."""
+    inicio = _PATRON_INICIO_TABLA.search(html_content)
+    if not inicio:
+        return ""
+    fin = None
+    for fin in _PATRON_FIN_TABLA.finditer(html_content, inicio.start()):
+        pass
+    return html_content[inicio.start() : fin.end() if fin else len(html_content)]
+
+
+def crear_soup(html_content: str, region: Optional[str] = None) -> BeautifulSoup:
+    """
+    Construye el árbol DOM con el motor configurado en `PARSER_HTML`.
+
+    Todos los analizadores del módulo pasan por aquí, de modo que cambiar de
+    motor (por ejemplo a lxml, implementado en C) no altera los resultados.
+
+    Args:
+        html_content: Contenido HTML a analizar.
+        region: REGION_TABLAS o REGION_PARAMETROS para construir solo esa parte del
+            árbol; None analiza el documento completo.
+
+    Returns:
+        Árbol BeautifulSoup del documento.
+    """
+    if region == REGION_TABLAS:
+        html_content = _recortar_tablas(html_content)
+    return BeautifulSoup(
+        html_content,
+        _resolver_motor(config.PARSER_HTML),
+        parse_only=_FILTROS_REGION.get(region),
+    )
+
+
+def _como_soup(
+    contenido: ContenidoHtml, region: Optional[str] = None
+) -> BeautifulSoup:
+    """Reutiliza el árbol recibido o lo construye si se pasó el HTML en texto."""
+    if isinstance(contenido, BeautifulSoup):
+        return contenido
+    return crear_soup(contenido, region)
+
+
+def _escanear_etiquetas(html_content: str, nombre: str) -> Iterator[Dict[str, str]]:
+    """
+    Recorre las etiquetas de apertura de un tipo devolviendo sus atributos.
+
+    Replica lo que vería el DOM: ignora comentarios, normaliza los nombres de
+    atributo a minúsculas y decodifica las entidades de los valores.
+    """
+    patron = re.compile(rf"<{nombre}\b([^>]*)>", re.IGNORECASE)
+    for etiqueta in patron.finditer(_PATRON_COMENTARIO.sub("", html_content)):
+        atributos = {}
+        for clave, doble, simple, libre in _PATRON_ATRIBUTO.findall(etiqueta.group(1)):
+            atributos.setdefault(clave.lower(), html.unescape(doble or simple or libre))
+        yield atributos
+
+
+def _resolver_url_refresh(content: str, base_url: str) -> Optional[str]:
+    match = _PATRON_URL_REFRESH.search(content)
+    if not match:
+        return None
+    if not base_url.endswith("/"):
+        base_url += "/"
+    return urljoin(base_url, match.group(1))
+
+
+def _escanear_meta_refresh(html_content: str, base_url: str) -> Optional[str]:
+    for atributos in _escanear_etiquetas(html_content, "meta"):
+        if atributos.get("http-equiv", "").lower() == "refresh":
+            return _resolver_url_refresh(atributos.get("content", ""), base_url)
+    return None
+
+
+def _meta_refresh_dom(html_content: str, base_url: str) -> Optional[str]:
+    soup = crear_soup(html_content)
+    meta_refresh = soup.find(
+        "meta", attrs={"http-equiv": lambda x: x and x.lower() == "refresh"}
+    )
+    if meta_refresh:
+        return _resolver_url_refresh(meta_refresh.get("content", ""), base_url)
+    return None
 
 
 def obtener_url_meta_refresh(html_content: str, base_url: str) -> Optional[str]:
     """
     Extrae la URL de redireccionamiento contenida en una etiqueta meta refresh.
 
+    Primero recorre el texto con expresiones compiladas; el árbol DOM solo se
+    construye si el escaneo no encuentra la redirección.
+
     Args:
         html_content: Contenido HTML de la página.
         base_url: URL base para resolver la dirección relativa.
@@ -19,20 +173,27 @@ def obtener_url_meta_refresh(html_content: str, base_url: str) -> Optional[str]:
     Returns:
         URL absoluta de redireccionamiento o None si no se encuentra.
     """
-    soup = BeautifulSoup(html_content, "html.parser")
-    meta_refresh = soup.find(
-        "meta", attrs={"http-equiv": lambda x: x and x.lower() == "refresh"}
+    return _escanear_meta_refresh(html_content, base_url) or _meta_refresh_dom(
+        html_content, base_url
     )
 
-    if meta_refresh:
-        content = meta_refresh.get("content", "")
-        match = re.search(r'url=\s*[\'"]?([^\'">\s]+)', content, re.IGNORECASE)
-        if match:
-            url_relativa = match.group(1)
-            if not base_url.endswith("/"):
-                base_url += "/"
-            return urljoin(base_url, url_relativa)
 
+def _es_enlace_token(href: Optional[str]) -> bool:
+    return bool(href) and "token=" in href.lower() and "siped" in href.lower()
+
+
+def _escanear_enlace_token(html_content: str) -> Optional[str]:
+    for atributos in _escanear_etiquetas(html_content, "a"):
+        if _es_enlace_token(atributos.get("href")):
+            return urljoin(f"{config.BASE_URL}/servicios/", atributos["href"])
+    return None
+
+
+def _enlace_token_dom(html_content: str) -> Optional[str]:
+    soup = crear_soup(html_content)
+    enlace = soup.find("a", href=_es_enlace_token)
+    if enlace:
+        return urljoin(f"{config.BASE_URL}/servicios/", enlace.get("href"))
     return None
 
 
@@ -40,36 +201,58 @@ def obtener_enlace_token_siped(html_content: str) -> Optional[str]:
     """
     Extrae el token de sesión desde el menú principal del sistema.
 
+    Usa el escaneo con expresiones compiladas y recurre al DOM si no lo encuentra.
+
     Args:
         html_content: Contenido HTML del menú.
 
     Returns:
         URL completa con el token de sesión o None si falla la extracción.
     """
-    soup = BeautifulSoup(html_content, "html.parser")
-    enlace = soup.find(
-        "a",
-        href=lambda href: href and "token=" in href.lower() and "siped" in href.lower(),
-    )
+    return _escanear_enlace_token(html_content) or _enlace_token_dom(html_content)
 
-    if enlace:
-        base_url = f"{config.BASE_URL}/servicios/"
-        return urljoin(base_url, enlace.get("href"))
 
-    return None
+def es_pagina_login(html_content: str) -> bool:
+    """
+    Detecta si una respuesta corresponde al formulario de acceso o a una redirección
+    hacia él, señal de que la sesión de SIPED expiró.
 
+    Se reconoce por el campo de contraseña propio del login o por un formulario
+    que se envía a la página de acceso; cualquier otro campo de contraseña no
+    cuenta.
+
+    Args:
+        html_content: Contenido HTML recibido.
 
-def encontrar_siguiente_inicio_universal(html_text: str) -> Optional[int]:
+    Returns:
+        True si la página solicita autenticación.
+    """
+    if _PATRON_CAMPO_CLAVE_LOGIN.search(html_content):
+        return True
+    if any(
+        _PATRON_DESTINO_LOGIN.search(accion)
+        for accion in _PATRON_ACCION_FORMULARIO.findall(html_content)
+    ):
+        return True
+
+    refresh = _PATRON_META_REFRESH_URL.search(html_content)
+    if refresh:
+        return bool(_PATRON_DESTINO_LOGIN.search(refresh.group(1)))
+
+    return False
+
+
+def encontrar_siguiente_inicio_universal(html_text: ContenidoHtml) -> Optional[int]:
     """
     Busca el valor del parámetro de paginación para avanzar a la siguiente vista.
 
     Args:
-        html_text: Contenido HTML de la página paginada.
+        html_text: Contenido HTML de la página paginada, o su árbol ya analizado.
 
     Returns:
         Entero correspondiente al próximo índice de inicio, o None si no hay más páginas.
     """
-    soup = BeautifulSoup(html_text, "html.parser")
+    soup = _como_soup(html_text)
     for element in soup.find_all(["button", "a", "input"]):
         texto = element.get_text(strip=True).upper()
         valor = str(element.get("value", "")).upper()
@@ -91,24 +274,72 @@ def encontrar_siguiente_inicio_universal(html_text: str) -> Optional[int]:
     return None
 
 
-def encontrar_siguiente_pagina_inicio(html_content: str) -> Optional[int]:
+def encontrar_siguiente_pagina_inicio(html_content: ContenidoHtml) -> Optional[int]:
     """
     Alias de compatibilidad para la función encontrar_siguiente_inicio_universal.
     """
     return encontrar_siguiente_inicio_universal(html_content)
 
 
-def parsear_lista_expedientes(html_content: str) -> List[Dict[str, str]]:
+def detectar_paginacion(
+    html_text: ContenidoHtml, inicio_actual: int, filas_en_pagina: int
+) -> Optional[Tuple[int, int]]:
+    """
+    Deduce el tamaño de página y el último índice de inicio de un listado paginado.
+
+    El paso se toma del botón SIGUIENTE y solo se acepta si coincide con la cantidad
+    de filas de la página. El último inicio se obtiene del total de registros
+    informado o, en su defecto, del mayor enlace numerado de la paginación.
+
+    Args:
+        html_text: Contenido HTML de la página paginada, o su árbol ya analizado.
+        inicio_actual: Índice de inicio con el que se pidió la página.
+        filas_en_pagina: Registros extraídos de la página.
+
+    Returns:
+        Tupla (paso, ultimo_inicio), o None si la estructura es ambigua.
+    """
+    soup = _como_soup(html_text)
+    siguiente = encontrar_siguiente_inicio_universal(soup)
+    if siguiente is None or siguiente - inicio_actual != filas_en_pagina:
+        return None
+    paso = filas_en_pagina
+
+    match_total = _PATRON_TOTAL_REGISTROS.search(soup.get_text(" "))
+    if match_total:
+        total = int(match_total.group(1))
+        if total < inicio_actual + filas_en_pagina:
+            return None
+        ultimo_inicio = ((total - 1) // paso) * paso
+    else:
+        inicios = set()
+        for element in soup.find_all(["button", "a", "input"]):
+            contenido_logico = str(element.get("onclick", "")) + str(
+                element.get("href", "")
+            )
+            match = _PATRON_INICIO.search(contenido_logico)
+            if match:
+                inicios.add(int(match.group(1)))
+        if any((i - inicio_actual) % paso for i in inicios):
+            return None
+        ultimo_inicio = max(inicios, default=siguiente)
+
+    if ultimo_inicio <= siguiente:
+        return None
+    return paso, ultimo_inicio
+
+
+def parsear_lista_expedientes(html_content: ContenidoHtml) -> List[Dict[str, str]]:
     """
     Extrae los expedientes listados en la bandeja privada.
 
     Args:
-        html_content: HTML de la tabla de la bandeja privada.
+        html_content: HTML de la tabla de la bandeja privada, o su árbol ya analizado.
 
     Returns:
         Lista de diccionarios con los metadatos de cada expediente.
     """
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = _como_soup(html_content)
     tabla = soup.find("table", class_="table-striped")
     expedientes = []
 
@@ -165,17 +396,47 @@ def parsear_lista_expedientes(html_content: str) -> List[Dict[str, str]]:
     return expedientes
 
 
-def parsear_detalle_para_ajax_params(html_detalle: str) -> Dict[str, str]:
+def _escanear_parametros_ajax(html_detalle: str) -> Dict[str, str]:
+    params = {}
+    inputs = list(_escanear_etiquetas(html_detalle, "input"))
+    for nombre in ("id", "exp_id"):
+        input_id = next((i for i in inputs if i.get("name") == nombre), None)
+        if input_id is not None:
+            params["exp_id"] = input_id.get("value", "")
+            break
+
+    sin_comentarios = _PATRON_COMENTARIO.sub("", html_detalle)
+    for script in _PATRON_SCRIPT.finditer(sin_comentarios):
+        _buscar_parametros_en_script(script.group(1), params)
+    return params
+
+
+def _buscar_parametros_en_script(codigo: str, params: Dict[str, str]) -> None:
+    for clave, patron in _PATRONES_SCRIPT_AJAX.items():
+        match = patron.search(codigo)
+        if match:
+            params[clave] = match.group(1)
+
+
+def parsear_detalle_para_ajax_params(html_detalle: ContenidoHtml) -> Dict[str, str]:
     """
     Extrae los parámetros ocultos necesarios para construir la petición AJAX de movimientos.
 
+    Si recibe el HTML en texto intenta primero un escaneo con expresiones compiladas
+    y solo construye el árbol DOM cuando falta alguno de los parámetros.
+
     Args:
-        html_detalle: Contenido HTML del detalle del expediente.
+        html_detalle: Contenido HTML del detalle del expediente, o su árbol ya analizado.
 
     Returns:
         Diccionario con los parámetros clave-valor extraídos.
     """
-    soup = BeautifulSoup(html_detalle, "html.parser")
+    if isinstance(html_detalle, str):
+        params = _escanear_parametros_ajax(html_detalle)
+        if _CLAVES_AJAX <= params.keys():
+            return params
+
+    soup = _como_soup(html_detalle, REGION_PARAMETROS)
     params = {}
 
     input_id = soup.find("input", {"name": "id"}) or soup.find(
@@ -184,38 +445,27 @@ def parsear_detalle_para_ajax_params(html_detalle: str) -> Dict[str, str]:
     if input_id:
         params["exp_id"] = input_id.get("value", "")
 
-    scripts = soup.find_all("script")
-    for script in scripts:
+    for script in soup.find_all("script"):
         if script.string:
-            match_dep = re.search(r"dependencia_ide=(\d+)", script.string)
-            if match_dep:
-                params["dependencia_ide"] = match_dep.group(1)
-
-            match_fuero = re.search(r"tj_fuero=(\d+)", script.string)
-            if match_fuero:
-                params["tj_fuero"] = match_fuero.group(1)
-
-            match_org = re.search(r"exp_organismo_origen=(\d+)", script.string)
-            if match_org:
-                params["exp_organismo_origen"] = match_org.group(1)
+            _buscar_parametros_en_script(script.string, params)
 
     return params
 
 
 def parsear_movimientos_de_ajax_html(
-    html_content: str, expediente_nro: str
+    html_content: ContenidoHtml, expediente_nro: str
 ) -> List[Dict[str, str]]:
     """
     Extrae la lista de movimientos renderizados dinámicamente vía AJAX.
 
     Args:
-        html_content: Contenido HTML de la respuesta AJAX.
+        html_content: Contenido HTML de la respuesta AJAX, o su árbol ya analizado.
         expediente_nro: Número de expediente asociado.
 
     Returns:
         Lista de diccionarios representando los movimientos del expediente.
     """
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = _como_soup(html_content, REGION_TABLAS)
     tabla = soup.find("table", class_="table-hover") or soup.find("table")
     movimientos = []
 
@@ -300,17 +550,17 @@ def normalizar_url_pdf(url_sucia: str, tipo: str = "principal") -> str:
     return url_resuelta
 
 
-def parsear_pagina_documento(html_content: str) -> Dict[str, Any]:
+def parsear_pagina_documento(html_content: ContenidoHtml) -> Dict[str, Any]:
     """
     Extrae los metadatos y enlaces de los documentos PDF adjuntos y resoluciones.
 
     Args:
-        html_content: HTML de la visualización del documento.
+        html_content: HTML de la visualización del documento, o su árbol ya analizado.
 
     Returns:
         Diccionario estructurado con la URL principal, adjuntos y los firmantes.
     """
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = _como_soup(html_content)
     data = {"url_pdf_principal": None, "adjuntos": [], "firmantes": []}
 
     link_principal = soup.find(
@@ -350,17 +600,17 @@ def parsear_pagina_documento(html_content: str) -> Dict[str, Any]:
     return data
 
 
-def parsear_lista_publica(html_content: str) -> List[Dict[str, Optional[str]]]:
+def parsear_lista_publica(html_content: ContenidoHtml) -> List[Dict[str, Optional[str]]]:
     """
     Extrae los expedientes de la tabla de resultados de la búsqueda pública.
 
     Args:
-        html_content: HTML devuelto por la consulta pública.
+        html_content: HTML devuelto por la consulta pública, o su árbol ya analizado.
 
     Returns:
         Lista de diccionarios con metadatos de los expedientes encontrados.
     """
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = _como_soup(html_content)
     tabla = soup.find("table", class_="table-striped")
     expedientes = []
 
@@ -400,3 +650,56 @@ def parsear_lista_publica(html_content: str) -> List[Dict[str, Optional[str]]]:
 
     return expedientes
 
+
+class PaginaSiped:
+    """
+    Respuesta HTML de SIPED analizada una única vez.
+
+    El árbol DOM se construye en el primer acceso y cada dato derivado (filas,
+    paginación, parámetros AJAX) se calcula bajo demanda sobre ese mismo árbol, de
+    modo que los bucles de scraping no vuelven a analizar la misma respuesta. Con
+    una región solo se construye la parte del árbol que necesitan sus consumidores.
+    """
+
+    def __init__(self, html_content: str, region: Optional[str] = None) -> None:
+        self.html = html_content
+        self.region = region
+
+    @functools.cached_property
+    def soup(self) -> BeautifulSoup:
+        return crear_soup(self.html, self.region)
+
+    @functools.cached_property
+    def expedientes(self) -> List[Dict[str, str]]:
+        return parsear_lista_expedientes(self.soup)
+
+    @functools.cached_property
+    def expedientes_publicos(self) -> List[Dict[str, Optional[str]]]:
+        return parsear_lista_publica(self.soup)
+
+    @functools.cached_property
+    def siguiente_inicio(self) -> Optional[int]:
+        return encontrar_siguiente_inicio_universal(self.soup)
+
+    @functools.cached_property
+    def ajax_params(self) -> Dict[str, str]:
+        # Con el árbol aún sin construir, el escaneo rápido puede evitarlo.
+        if "soup" in self.__dict__:
+            return parsear_detalle_para_ajax_params(self.soup)
+        return parsear_detalle_para_ajax_params(self.html)
+
+    @functools.cached_property
+    def documento(self) -> Dict[str, Any]:
+        return parsear_pagina_documento(self.soup)
+
+    @functools.cached_property
+    def marco_superior(self) -> Optional[str]:
+        """Atributo src del marco 'sup' cuando la página es un frameset."""
+        frame_sup = self.soup.find("frame", attrs={"name": "sup"})
+        return frame_sup.get("src") if frame_sup else None
+
+    def movimientos(self, expediente_nro: str) -> List[Dict[str, str]]:
+        return parsear_movimientos_de_ajax_html(self.soup, expediente_nro)
+
+    def paginacion(self, inicio_actual: int) -> Optional[Tuple[int, int]]:
+        return detectar_paginacion(self.soup, inicio_actual, len(self.expedientes))
@@ -0,0 +1,62 @@
+"""Módulo de planificación de peticiones HTTP con concurrencia acotada por host."""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+import config
+
+
+class PlanificadorHost:
+    """
+    Limita las peticiones simultáneas por host y espacia el inicio de cada una.
+
+    Es seguro entre hilos: las sesiones de un mismo proceso comparten una única
+    instancia a través del adaptador HTTP, de modo que el límite se respeta aunque
+    varias corrutinas del motor asíncrono trabajen en paralelo.
+    """
+
+    def __init__(
+        self,
+        max_concurrencia: Optional[int] = None,
+        demora_cortesia: Optional[float] = None,
+    ) -> None:
+        self.max_concurrencia = max_concurrencia or config.MAX_CONCURRENCIA_POR_HOST
+        self.demora_cortesia = (
+            config.DEMORA_CORTESIA if demora_cortesia is None else demora_cortesia
+        )
+        self._lock = threading.Lock()
+        self._semaforos: Dict[str, threading.BoundedSemaphore] = {}
+        self._proximo_turno: Dict[str, float] = {}
+
+    def _semaforo(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.BoundedSemaphore(
+                    self.max_concurrencia
+                )
+            return self._semaforos[host]
+
+    def _reservar_turno(self, host: str) -> float:
+        with self._lock:
+            ahora = time.monotonic()
+            inicio = max(ahora, self._proximo_turno.get(host, 0.0))
+            self._proximo_turno[host] = inicio + self.demora_cortesia
+            return inicio - ahora
+
+    @contextmanager
+    def turno(self, url: str) -> Iterator[None]:
+        """
+        Bloquea hasta que el host de la URL admita una nueva petición.
+
+        Args:
+            url: Dirección de la petición a emitir.
+        """
+        host = urlparse(url).netloc
+        with self._semaforo(host):
+            espera = self._reservar_turno(host)
+            if espera > 0:
+                time.sleep(espera)
+            yield
@@ -0,0 +1,89 @@
+"""Módulo de política de reintentos con backoff exponencial para las peticiones HTTP."""
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+
+import config
+
+ESTADOS_REINTENTABLES = frozenset({429, 500, 502, 503, 504})
+ESTADOS_SOBRECARGA = frozenset({429, 503})
+METODOS_IDEMPOTENTES = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def leer_retry_after(respuesta: requests.Response) -> Optional[float]:
+    """
+    Interpreta la cabecera Retry-After en segundos o como fecha HTTP.
+
+    Args:
+        respuesta: Respuesta recibida del servidor.
+
+    Returns:
+        Segundos a esperar, o None si la cabecera falta o es inválida.
+    """
+    valor = respuesta.headers.get("Retry-After")
+    if not valor:
+        return None
+
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+
+    try:
+        fecha = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, fecha.timestamp() - time.time())
+
+
+class PoliticaReintentos:
+    """Decide qué fallos se reintentan y cuánto esperar entre intentos."""
+
+    def __init__(
+        self,
+        maximo: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        espera_maxima: Optional[float] = None,
+    ) -> None:
+        self.maximo = config.REINTENTOS_MAXIMOS if maximo is None else maximo
+        self.backoff_base = (
+            config.REINTENTOS_BACKOFF_BASE if backoff_base is None else backoff_base
+        )
+        self.espera_maxima = (
+            config.REINTENTOS_ESPERA_MAXIMA if espera_maxima is None else espera_maxima
+        )
+
+    def puede_reintentar(self, request: requests.PreparedRequest, intento: int) -> bool:
+        """Indica si la petición admite otro intento (solo métodos idempotentes)."""
+        return intento < self.maximo and request.method in METODOS_IDEMPOTENTES
+
+    def estado_reintentable(self, respuesta: requests.Response) -> bool:
+        """Indica si el código de estado corresponde a un fallo transitorio."""
+        return respuesta.status_code in ESTADOS_REINTENTABLES
+
+    def espera(
+        self, intento: int, respuesta: Optional[requests.Response] = None
+    ) -> float:
+        """
+        Calcula la pausa previa al siguiente intento.
+
+        Respeta Retry-After cuando el servidor lo informa; si no, aplica backoff
+        exponencial con jitter para que los workers no reintenten sincronizados.
+
+        Args:
+            intento: Número de intentos fallidos previos (desde 0).
+            respuesta: Respuesta fallida, si la hubo.
+
+        Returns:
+            Segundos a esperar.
+        """
+        if respuesta is not None:
+            retry_after = leer_retry_after(respuesta)
+            if retry_after is not None:
+                return min(retry_after, self.espera_maxima)
+
+        techo = min(self.espera_maxima, self.backoff_base * (2**intento))
+        return techo / 2 + random.uniform(0, techo / 2)
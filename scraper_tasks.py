@@ -1,17 +1,22 @@
 """Módulo central para la orquestación de tareas de web scraping del sistema."""
 
-import time
-from typing import Any, Dict, List, Optional
+import asyncio
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AbstractSet, Any, Deque, Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 import requests
-from bs4 import BeautifulSoup
 
+import cache_http
 import config
 import parsers
+import utils
 from logger import get_logger
 
 logger = get_logger(__name__)
 
+_MOVIMIENTOS_POR_PAGINA = 10
+
 
 def descargar_archivo(session: requests.Session, url: str, ruta_destino: str) -> bool:
     """
@@ -43,6 +48,10 @@ def raspar_lista_expedientes(session: requests.Session) -> List[Dict[str, str]]:
     """
     Itera a lo largo de la paginación privada extrayendo el registro de expedientes.
 
+    Cuando una página permite deducir el tamaño de página y la cantidad total de
+    páginas, las restantes se descargan en paralelo; si la estructura es ambigua se
+    avanza de a una siguiendo el botón SIGUIENTE.
+
     Args:
         session: Sesión HTTP activa y autenticada.
 
@@ -50,10 +59,10 @@ def raspar_lista_expedientes(session: requests.Session) -> List[Dict[str, str]]:
         Lista completa de expedientes procesados.
     """
     all_expedientes_list = []
-    current_inicio = 0
+    current_inicio: Optional[int] = 0
     page_count = 1
 
-    while True:
+    while current_inicio is not None:
         logger.info(
             "Obteniendo página de lista %d (inicio=%d)...", page_count, current_inicio
         )
@@ -64,25 +73,30 @@ def raspar_lista_expedientes(session: requests.Session) -> List[Dict[str, str]]:
                 config.LISTA_EXPEDIENTES_URL, params=params, timeout=30
             )
             r_lista.raise_for_status()
+        except requests.RequestException as e:
+            _registrar_lista_incompleta(page_count, e)
+            break
 
-            expedientes_en_pagina = parsers.parsear_lista_expedientes(r_lista.text)
-            if not expedientes_en_pagina:
-                logger.info("No se encontraron más expedientes.")
-                break
+        pagina = parsers.PaginaSiped(r_lista.text)
+        if not pagina.expedientes:
+            logger.info("No se encontraron más expedientes.")
+            break
 
-            all_expedientes_list.extend(expedientes_en_pagina)
-            logger.info("Se encontraron %d expedientes.", len(expedientes_en_pagina))
+        all_expedientes_list.extend(pagina.expedientes)
+        logger.info("Se encontraron %d expedientes.", len(pagina.expedientes))
 
-            next_inicio = parsers.encontrar_siguiente_pagina_inicio(r_lista.text)
-            if next_inicio is not None:
-                current_inicio = next_inicio
-                page_count += 1
-            else:
-                break
+        next_inicio = pagina.siguiente_inicio
+        paginacion = pagina.paginacion(current_inicio)
+        if paginacion:
+            paso, ultimo_inicio = paginacion
+            inicios = list(range(next_inicio, ultimo_inicio + 1, paso))
+            next_inicio = _raspar_paginas_lista_en_paralelo(
+                session, inicios, page_count, all_expedientes_list
+            )
+            page_count += len(inicios)
 
-        except requests.RequestException as e:
-            logger.error("Error al obtener la página %d: %s", page_count, e)
-            break
+        current_inicio = next_inicio
+        page_count += 1
 
     logger.info(
         "Fin de la paginación de expedientes. Total: %d", len(all_expedientes_list)
@@ -90,18 +104,90 @@ def raspar_lista_expedientes(session: requests.Session) -> List[Dict[str, str]]:
     return all_expedientes_list
 
 
+def _raspar_paginas_lista_en_paralelo(
+    session: requests.Session,
+    inicios: List[int],
+    page_count: int,
+    expedientes: List[Dict[str, str]],
+) -> Optional[int]:
+    """
+    Descarga concurrentemente páginas de la lista y las agrega en orden.
+
+    Args:
+        session: Sesión HTTP activa y autenticada.
+        inicios: Índices de inicio de las páginas a descargar.
+        page_count: Número de la última página ya procesada.
+        expedientes: Lista acumulada, que se extiende en el lugar.
+
+    Returns:
+        Índice de inicio a continuación del lote, o None si la lista terminó.
+    """
+    # motor_async envuelve las funciones de este módulo; importarlo aquí evita el
+    # ciclo de importación entre ambos.
+    import motor_async
+
+    logger.info(
+        "Paginación detectada: descargando %d páginas en paralelo.", len(inicios)
+    )
+    resultados = asyncio.run(
+        motor_async.obtener_paginas(
+            session,
+            config.LISTA_EXPEDIENTES_URL,
+            [{"inicio": inicio} for inicio in inicios],
+        )
+    )
+
+    pagina = None
+    for numero, (html_pagina, error) in enumerate(resultados, start=page_count + 1):
+        if isinstance(error, requests.RequestException):
+            _registrar_lista_incompleta(numero, error)
+            return None
+        if error:
+            raise error
+
+        pagina = parsers.PaginaSiped(html_pagina)
+        if not pagina.expedientes:
+            logger.info("No se encontraron más expedientes.")
+            return None
+
+        expedientes.extend(pagina.expedientes)
+        logger.info("Página %d: %d expedientes.", numero, len(pagina.expedientes))
+
+    return pagina.siguiente_inicio if pagina else None
+
+
+def _registrar_lista_incompleta(page_count: int, error: Exception) -> None:
+    logger.error(
+        "Error al obtener la página %d tras agotar los reintentos: %s. "
+        "La lista queda incompleta.",
+        page_count,
+        error,
+    )
+
+
 def raspar_movimientos_de_expediente(
-    session: requests.Session, expediente_dict: Dict[str, Any]
-) -> List[Dict[str, str]]:
+    session: requests.Session,
+    expediente_dict: Dict[str, Any],
+    previos: Optional[List[Dict[str, Any]]] = None,
+) -> Optional[List[Dict[str, str]]]:
     """
     Reconstruye el historial de movimientos de un expediente específico.
 
+    Con `previos` la sincronización es incremental: se recorren las páginas más
+    recientes de a una hasta encontrar un movimiento ya conocido y se antepone lo
+    nuevo al historial previo. Los movimientos conocidos que llegaron en la última
+    página descargada reemplazan a su copia almacenada, de modo que un cambio de
+    estado o de firma no se pierde. Si no aparece ninguno conocido se devuelve el
+    historial descargado completo.
+
     Args:
         session: Sesión HTTP activa.
         expediente_dict: Diccionario contenedor con metadatos del expediente.
+        previos: Historial almacenado del expediente, en el orden de SIPED.
 
     Returns:
-        Lista de movimientos documentados o lista vacía en caso de no encontrarlos.
+        Lista de movimientos documentados, vacía si el expediente no tiene
+        ninguno, o None si no pudo consultarse.
     """
     link_contenedor = expediente_dict.get("link_detalle")
     expediente_nro = expediente_dict.get("expediente", "Desconocido")
@@ -110,76 +196,175 @@ def raspar_movimientos_de_expediente(
         logger.warning(
             "No se encontró 'link_detalle' para el expediente %s.", expediente_nro
         )
-        return []
+        return None
 
     try:
-        r_frameset = session.get(link_contenedor, timeout=30)
-        r_frameset.raise_for_status()
-        soup_frameset = BeautifulSoup(r_frameset.text, "html.parser")
-
-        frame_sup = soup_frameset.find("frame", attrs={"name": "sup"})
-        if not (frame_sup and frame_sup.get("src")):
+        frameset = parsers.PaginaSiped(
+            cache_http.obtener_texto(session, link_contenedor, timeout=30),
+            parsers.REGION_PARAMETROS,
+        )
+        if not frameset.marco_superior:
             logger.error(
                 "No se pudo encontrar el marco superior en %s.", expediente_nro
             )
-            return []
+            return None
 
-        url_contenido_real = urljoin(link_contenedor, frame_sup.get("src"))
-        r_detalle_real = session.get(url_contenido_real, timeout=30)
-        r_detalle_real.raise_for_status()
+        url_contenido_real = urljoin(link_contenedor, frameset.marco_superior)
+        detalle = parsers.PaginaSiped(
+            cache_http.obtener_texto(session, url_contenido_real, timeout=30),
+            parsers.REGION_PARAMETROS,
+        )
 
-        ajax_params_base = parsers.parsear_detalle_para_ajax_params(r_detalle_real.text)
+        ajax_params_base = detalle.ajax_params
         if "exp_id" not in ajax_params_base:
             logger.error(
                 "No se pudieron extraer los parámetros AJAX base para %s.",
                 expediente_nro,
             )
-            return []
-
-        offset = 0
-        mov_page_count = 1
-        movimientos_del_expediente = []
-
-        while True:
-            ajax_params = ajax_params_base.copy()
-            ajax_params.update(
-                {
-                    "numerodemas": mov_page_count,
-                    "offset": offset,
-                    "usuariointerno": 0,
-                    "tipof": "",
-                    "estadose": "",
-                    "descripcorta": "",
-                    "contenido": "",
-                    "pe": "",
-                    "acumulados": "",
-                }
+            return None
+
+        if not previos:
+            return raspar_paginas_movimientos(
+                session, ajax_params_base, expediente_nro
             )
 
-            r_movimientos = session.get(
-                config.AJAX_MOVIMIENTOS_URL, params=ajax_params, timeout=30
+        descargados, primer_conocido = _recorrer_paginas_movimientos(
+            session,
+            ajax_params_base,
+            expediente_nro,
+            ventana=1,
+            claves_conocidas={utils.generar_clave_movimiento(m) for m in previos},
+        )
+        if primer_conocido is None:
+            logger.warning(
+                "Ningún movimiento conocido en %s: se reemplaza el historial completo.",
+                expediente_nro,
             )
-            movimientos_html = r_movimientos.text
+            return descargados
+
+        actualizados = {
+            utils.generar_clave_movimiento(m): m
+            for m in descargados[primer_conocido:]
+        }
+        return descargados[:primer_conocido] + [
+            actualizados.get(utils.generar_clave_movimiento(m), m) for m in previos
+        ]
+
+    except requests.RequestException as e:
+        logger.error("Error de red procesando expediente %s: %s", expediente_nro, e)
+        return None
+
+
+def _obtener_pagina_movimientos(
+    session: requests.Session, ajax_params_base: Dict[str, str], numero_pagina: int
+) -> str:
+    ajax_params = ajax_params_base.copy()
+    ajax_params.update(
+        {
+            "numerodemas": numero_pagina,
+            "offset": (numero_pagina - 1) * _MOVIMIENTOS_POR_PAGINA,
+            "usuariointerno": 0,
+            "tipof": "",
+            "estadose": "",
+            "descripcorta": "",
+            "contenido": "",
+            "pe": "",
+            "acumulados": "",
+        }
+    )
+    r_movimientos = session.get(
+        config.AJAX_MOVIMIENTOS_URL, params=ajax_params, timeout=30
+    )
+    r_movimientos.raise_for_status()
+    return r_movimientos.text
+
+
+def raspar_paginas_movimientos(
+    session: requests.Session,
+    ajax_params_base: Dict[str, str],
+    expediente_nro: str,
+    ventana: Optional[int] = None,
+) -> List[Dict[str, str]]:
+    """
+    Recorre la paginación AJAX de movimientos manteniendo varias páginas en vuelo.
+
+    Las páginas se solicitan de forma especulativa con una ventana deslizante y se
+    procesan en orden; la primera respuesta vacía o menor a 200 bytes marca el final
+    y las peticiones adelantadas se descartan.
+
+    Args:
+        session: Sesión HTTP activa.
+        ajax_params_base: Parámetros del expediente extraídos del marco de detalle.
+        expediente_nro: Número de expediente, para etiquetar los movimientos.
+        ventana: Páginas solicitadas por adelantado como máximo.
 
+    Returns:
+        Movimientos de todas las páginas en el orden publicado por SIPED.
+
+    Raises:
+        requests.RequestException: Si alguna página necesaria no pudo obtenerse.
+    """
+    movimientos, _ = _recorrer_paginas_movimientos(
+        session, ajax_params_base, expediente_nro, ventana
+    )
+    return movimientos
+
+
+def _recorrer_paginas_movimientos(
+    session: requests.Session,
+    ajax_params_base: Dict[str, str],
+    expediente_nro: str,
+    ventana: Optional[int] = None,
+    claves_conocidas: AbstractSet[str] = frozenset(),
+) -> Tuple[List[Dict[str, str]], Optional[int]]:
+    """
+    Recorre las páginas de movimientos y se detiene en la página del primero ya conocido.
+
+    Returns:
+        Tupla con los movimientos descargados, incluida completa la página en la
+        que apareció el primero conocido, y la posición de este en la lista (None
+        si no se encontró ninguno).
+    """
+    ventana = ventana or config.VENTANA_MOVIMIENTOS
+    movimientos = []
+    pendientes: Deque[Future] = deque()
+    proxima_pagina = 1
+    executor = ThreadPoolExecutor(max_workers=ventana)
+
+    def _adelantar() -> None:
+        nonlocal proxima_pagina
+        pendientes.append(
+            executor.submit(
+                _obtener_pagina_movimientos, session, ajax_params_base, proxima_pagina
+            )
+        )
+        proxima_pagina += 1
+
+    try:
+        for _ in range(ventana):
+            _adelantar()
+
+        while pendientes:
+            movimientos_html = pendientes.popleft().result()
             if len(movimientos_html) < 200:
                 break
 
-            movimientos_de_pagina = parsers.parsear_movimientos_de_ajax_html(
-                movimientos_html, expediente_nro
-            )
+            movimientos_de_pagina = parsers.PaginaSiped(
+                movimientos_html, parsers.REGION_TABLAS
+            ).movimientos(expediente_nro)
             if not movimientos_de_pagina:
                 break
 
-            movimientos_del_expediente.extend(movimientos_de_pagina)
-            offset += 10
-            mov_page_count += 1
-            time.sleep(0.25)
-
-        return movimientos_del_expediente
+            inicio_pagina = len(movimientos)
+            movimientos.extend(movimientos_de_pagina)
+            for posicion, movimiento in enumerate(movimientos_de_pagina):
+                if utils.generar_clave_movimiento(movimiento) in claves_conocidas:
+                    return movimientos, inicio_pagina + posicion
+            _adelantar()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    except requests.RequestException as e:
-        logger.error("Error de red procesando expediente %s: %s", expediente_nro, e)
-        return []
+    return movimientos, None
 
 
 def raspar_contenido_documento(
@@ -200,9 +385,13 @@ def raspar_contenido_documento(
         return None
 
     try:
-        r_documento = session.get(document_url, timeout=30)
-        r_documento.raise_for_status()
-        return parsers.parsear_pagina_documento(r_documento.text)
+        datos_documento = parsers.PaginaSiped(
+            cache_http.obtener_texto(session, document_url, timeout=30)
+        ).documento
+        if datos_documento["firmantes"]:
+            # Un escrito firmado electrónicamente ya no se modifica.
+            cache_http.marcar_inmutable(session, document_url)
+        return datos_documento
     except requests.RequestException as e:
         logger.error(
             "Error al obtener el contenido documental en %s: %s", document_url, e
@@ -267,7 +456,8 @@ def raspar_busqueda_parametrizada(
             respuesta = session.get(url_submit, params=payload, timeout=30)
             respuesta.raise_for_status()
 
-            expedientes_pagina = parsers.parsear_lista_publica(respuesta.text)
+            pagina = parsers.PaginaSiped(respuesta.text)
+            expedientes_pagina = pagina.expedientes_publicos
 
             if not expedientes_pagina:
                 logger.info("No se encontraron más registros para esta búsqueda.")
@@ -288,11 +478,10 @@ def raspar_busqueda_parametrizada(
                 "Se extrajeron %d expedientes en esta etapa.", len(expedientes_pagina)
             )
 
-            next_inicio = parsers.encontrar_siguiente_inicio_universal(respuesta.text)
+            next_inicio = pagina.siguiente_inicio
             if next_inicio is not None and next_inicio > payload["inicio"]:
                 payload["inicio"] = next_inicio
                 page_count += 1
-                time.sleep(0.5)
             else:
                 break
 
@@ -0,0 +1,301 @@
+"""Script de medición de rendimiento de los analizadores HTML sobre un corpus de páginas SIPED."""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4.builder import builder_registry
+
+import config
+import parsers
+
+DIR_FIXTURES = os.path.join(config.BASE_DIR, "tests", "fixtures")
+RUTA_BASE_POR_DEFECTO = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "benchmark_parsers_base.json"
+)
+MOTORES = ("html.parser", "lxml")
+TAMANOS_MOVIMIENTOS = (10, 100, 500)
+TAMANO_LISTADOS = 50
+
+_PATRON_FILA = re.compile(r"<tr>.*?</tr>", re.IGNORECASE | re.DOTALL)
+
+MENU_SINTETICO = (
+    "<html><body><ul>"
+    + "".join(f'<li><a href="modulo_{i}.php">Módulo {i}</a></li>' for i in range(40))
+    + '<li><a href="../siped/index.php?token=0f3a9c">SIPED</a></li>'
+    "</ul></body></html>"
+)
+
+# Categoría del corpus -> funciones de parsers.py que la consumen.
+FUNCIONES_POR_CATEGORIA: Dict[str, List[Tuple[str, Callable[[str], Any]]]] = {
+    "bandeja": [
+        ("parsear_lista_expedientes", parsers.parsear_lista_expedientes),
+        (
+            "encontrar_siguiente_inicio_universal",
+            parsers.encontrar_siguiente_inicio_universal,
+        ),
+        (
+            "detectar_paginacion",
+            lambda html: parsers.detectar_paginacion(html, 0, TAMANO_LISTADOS),
+        ),
+        (
+            "PaginaSiped (filas y paginación)",
+            lambda html: _recorrer_pagina(parsers.PaginaSiped(html)),
+        ),
+    ],
+    "publica": [("parsear_lista_publica", parsers.parsear_lista_publica)],
+    "movimientos": [
+        (
+            "parsear_movimientos_de_ajax_html",
+            lambda html: parsers.parsear_movimientos_de_ajax_html(html, "0000/2024"),
+        )
+    ],
+    "documento": [("parsear_pagina_documento", parsers.parsear_pagina_documento)],
+    "detalle": [
+        ("parsear_detalle_para_ajax_params", parsers.parsear_detalle_para_ajax_params)
+    ],
+    "redireccion": [
+        (
+            "obtener_url_meta_refresh",
+            lambda html: parsers.obtener_url_meta_refresh(html, config.BASE_URL),
+        ),
+        ("es_pagina_login", parsers.es_pagina_login),
+    ],
+    "menu": [("obtener_enlace_token_siped", parsers.obtener_enlace_token_siped)],
+}
+
+
+def _recorrer_pagina(pagina: parsers.PaginaSiped) -> List[Dict[str, str]]:
+    pagina.siguiente_inicio
+    pagina.paginacion(0)
+    return pagina.expedientes
+
+
+def _leer_fixture(nombre: str) -> str:
+    with open(os.path.join(DIR_FIXTURES, nombre), encoding="utf-8") as f:
+        return f.read()
+
+
+def _replicar_filas(html_content: str, cantidad: int, omitir: int = 0) -> str:
+    """Multiplica las filas de datos de una tabla hasta alcanzar la cantidad pedida."""
+    filas = list(_PATRON_FILA.finditer(html_content))[omitir:]
+    if not filas:
+        return html_content
+    textos = [fila.group(0) for fila in filas]
+    nuevas = "".join(textos[i % len(textos)] for i in range(cantidad))
+    return html_content[: filas[0].start()] + nuevas + html_content[filas[-1].end() :]
+
+
+def generar_corpus(directorio: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+    """
+    Arma el corpus de páginas a medir.
+
+    Parte de las fixtures anonimizadas de `tests/fixtures`, escalando las tablas a
+    tamaños representativos. Si se indica un directorio, se suman los archivos
+    `<categoria>_*.html` que contenga (por ejemplo capturas reales anonimizadas).
+
+    Args:
+        directorio: Carpeta opcional con páginas adicionales.
+
+    Returns:
+        Diccionario categoría -> {nombre de página: HTML}.
+    """
+    movimientos = _leer_fixture("movimientos.html")
+    corpus: Dict[str, Dict[str, str]] = {
+        "bandeja": {
+            f"bandeja_{TAMANO_LISTADOS}": _replicar_filas(
+                _leer_fixture("lista_expedientes.html"), TAMANO_LISTADOS, omitir=1
+            ).replace("inicio.value=10", f"inicio.value={TAMANO_LISTADOS}")
+        },
+        "publica": {
+            f"publica_{TAMANO_LISTADOS}": _replicar_filas(
+                _leer_fixture("lista_publica.html"), TAMANO_LISTADOS, omitir=1
+            )
+        },
+        "movimientos": {
+            f"movimientos_{n}": _replicar_filas(movimientos, n, omitir=1)
+            for n in TAMANOS_MOVIMIENTOS
+        },
+        "documento": {"documento": _leer_fixture("documento.html")},
+        "detalle": {"detalle": _leer_fixture("detalle.html")},
+        "redireccion": {"meta_refresh": _leer_fixture("meta_refresh.html")},
+        "menu": {"menu": MENU_SINTETICO},
+    }
+
+    if directorio:
+        for nombre in sorted(os.listdir(directorio)):
+            categoria = nombre.split("_", 1)[0]
+            if nombre.endswith(".html") and categoria in corpus:
+                with open(os.path.join(directorio, nombre), encoding="utf-8") as f:
+                    corpus[categoria][nombre[:-5]] = f.read()
+
+    return corpus
+
+
+def _contar_filas(resultado: Any) -> int:
+    return len(resultado) if isinstance(resultado, list) else 1
+
+
+def medir(
+    funcion: Callable[[str], Any], html_content: str, tiempo_minimo: float
+) -> Dict[str, float]:
+    """
+    Ejecuta una función repetidamente y mide su rendimiento.
+
+    Args:
+        funcion: Analizador a medir.
+        html_content: Página de entrada.
+        tiempo_minimo: Segundos mínimos de medición.
+
+    Returns:
+        Diccionario con paginas_por_segundo, filas_por_segundo y memoria_pico_kb.
+    """
+    tracemalloc.start()
+    resultado = funcion(html_content)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    iteraciones = 0
+    inicio = time.perf_counter()
+    transcurrido = 0.0
+    while iteraciones == 0 or transcurrido < tiempo_minimo:
+        funcion(html_content)
+        iteraciones += 1
+        transcurrido = time.perf_counter() - inicio
+
+    paginas_por_segundo = iteraciones / transcurrido
+    return {
+        "paginas_por_segundo": round(paginas_por_segundo, 2),
+        "filas_por_segundo": round(paginas_por_segundo * _contar_filas(resultado), 2),
+        "memoria_pico_kb": round(pico / 1024, 1),
+    }
+
+
+def ejecutar(
+    corpus: Dict[str, Dict[str, str]],
+    motores: List[str],
+    tiempo_minimo: float,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Mide cada función de parsers.py sobre cada página de su categoría y cada motor.
+
+    Returns:
+        Diccionario "motor | función | página" -> métricas.
+    """
+    resultados = {}
+    motor_original = config.PARSER_HTML
+    try:
+        for motor in motores:
+            config.PARSER_HTML = motor
+            for categoria, paginas in corpus.items():
+                for nombre_funcion, funcion in FUNCIONES_POR_CATEGORIA[categoria]:
+                    for nombre_pagina, html_content in paginas.items():
+                        clave = f"{motor} | {nombre_funcion} | {nombre_pagina}"
+                        resultados[clave] = medir(funcion, html_content, tiempo_minimo)
+    finally:
+        config.PARSER_HTML = motor_original
+    return resultados
+
+
+def comparar_con_base(
+    resultados: Dict[str, Dict[str, float]],
+    base: Dict[str, Dict[str, float]],
+    tolerancia: float,
+) -> List[str]:
+    """
+    Detecta las mediciones cuyo rendimiento cayó más que la tolerancia admitida.
+
+    Args:
+        resultados: Mediciones actuales.
+        base: Mediciones de referencia guardadas.
+        tolerancia: Caída relativa admitida de páginas por segundo (0.2 = 20 %).
+
+    Returns:
+        Descripciones de las regresiones encontradas.
+    """
+    regresiones = []
+    for clave, actual in resultados.items():
+        referencia = base.get(clave)
+        if not referencia:
+            continue
+        minimo = referencia["paginas_por_segundo"] * (1 - tolerancia)
+        if actual["paginas_por_segundo"] < minimo:
+            regresiones.append(
+                f"{clave}: {actual['paginas_por_segundo']:.0f} pág/s "
+                f"(base {referencia['paginas_por_segundo']:.0f} pág/s)"
+            )
+    return regresiones
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada del benchmark. Devuelve 1 si se detectan regresiones."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--corpus", help="Directorio con páginas <categoria>_*.html adicionales."
+    )
+    parser.add_argument(
+        "--base", default=RUTA_BASE_POR_DEFECTO, help="Archivo JSON de referencia."
+    )
+    parser.add_argument(
+        "--guardar-base",
+        action="store_true",
+        help="Guarda las mediciones como nueva referencia.",
+    )
+    parser.add_argument(
+        "--tolerancia",
+        type=float,
+        default=0.2,
+        help="Caída admitida de páginas por segundo respecto de la referencia.",
+    )
+    parser.add_argument(
+        "--tiempo", type=float, default=0.5, help="Segundos de medición por caso."
+    )
+    parser.add_argument(
+        "--motor", action="append", help="Limita la medición a uno o más motores."
+    )
+    args = parser.parse_args(argv)
+
+    motores = [
+        m for m in (args.motor or MOTORES) if builder_registry.lookup(m) is not None
+    ]
+    resultados = ejecutar(generar_corpus(args.corpus), motores, args.tiempo)
+
+    print(f"{'Caso':<75} {'pág/s':>10} {'filas/s':>12} {'pico KB':>9}")
+    for clave, metricas in resultados.items():
+        print(
+            f"{clave:<75} {metricas['paginas_por_segundo']:>10.1f} "
+            f"{metricas['filas_por_segundo']:>12.1f} {metricas['memoria_pico_kb']:>9.1f}"
+        )
+
+    if args.guardar_base:
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nReferencia guardada en {args.base}")
+        return 0
+
+    if not os.path.exists(args.base):
+        print("\nSin referencia guardada. Ejecute con --guardar-base para crearla.")
+        return 0
+
+    with open(args.base, encoding="utf-8") as f:
+        regresiones = comparar_con_base(resultados, json.load(f), args.tolerancia)
+
+    if regresiones:
+        print(f"\n❌ {len(regresiones)} regresiones respecto de la referencia:")
+        for regresion in regresiones:
+            print(f"  - {regresion}")
+        return 1
+
+    print("\n✅ Sin regresiones respecto de la referencia.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
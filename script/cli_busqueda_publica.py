@@ -27,7 +27,7 @@ def main() -> None:
     print(f"\nAutenticando a {usuario} en SIPED...")
 
     # Se obtienen las cookies a través del método procedimental
-    cookies_dict = session_manager.autenticar_en_siped(usuario, clave)
+    cookies_dict = session_manager.obtener_cookies_sesion(usuario, clave)
 
     if not cookies_dict:
         print("[ERROR] No se pudo obtener una sesión válida de la intranet.")
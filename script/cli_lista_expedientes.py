@@ -20,7 +20,7 @@ def main_lista() -> None:
     clave = getpass.getpass("Ingrese Contraseña: ").strip()
 
     print(f"\nAutenticando a {usuario} en SIPED...")
-    cookies = session_manager.autenticar_en_siped(usuario, clave)
+    cookies = session_manager.obtener_cookies_sesion(usuario, clave)
 
     if not cookies:
         print("❌ Error de autenticación.")
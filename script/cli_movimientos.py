@@ -31,7 +31,7 @@ def main_movimientos() -> None:
 
     print(f"Se procesarán {len(expedientes_a_procesar)} expedientes.")
 
-    cookies = session_manager.autenticar_en_siped(usuario, clave)
+    cookies = session_manager.obtener_cookies_sesion(usuario, clave)
     if not cookies:
         print("❌ Error de autenticación.")
         return
@@ -23,7 +23,7 @@ def main() -> None:
         return
 
     print(f"\nAutenticando a {usuario} en SIPED...")
-    cookies = session_manager.autenticar_en_siped(usuario, clave)
+    cookies = session_manager.obtener_cookies_sesion(usuario, clave)
 
     if not cookies:
         print("❌ Error: Credenciales inválidas o fallo en la conexión.")
@@ -3,7 +3,6 @@
 import os
 import sys
 import getpass
-import time
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -57,7 +56,7 @@ def main() -> None:
     nombre_base = f"{nro} - {caratula}"
 
     print(f"\nAutenticando a {usuario} en SIPED...")
-    cookies = session_manager.autenticar_en_siped(usuario, clave)
+    cookies = session_manager.obtener_cookies_sesion(usuario, clave)
 
     if not cookies:
         print("❌ Error: Credenciales inválidas.")
@@ -133,8 +132,6 @@ def main() -> None:
                                 session, pdf_info["url"], ruta_pdf
                             ):
                                 total_pdfs_descargados += 1
-
-                time.sleep(0.1)
             except Exception as e:
                 print(f"    > Error en Doc {id_correlativo}: {e}")
 
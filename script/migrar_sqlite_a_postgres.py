@@ -0,0 +1,133 @@
+"""Script que copia una base siped.db existente a PostgreSQL conservando los IDs."""
+
+import argparse
+import os
+import sys
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.engine import URL, make_url
+
+import migraciones
+from base_datos import Base
+from models import Expediente, Movimiento
+
+TABLAS = (Expediente.__table__, Movimiento.__table__)
+
+
+def _url_origen(origen: str) -> str:
+    if "://" in origen:
+        return origen
+    return f"sqlite:///{os.path.abspath(origen)}"
+
+
+def _solo_lectura(url: str) -> URL:
+    """Abre las bases SQLite en modo de solo lectura para no modificar el origen."""
+    url_origen = make_url(url)
+    if url_origen.get_backend_name() != "sqlite" or not url_origen.database:
+        return url_origen
+    if url_origen.database.startswith("file:"):
+        ruta = url_origen.database
+    else:
+        ruta = f"file:{os.path.abspath(url_origen.database)}"
+    return url_origen.set(
+        database=ruta, query={**url_origen.query, "mode": "ro", "uri": "true"}
+    )
+
+
+def migrar(url_origen: str, url_destino: str, tamano_lote: int = 1000) -> Dict[str, int]:
+    """
+    Copia expedientes y movimientos de una base a otra en una única transacción.
+
+    El origen se abre en modo de solo lectura y debe estar en la última versión de
+    esquema; si no, basta con iniciar la aplicación sobre él (o ejecutar
+    `flask --app app init-db`) antes de copiarlo. En el destino, la creación de
+    tablas, el registro de migraciones y la copia comparten la transacción: en
+    PostgreSQL, si algo falla, el destino queda sin cambios.
+
+    Args:
+        url_origen: URI de SQLAlchemy de la base SQLite existente.
+        url_destino: URI de SQLAlchemy de la base PostgreSQL.
+        tamano_lote: Filas leídas e insertadas por cada lote.
+
+    Returns:
+        Diccionario tabla -> cantidad de filas copiadas.
+
+    Raises:
+        ValueError: Si el origen no está al día o alguna tabla del destino ya
+            contiene datos.
+    """
+    origen = create_engine(_solo_lectura(url_origen))
+    destino = create_engine(url_destino, pool_pre_ping=True)
+    try:
+        version = migraciones.obtener_version(origen)
+        ultima = migraciones.MIGRACIONES[-1][0]
+        if version < ultima:
+            raise ValueError(
+                f"La base de origen está en la versión de esquema {version} y la "
+                f"actual es {ultima}. Inicie la aplicación sobre ella o ejecute "
+                "'flask --app app init-db' antes de copiarla."
+            )
+
+        copiadas: Dict[str, int] = {}
+        with origen.connect() as lectura, destino.begin() as escritura:
+            Base.metadata.create_all(escritura, tables=list(TABLAS))
+            migraciones.aplicar_migraciones(escritura)
+            for tabla in TABLAS:
+                if escritura.execute(select(func.count()).select_from(tabla)).scalar():
+                    raise ValueError(f"La tabla {tabla.name} del destino no está vacía.")
+
+            for tabla in TABLAS:
+                resultado = lectura.execution_options(yield_per=tamano_lote).execute(
+                    select(tabla).order_by(tabla.c.id)
+                )
+                copiadas[tabla.name] = 0
+                for lote in resultado.partitions():
+                    escritura.execute(tabla.insert(), [dict(f._mapping) for f in lote])
+                    copiadas[tabla.name] += len(lote)
+
+                if destino.dialect.name == "postgresql":
+                    # Los IDs se copiaron explícitamente: la secuencia debe continuar
+                    # desde el máximo para que los próximos INSERT no colisionen.
+                    escritura.execute(
+                        text(
+                            f"SELECT setval(pg_get_serial_sequence('{tabla.name}', 'id'), "
+                            f"COALESCE((SELECT MAX(id) FROM {tabla.name}), 0) + 1, false)"
+                        )
+                    )
+        return copiadas
+    finally:
+        origen.dispose()
+        destino.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la migración. Devuelve 1 si el destino no está vacío."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("origen", help="Ruta a siped.db o URI de SQLAlchemy de origen.")
+    parser.add_argument(
+        "--destino",
+        default=os.environ.get("SQLALCHEMY_DATABASE_URI"),
+        help="URI de PostgreSQL (por defecto SQLALCHEMY_DATABASE_URI).",
+    )
+    parser.add_argument("--lote", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if not args.destino:
+        parser.error("Indique --destino o defina SQLALCHEMY_DATABASE_URI.")
+
+    try:
+        copiadas = migrar(_url_origen(args.origen), args.destino, args.lote)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    for tabla, cantidad in copiadas.items():
+        print(f"✅ {tabla}: {cantidad} filas copiadas.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
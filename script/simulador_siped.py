@@ -0,0 +1,479 @@
+"""Servidor local que imita a SIPED para medir el rendimiento de punta a punta sin tocar producción."""
+
+import argparse
+import io
+import logging
+import os
+import random
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from html import escape
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, Response, abort, request
+from pypdf import PdfWriter
+
+import base_datos
+import config
+
+RUTA_BUSCAR = "/siped/expediente/buscar"
+COOKIE_SESION = "PHPSESSID"
+_ESCRITOS = ("DECRETO", "ESCRITO", "CEDULA", "OFICIO", "RESOLUCION", "SENTENCIA")
+_APELLIDOS = ("GARCIA", "PEREZ", "LOPEZ", "MARTINEZ", "SOSA", "RUIZ", "GOMEZ", "DIAZ")
+_OBJETOS = ("DAÑOS Y PERJUICIOS", "SUCESION AB INTESTATO", "COBRO DE PESOS", "DESALOJO")
+_LOCALIDADES = ("RIO GALLEGOS", "CALETA OLIVIA", "PICO TRUNCADO", "PUERTO DESEADO")
+
+PAGINA_LOGIN = """<html><body>
+<form name="login" method="post" action="/servicios/controli2.php">
+<input type="text" name="usuario" /><input type="password" name="pass" />
+<input type="submit" value="Ingresar" />
+</form></body></html>"""
+
+_PAGINA_REDIRECCION = """<html><head>
+<meta http-equiv="REFRESH" content="0; url='{destino}'" />
+</head><body>Redirigiendo...</body></html>"""
+
+
+class EstadoSimulador:
+    """
+    Datos sintéticos y sesiones del simulador.
+
+    Los expedientes y movimientos se derivan de forma determinista de su número,
+    por lo que el volumen puede ser arbitrariamente grande sin ocupar memoria.
+    """
+
+    def __init__(
+        self,
+        expedientes: int = 120,
+        movimientos: int = 35,
+        filas_por_pagina: int = 10,
+        latencia: float = 0.0,
+        tasa_errores: float = 0.0,
+        duracion_sesion: Optional[float] = None,
+        kb_por_pdf: int = 20,
+        semilla: int = 0,
+    ) -> None:
+        self.expedientes = expedientes
+        self.movimientos = movimientos
+        self.filas_por_pagina = filas_por_pagina
+        self.latencia = latencia
+        self.tasa_errores = tasa_errores
+        self.duracion_sesion = duracion_sesion
+        self.semilla = semilla
+        self.peticiones: Counter = Counter()
+        self.sesiones: Dict[str, Dict[str, Any]] = {}
+        self._aleatorio = random.Random(semilla)
+        self._lock = threading.Lock()
+        self.pdf = _generar_pdf(kb_por_pdf)
+
+    def expediente(self, indice: int) -> Dict[str, str]:
+        rng = random.Random(self.semilla * 1_000_003 + indice)
+        actor, demandado = rng.sample(_APELLIDOS, 2)
+        return {
+            "id": str(1000 + indice),
+            "numero": f"{indice + 1}/{2015 + indice % 10}",
+            "caratula": f"{actor} C/ {demandado} S/ {rng.choice(_OBJETOS)}",
+            "partes": f"Actor: {actor.title()}, Dmd: {demandado.title()}",
+            "fec_ult_mov": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024",
+            "localidad": rng.choice(_LOCALIDADES),
+        }
+
+    def indice_de(self, exp_id: str) -> int:
+        try:
+            indice = int(exp_id) - 1000
+        except ValueError:
+            abort(404)
+        if not 0 <= indice < self.expedientes:
+            abort(404)
+        return indice
+
+    def sortear_error(self) -> bool:
+        with self._lock:
+            return self._aleatorio.random() < self.tasa_errores
+
+    def demora(self) -> float:
+        with self._lock:
+            return self.latencia * self._aleatorio.uniform(0.5, 1.5)
+
+    def registrar(self, ruta: str) -> None:
+        with self._lock:
+            self.peticiones[ruta] += 1
+
+    def sesion_valida(self, token_sesion: Optional[str], autorizada: bool) -> bool:
+        sesion = self.sesiones.get(token_sesion or "")
+        if sesion is None or (autorizada and not sesion["autorizada"]):
+            return False
+        if self.duracion_sesion is not None:
+            return time.monotonic() - sesion["creada"] < self.duracion_sesion
+        return True
+
+
+def _generar_pdf(kb: int) -> bytes:
+    escritor = PdfWriter()
+    escritor.add_blank_page(width=595, height=842)
+    escritor.add_metadata({"/Relleno": "x" * (kb * 1024)})
+    salida = io.BytesIO()
+    escritor.write(salida)
+    return salida.getvalue()
+
+
+def _tabla_paginada(estado: EstadoSimulador, inicio: int, publica: bool) -> str:
+    fin = min(inicio + estado.filas_por_pagina, estado.expedientes)
+    filas = []
+    for indice in range(inicio, fin):
+        exp = {k: escape(v) for k, v in estado.expediente(indice).items()}
+        if publica:
+            filas.append(
+                f"<tr><td><button onclick=\"window.open('DetalleExpediente.php?id={exp['id']}')\">"
+                f"{exp['numero']}</button></td><td>{exp['caratula']}</td><td>2</td>"
+                f"<td>{exp['fec_ult_mov']}</td><td>{exp['localidad']}</td>"
+                "<td>JUZGADO CIVIL 1</td><td>SECRETARIA 1</td></tr>"
+            )
+        else:
+            filas.append(
+                f"<tr><td><a href=\"ver_detalle.php?id={exp['id']}\">{exp['numero']}</a></td>"
+                f"<td>{exp['caratula']}</td><td>{exp['partes']}</td><td>EN LETRA</td>"
+                f"<td>{exp['fec_ult_mov']}</td><td>{exp['localidad']}</td>"
+                "<td>JUZGADO CIVIL 1</td><td>SECRETARIA 1</td></tr>"
+            )
+
+    siguiente = ""
+    if fin < estado.expedientes:
+        siguiente = (
+            f'<button onclick="document.form.inicio.value={fin};document.form.submit()">'
+            "SIGUIENTE &gt;&gt;</button>"
+        )
+    return (
+        f'<html><body><form name="form" method="get"><input type="hidden" name="inicio" '
+        f'value="{inicio}" /></form><table class="table table-striped">'
+        "<tr><th>Expediente</th><th>Carátula</th></tr>"
+        + "".join(filas)
+        + f"</table><p>Mostrando {inicio + 1} a {fin} de {estado.expedientes} registros</p>"
+        + siguiente
+        + "</body></html>"
+    )
+
+
+def _pagina_detalle(exp_id: str) -> str:
+    return (
+        '<html><head><script type="text/javascript">function vermas() {'
+        '$.get("ver_mas_escritosAjax.php?dependencia_ide=41&tj_fuero=3'
+        '&exp_organismo_origen=2");}</script></head><body><form name="detalle">'
+        f'<input type="hidden" name="id" value="{exp_id}" /></form></body></html>'
+    )
+
+
+def _pagina_movimientos(estado: EstadoSimulador, indice: int, offset: int) -> str:
+    fin = min(offset + 10, estado.movimientos)
+    if offset >= fin:
+        return ""
+    filas = []
+    for numero in range(offset, fin):
+        rng = random.Random(indice * 100_003 + numero)
+        escrito = rng.choice(_ESCRITOS)
+        fecha = f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024"
+        filas.append(
+            f"<tr><td>{estado.movimientos - numero}</td><td>"
+            f'<form action="ver_escrito.php?id={(1000 + indice) * 10_000 + numero}">'
+            f'<input type="submit" value="{escrito}" /></form></td><td>{fecha}</td>'
+            "<td>DESPACHO</td><td>PUBLICA</td><td>JUEZ</td>"
+            f'<td><font title="Movimiento {numero} del expediente">{escrito}</font></td>'
+            f"<td>{fecha}</td><td>{fecha}</td></tr>"
+        )
+    return (
+        '<table class="table-hover"><tr><th>...</th></tr>' + "".join(filas) + "</table>"
+    )
+
+
+def _pagina_documento(mov_id: int) -> str:
+    adjuntos = "".join(
+        f'<a href="ver_adjunto_escrito.php?id={mov_id * 10 + n}">Adjunto {n}.pdf</a>'
+        for n in range(mov_id % 3)
+    )
+    return (
+        f'<html><body><a href="../../../pdfabogado.php?id={mov_id}&amp;tipo=1">'
+        f"Descargar escrito</a>{adjuntos}<table>"
+        '<tr><td colspan="3">Firmado electrónicamente</td></tr>'
+        "<tr><td>Cargo</td><td>Nombre</td><td>Fecha</td></tr>"
+        "<tr><td>JUEZ</td><td>PEREZ, JUAN</td><td>12/10/2024 10:15</td></tr>"
+        "</table></body></html>"
+    )
+
+
+def crear_app(estado: Optional[EstadoSimulador] = None) -> Flask:
+    """
+    Construye la aplicación que reproduce las rutas de SIPED usadas por el scraper.
+
+    Cubre la cadena de login, la bandeja paginada, la búsqueda pública, el frameset
+    de detalle con su marco 'sup', la paginación AJAX de movimientos, los visores de
+    escritos y la descarga de PDFs. Las sesiones vencidas devuelven el formulario de
+    login, como SIPED. Los filtros de búsqueda se ignoran.
+
+    Args:
+        estado: Volumen de datos, latencia y tasa de errores a simular.
+
+    Returns:
+        Aplicación Flask lista para servir.
+    """
+    estado = estado or EstadoSimulador()
+    app = Flask(__name__)
+    app.extensions["simulador"] = estado
+
+    def _sesion(autorizada: bool = True) -> bool:
+        return estado.sesion_valida(request.cookies.get(COOKIE_SESION), autorizada)
+
+    @app.before_request
+    def _simular_red() -> Optional[Response]:
+        estado.registrar(request.path)
+        if estado.latencia:
+            time.sleep(estado.demora())
+        if request.method == "GET" and estado.tasa_errores and estado.sortear_error():
+            return Response(
+                "Servicio no disponible", status=503, headers={"Retry-After": "1"}
+            )
+        return None
+
+    @app.post("/servicios/controli2.php")
+    def login() -> Response:
+        if not request.form.get("usuario") or not request.form.get("pass"):
+            return Response(PAGINA_LOGIN)
+        token_sesion = secrets.token_hex(16)
+        estado.sesiones[token_sesion] = {
+            "creada": time.monotonic(),
+            "token": secrets.token_hex(8),
+            "autorizada": False,
+        }
+        respuesta = Response(_PAGINA_REDIRECCION.format(destino="inicio.php"))
+        respuesta.set_cookie(COOKIE_SESION, token_sesion)
+        return respuesta
+
+    @app.get("/servicios/inicio.php")
+    def menu() -> str:
+        if not _sesion(autorizada=False):
+            return PAGINA_LOGIN
+        token = estado.sesiones[request.cookies[COOKIE_SESION]]["token"]
+        return (
+            '<html><body><ul><li><a href="mensajes.php">Mensajes</a></li>'
+            f'<li><a href="../siped/index.php?token={token}">SIPED</a></li>'
+            "</ul></body></html>"
+        )
+
+    @app.get("/siped/index.php")
+    def token_siped() -> str:
+        sesion = estado.sesiones.get(request.cookies.get(COOKIE_SESION, ""))
+        if not sesion or request.args.get("token") != sesion["token"]:
+            return PAGINA_LOGIN
+        sesion["autorizada"] = True
+        return _PAGINA_REDIRECCION.format(destino="frame_principal.php")
+
+    @app.get("/siped/frame_principal.php")
+    def frame_principal() -> str:
+        if not _sesion():
+            return PAGINA_LOGIN
+        return '<html><frameset rows="*"><frame name="principal" src="menu.php" /></frameset></html>'
+
+    @app.get(f"{RUTA_BUSCAR}/submit_buscar_abogado.php")
+    def lista_privada() -> str:
+        if not _sesion():
+            return PAGINA_LOGIN
+        return _tabla_paginada(estado, request.args.get("inicio", 0, type=int), False)
+
+    @app.get(f"{RUTA_BUSCAR}/submit.php")
+    def lista_publica() -> str:
+        if not _sesion():
+            return PAGINA_LOGIN
+        return _tabla_paginada(estado, request.args.get("inicio", 0, type=int), True)
+
+    @app.get(f"{RUTA_BUSCAR}/ver_detalle.php")
+    def detalle_frameset() -> str:
+        if not _sesion():
+            return PAGINA_LOGIN
+        exp_id = str(1000 + estado.indice_de(request.args.get("id", "")))
+        return (
+            '<html><frameset rows="60%,40%">'
+            f'<frame name="sup" src="detalle_sup.php?id={exp_id}" />'
+            '<frame name="inf" src="about:blank" /></frameset></html>'
+        )
+
+    @app.get(f"{RUTA_BUSCAR}/detalle_sup.php")
+    @app.get("/siped/expediente/expediente/buscar/DetalleExpediente.php")
+    def detalle() -> str:
+        if not _sesion():
+            return PAGINA_LOGIN
+        return _pagina_detalle(str(1000 + estado.indice_de(request.args.get("id", ""))))
+
+    @app.get(f"{RUTA_BUSCAR}/ver_mas_escritosAjax.php")
+    def movimientos() -> str:
+        if not _sesion():
+            return PAGINA_LOGIN
+        indice = estado.indice_de(request.args.get("exp_id", ""))
+        return _pagina_movimientos(
+            estado, indice, request.args.get("offset", 0, type=int)
+        )
+
+    @app.get(f"{RUTA_BUSCAR}/ver_escrito.php")
+    def documento() -> str:
+        if not _sesion():
+            return PAGINA_LOGIN
+        return _pagina_documento(request.args.get("id", 0, type=int))
+
+    @app.get("/siped/agrega_plantilla/")
+    @app.get(f"{RUTA_BUSCAR}/ver_adjunto_escrito.php")
+    def pdf() -> Response:
+        if not _sesion():
+            return Response(PAGINA_LOGIN)
+        return Response(estado.pdf, mimetype="application/pdf")
+
+    return app
+
+
+def apuntar_configuracion(url_base: str) -> None:
+    """
+    Redirige las URLs de `config` del proceso actual hacia otra instancia de SIPED.
+
+    Equivale a definir `SIPED_BASE_URL` antes de iniciar el proceso.
+
+    Args:
+        url_base: Esquema, host y puerto del destino (por ejemplo el simulador).
+    """
+    config.BASE_URL = url_base.rstrip("/")
+    config.LOGIN_URL = f"{config.BASE_URL}/servicios/controli2.php"
+    config.LISTA_EXPEDIENTES_URL = f"{config.BASE_URL}{RUTA_BUSCAR}/submit_buscar_abogado.php"
+    config.AJAX_MOVIMIENTOS_URL = f"{config.BASE_URL}{RUTA_BUSCAR}/ver_mas_escritosAjax.php"
+    config.VERIFICACION_SESION_URL = f"{config.BASE_URL}/siped/frame_principal.php"
+
+
+def medir_recorrido(usuario: str = "simulado", clave: str = "simulado") -> List[Dict[str, Any]]:
+    """
+    Ejecuta las Fases 1, 2 y 3 completas contra el SIPED configurado y las cronometra.
+
+    Los archivos y la base de datos se generan en un directorio temporal, salvo que
+    `SQLALCHEMY_DATABASE_URI` ya esté definida.
+
+    Args:
+        usuario: Usuario con el que autenticarse.
+        clave: Contraseña del usuario.
+
+    Returns:
+        Lista con el nombre, los segundos y el resultado de cada fase.
+    """
+    directorio = tempfile.mkdtemp(prefix="simulador_siped_")
+    os.environ.setdefault(
+        "SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(directorio, 'siped.db')}"
+    )
+    config.DATA_ROOT_DIR = directorio
+    config.CACHE_HTTP_RUTA = os.path.join(directorio, "cache_http.sqlite3")
+
+    base_datos.configurar()
+    base_datos.inicializar_esquema()
+
+    import session_manager
+    from fases.fase_1 import ejecutar_fase_1_lista
+    from fases.fase_2 import ejecutar_fase_2_movimientos
+    from fases.fase_3 import ejecutar_fase_3_documentos
+
+    inicio = time.perf_counter()
+    cookies = session_manager.autenticar_en_siped(usuario, clave)
+    if not cookies:
+        raise RuntimeError(f"No se pudo autenticar contra {config.BASE_URL}.")
+    mediciones = [
+        {"fase": "Login", "segundos": time.perf_counter() - inicio, "resultado": "OK"}
+    ]
+
+    for nombre, fase in (
+        ("Fase 1", ejecutar_fase_1_lista),
+        ("Fase 2", ejecutar_fase_2_movimientos),
+        ("Fase 3", ejecutar_fase_3_documentos),
+    ):
+        inicio = time.perf_counter()
+        resultado = fase(cookies, username=usuario)
+        mediciones.append(
+            {
+                "fase": nombre,
+                "segundos": time.perf_counter() - inicio,
+                "resultado": resultado,
+            }
+        )
+    return mediciones
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada del simulador."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=5055)
+    parser.add_argument("--expedientes", type=int, default=120)
+    parser.add_argument(
+        "--movimientos", type=int, default=35, help="Movimientos por expediente."
+    )
+    parser.add_argument("--filas-por-pagina", type=int, default=10)
+    parser.add_argument(
+        "--latencia", type=float, default=0.0, help="Segundos medios por respuesta."
+    )
+    parser.add_argument(
+        "--tasa-errores",
+        type=float,
+        default=0.0,
+        help="Fracción de peticiones GET que responden 503.",
+    )
+    parser.add_argument(
+        "--duracion-sesion",
+        type=float,
+        help="Segundos tras los que una sesión vence y se devuelve el login.",
+    )
+    parser.add_argument("--kb-por-pdf", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument(
+        "--medir",
+        action="store_true",
+        help="Levanta el simulador en segundo plano y cronometra las Fases 1 a 3.",
+    )
+    args = parser.parse_args(argv)
+
+    estado = EstadoSimulador(
+        expedientes=args.expedientes,
+        movimientos=args.movimientos,
+        filas_por_pagina=args.filas_por_pagina,
+        latencia=args.latencia,
+        tasa_errores=args.tasa_errores,
+        duracion_sesion=args.duracion_sesion,
+        kb_por_pdf=args.kb_por_pdf,
+        semilla=args.semilla,
+    )
+    app = crear_app(estado)
+
+    if not args.medir:
+        app.run(host=args.host, port=args.puerto, threaded=True)
+        return 0
+
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    servidor = make_server(args.host, args.puerto, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    apuntar_configuracion(f"http://{args.host}:{servidor.server_port}")
+    try:
+        mediciones = medir_recorrido()
+    finally:
+        servidor.shutdown()
+
+    total = sum(m["segundos"] for m in mediciones)
+    for medicion in mediciones:
+        print(f"{medicion['fase']:<8} {medicion['segundos']:>9.2f} s  {medicion['resultado']}")
+    print(
+        f"\nTotal: {total:.2f} s, {sum(estado.peticiones.values())} peticiones "
+        f"({sum(estado.peticiones.values()) / total:.1f} pet/s)."
+    )
+    for ruta, cantidad in estado.peticiones.most_common():
+        print(f"  {cantidad:>7}  {ruta}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
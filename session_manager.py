@@ -1,16 +1,227 @@
 """Módulo para la gestión de sesiones y autenticación en el sistema SIPED."""
 
-from typing import Dict, Optional
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
 import requests
+from requests.adapters import HTTPAdapter
 from requests.utils import cookiejar_from_dict, dict_from_cookiejar
 
+import cache_sesiones
 import config
 import parsers
+from limitador import LimitadorTasa, PacerAIMD, categoria_de_url
 from logger import get_logger
+from planificador import PlanificadorHost
+from reintentos import ESTADOS_SOBRECARGA, PoliticaReintentos
 
 logger = get_logger(__name__)
 
 
+class AdaptadorSiped(HTTPAdapter):
+    """
+    Adaptador HTTP que somete cada envío al limitador de tasa compartido, al pacer
+    adaptativo y al planificador por host, reintentando los fallos transitorios.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.limitador = LimitadorTasa()
+        self.pacer = PacerAIMD()
+        self.planificador = PlanificadorHost()
+        self.politica_reintentos = PoliticaReintentos()
+
+    def _enviar_una_vez(
+        self, request: requests.PreparedRequest, es_siped: bool, **kwargs: Any
+    ) -> requests.Response:
+        with self.planificador.turno(request.url):
+            inicio = time.monotonic()
+            try:
+                respuesta = super().send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if es_siped:
+                    self.pacer.registrar(time.monotonic() - inicio, sobrecarga=True)
+                raise
+
+        if es_siped:
+            self.pacer.registrar(
+                time.monotonic() - inicio,
+                sobrecarga=respuesta.status_code in ESTADOS_SOBRECARGA,
+            )
+        return respuesta
+
+    def send(
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        categoria = categoria_de_url(request.url)
+        es_siped = categoria is not None
+        intento = 0
+
+        while True:
+            self.limitador.adquirir(categoria)
+            if es_siped:
+                self.pacer.esperar_turno()
+
+            try:
+                respuesta = self._enviar_una_vez(request, es_siped, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not self.politica_reintentos.puede_reintentar(request, intento):
+                    raise
+                espera = self.politica_reintentos.espera(intento)
+                logger.warning(
+                    "Fallo de red en %s (%s). Reintento %d en %.1fs.",
+                    request.url,
+                    e,
+                    intento + 1,
+                    espera,
+                )
+            else:
+                if not (
+                    self.politica_reintentos.estado_reintentable(respuesta)
+                    and self.politica_reintentos.puede_reintentar(request, intento)
+                ):
+                    return respuesta
+                espera = self.politica_reintentos.espera(intento, respuesta)
+                logger.warning(
+                    "Respuesta %d en %s. Reintento %d en %.1fs.",
+                    respuesta.status_code,
+                    request.url,
+                    intento + 1,
+                    espera,
+                )
+                respuesta.close()
+
+            time.sleep(espera)
+            intento += 1
+
+
+_adaptador_compartido: Optional[AdaptadorSiped] = None
+_lock_adaptador = threading.Lock()
+
+
+def _reiniciar_adaptador_compartido() -> None:
+    """Descarta el adaptador heredado del proceso padre tras un fork."""
+    global _adaptador_compartido, _lock_adaptador
+    _adaptador_compartido = None
+    _lock_adaptador = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reiniciar_adaptador_compartido)
+
+
+def obtener_adaptador_compartido() -> AdaptadorSiped:
+    """
+    Devuelve el adaptador HTTP único del proceso, creándolo en el primer uso.
+
+    El pool de conexiones keep-alive vive en el adaptador, por lo que todas las
+    sesiones del worker reutilizan las conexiones TLS abiertas contra SIPED. Las
+    cookies permanecen aisladas en el cookie jar de cada sesión. También aloja el
+    planificador, que aplica la concurrencia máxima y la demora de cortesía por host.
+
+    Returns:
+        Instancia de AdaptadorSiped compartida por todas las sesiones del proceso.
+    """
+    global _adaptador_compartido
+    with _lock_adaptador:
+        if _adaptador_compartido is None:
+            _adaptador_compartido = AdaptadorSiped(
+                pool_connections=config.HTTP_POOL_CONEXIONES,
+                pool_maxsize=config.HTTP_POOL_TAMANO_MAXIMO,
+            )
+        return _adaptador_compartido
+
+
+class SesionExpiradaError(Exception):
+    """La sesión de SIPED expiró durante una fase y no pudo renovarse."""
+
+
+class SesionSiped(requests.Session):
+    """
+    Sesión HTTP montada sobre el pool de conexiones compartido del proceso.
+
+    Cuando se conoce el usuario, detecta las respuestas que SIPED sustituye por la
+    página de login al expirar la sesión, renueva las cookies y repite la petición
+    una vez, de modo que la fase continúa en lugar de procesar páginas vacías.
+
+    Una misma instancia se comparte entre los hilos de una fase (motor_async y la
+    ventana de movimientos) a propósito: las cabeceras no cambian tras construirla,
+    el cookie jar serializa sus accesos con su propio lock y el pool de urllib3 es
+    seguro entre hilos. Lo único que se reemplaza durante la fase es el cookie jar
+    al renovar, bajo `_lock_renovacion` y con un contador de generación para que
+    una expiración detectada por varios hilos produzca un solo login. Con una
+    sesión por hilo cada uno se autenticaría por su cuenta.
+    """
+
+    def __init__(self, usuario: Optional[str] = None) -> None:
+        super().__init__()
+        self.headers.update(config.BROWSER_HEADERS)
+        adaptador = obtener_adaptador_compartido()
+        self.mount("https://", adaptador)
+        self.mount("http://", adaptador)
+        self.usuario = usuario
+        self._lock_renovacion = threading.Lock()
+        self._generacion_cookies = 0
+        self._renovacion_fallida = False
+
+    def request(
+        self, method: str, url: str, *args: Any, **kwargs: Any
+    ) -> requests.Response:
+        generacion = self._generacion_cookies
+        respuesta = super().request(method, url, *args, **kwargs)
+        if not self._sesion_expirada(respuesta, kwargs.get("stream")):
+            return respuesta
+
+        logger.warning(
+            "Sesión SIPED expirada durante %s %s. Pausando para renovarla.", method, url
+        )
+        respuesta.close()
+        self._renovar(generacion)
+
+        respuesta = super().request(method, url, *args, **kwargs)
+        if self._sesion_expirada(respuesta, kwargs.get("stream")):
+            raise SesionExpiradaError(
+                f"SIPED rechazó la sesión renovada de {self.usuario}."
+            )
+        return respuesta
+
+    def _sesion_expirada(
+        self, respuesta: requests.Response, stream: Optional[bool]
+    ) -> bool:
+        if not self.usuario or stream:
+            return False
+        if categoria_de_url(respuesta.url or "") is None:
+            return False
+        tipo = respuesta.headers.get("Content-Type", "")
+        if tipo and "html" not in tipo:
+            return False
+        return parsers.es_pagina_login(respuesta.text)
+
+    def _renovar(self, generacion: int) -> None:
+        with self._lock_renovacion:
+            if self._generacion_cookies != generacion:
+                return  # Otro hilo ya renovó la sesión mientras esta petición esperaba.
+            if self._renovacion_fallida:
+                raise SesionExpiradaError(f"La sesión de {self.usuario} expiró.")
+
+            cookies = renovar_cookies(self.usuario, dict_from_cookiejar(self.cookies))
+            if not cookies:
+                self._renovacion_fallida = True
+                raise SesionExpiradaError(
+                    f"La sesión de {self.usuario} expiró y no hay credenciales "
+                    "ni sesión cacheada con las que renovarla."
+                )
+            self.cookies = cookiejar_from_dict(cookies)
+            self._generacion_cookies += 1
+            logger.info("Sesión de %s renovada. Reanudando la fase.", self.usuario)
+
+    def close(self) -> None:
+        """Libera la sesión sin cerrar las conexiones del pool compartido."""
+        self.adapters.clear()
+        super().close()
+
+
 def autenticar_en_siped(usuario: str, clave: str) -> Optional[Dict[str, str]]:
     """
     Intenta autenticar un usuario y clave contra SIPED.
@@ -26,8 +237,7 @@ def autenticar_en_siped(usuario: str, clave: str) -> Optional[Dict[str, str]]:
         logger.error("Credenciales incompletas.")
         return None
 
-    session = requests.Session()
-    session.headers.update(config.BROWSER_HEADERS)
+    session = SesionSiped()
 
     try:
         logger.info("Autenticando usuario: %s.", usuario)
@@ -81,19 +291,119 @@ def autenticar_en_siped(usuario: str, clave: str) -> Optional[Dict[str, str]]:
 
 def crear_sesion_con_cookies(
     cookies_dict: Optional[Dict[str, str]],
+    usuario: Optional[str] = None,
 ) -> requests.Session:
     """
     Instancia una nueva sesión HTTP configurada con las cookies proporcionadas.
 
+    La sesión reutiliza el pool de conexiones del proceso; solo el cookie jar es
+    propio de cada tarea.
+
     Args:
         cookies_dict: Diccionario conteniendo las cookies válidas de sesión.
+        usuario: Titular de la sesión; habilita la reautenticación si expira.
 
     Returns:
         Objeto Session de requests listo para realizar peticiones.
     """
-    session = requests.Session()
-    session.headers.update(config.BROWSER_HEADERS)
+    session = SesionSiped(usuario)
     if cookies_dict:
         session.cookies = cookiejar_from_dict(cookies_dict)
     return session
 
+
+
+def sesion_vigente(cookies_dict: Dict[str, str]) -> bool:
+    """
+    Comprueba con una única petición liviana si las cookies siguen autenticadas.
+
+    Args:
+        cookies_dict: Cookies de una sesión previamente autenticada.
+
+    Returns:
+        True si SIPED acepta la sesión, False si expiró o no pudo verificarse.
+    """
+    session = crear_sesion_con_cookies(cookies_dict)
+    try:
+        respuesta = session.get(config.VERIFICACION_SESION_URL, timeout=10)
+        return respuesta.ok and not parsers.es_pagina_login(respuesta.text)
+    except requests.exceptions.RequestException as e:
+        logger.warning("No se pudo verificar la sesión cacheada: %s", e)
+        return False
+    finally:
+        session.close()
+
+
+def obtener_cookies_sesion(usuario: str, clave: str) -> Optional[Dict[str, str]]:
+    """
+    Devuelve cookies autenticadas reutilizando la sesión cacheada cuando sigue vigente.
+
+    La entrada cacheada se acepta sin sondeo si fue verificada hace menos de
+    `SESION_REVALIDAR_CADA` segundos; de lo contrario se sondea una vez y, si
+    expiró, se repite el login completo.
+
+    Args:
+        usuario: Identificador del usuario (Intranet).
+        clave: Contraseña de acceso.
+
+    Returns:
+        Diccionario con las cookies de la sesión o None si la autenticación falla.
+    """
+    if not usuario or not clave:
+        logger.error("Credenciales incompletas.")
+        return None
+
+    entrada = cache_sesiones.obtener(usuario, clave)
+    if entrada:
+        antiguedad = time.time() - entrada.get("validada", 0)
+        if antiguedad < config.SESION_REVALIDAR_CADA:
+            logger.info("Reutilizando sesión cacheada de %s.", usuario)
+            return entrada["cookies"]
+
+        if sesion_vigente(entrada["cookies"]):
+            logger.info("Sesión cacheada de %s verificada.", usuario)
+            cache_sesiones.marcar_validada(usuario, entrada)
+            return entrada["cookies"]
+
+        logger.info("La sesión cacheada de %s expiró.", usuario)
+
+    cookies_dict = autenticar_en_siped(usuario, clave)
+    if cookies_dict:
+        cache_sesiones.guardar(usuario, cookies_dict, clave)
+    return cookies_dict
+
+
+def renovar_cookies(
+    usuario: str, cookies_actuales: Optional[Dict[str, str]] = None
+) -> Optional[Dict[str, str]]:
+    """
+    Obtiene cookies válidas para un usuario cuya sesión expiró a mitad de una fase.
+
+    Primero prueba la sesión cacheada, que otro proceso pudo haber renovado; si no
+    sirve y la bóveda de credenciales está habilitada, repite el login completo.
+
+    Args:
+        usuario: Identificador del usuario.
+        cookies_actuales: Cookies que SIPED acaba de rechazar.
+
+    Returns:
+        Diccionario con las cookies renovadas o None si no fue posible.
+    """
+    entrada = cache_sesiones.obtener(usuario)
+    if (
+        entrada
+        and entrada["cookies"] != cookies_actuales
+        and sesion_vigente(entrada["cookies"])
+    ):
+        logger.info("Reutilizando la sesión cacheada vigente de %s.", usuario)
+        cache_sesiones.marcar_validada(usuario, entrada)
+        return entrada["cookies"]
+
+    clave = cache_sesiones.obtener_credencial(usuario)
+    if not clave:
+        return None
+
+    cookies_dict = autenticar_en_siped(usuario, clave)
+    if cookies_dict:
+        cache_sesiones.actualizar_cookies(usuario, cookies_dict)
+    return cookies_dict
@@ -1,9 +1,11 @@
 """Módulo de definición de tareas asíncronas para Celery."""
 
-import os
 from typing import Any, Dict
 from celery import Celery
+from celery.signals import worker_init
 
+import base_datos
+import config
 from fases.fase_1 import ejecutar_fase_1_lista
 from fases.fase_2 import ejecutar_fase_2_movimientos
 from fases.fase_3 import ejecutar_fase_3_documentos
@@ -12,11 +14,19 @@ from fases.fase_publica_1 import ejecutar_fase_publica
 from fases.fase_busqueda_avanzada import ejecutar_fase_busqueda_avanzada
 from fases.fase_descarga_publica import ejecutar_fase_descarga_publica
 
-REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+REDIS_URL = config.REDIS_URL
 
 celery_app = Celery("tasks", broker=REDIS_URL, backend=REDIS_URL)
 
 
+@worker_init.connect
+def inicializar_base_datos(**_kwargs: Any) -> None:
+    """Deja el esquema al día una sola vez, antes de que el worker cree sus procesos."""
+    base_datos.inicializar_esquema()
+    # Los procesos hijos abren sus propias conexiones; no deben heredar las del padre.
+    base_datos.obtener_engine().dispose()
+
+
 @celery_app.task(name="tasks.fase_1_lista_task", bind=True)
 def fase_1_lista_task(self, cookies: dict, username: str) -> str:
     """Ejecuta la extracción asíncrona de la bandeja privada."""
@@ -1,27 +1,50 @@
 import pytest
 from flask import Flask
 
+@pytest.fixture(autouse=True)
+def cache_http_aislada(monkeypatch, tmp_path):
+    """Evita que los tests lean o escriban la caché HTTP real del proyecto."""
+    import config
+    monkeypatch.setattr(config, "CACHE_HTTP_HABILITADA", False)
+    monkeypatch.setattr(config, "CACHE_HTTP_RUTA", str(tmp_path / "cache_http.sqlite3"))
+
+@pytest.fixture
+def apuntar_base_datos():
+    """Permite apuntar base_datos a otra base durante un test y restaura el motor previo al terminar."""
+    import base_datos
+    anterior = base_datos._engine
+    creados = []
+
+    def apuntar(uri, **opciones):
+        creados.append(base_datos.configurar(uri, **opciones))
+        return creados[-1]
+
+    yield apuntar
+    base_datos.Sesion.remove()
+    for engine in creados:
+        engine.dispose()
+    base_datos._engine = anterior
+    if anterior is not None:
+        base_datos.Sesion.configure(bind=anterior)
+
 @pytest.fixture
-def app():
-    """Instancia y configura una aplicación Flask aislada en memoria para testing."""
+def app(apuntar_base_datos):
+    """Instancia una aplicación Flask aislada y apunta la base de datos a SQLite en memoria."""
+    import base_datos
+    import models  # Registra las tablas en Base.metadata
+    from sqlalchemy.pool import StaticPool
+
     app = Flask(__name__)
     
     app.config["TESTING"] = True
-    # Usamos una base de datos SQLite efímera en memoria para no tocar los datos reales
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
-    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = "clave-secreta-testing"
+
+    # Base de datos efímera en memoria, compartida por todos los hilos del test
+    engine = apuntar_base_datos("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    base_datos.Base.metadata.create_all(engine)
     
     with app.app_context():
-        from extensions import db
-        db.init_app(app)
-        db.create_all()
-        
         yield app  # Aquí se ejecutan los tests
-        
-        # Limpieza de la base de datos después de cada prueba
-        db.session.remove()
-        db.drop_all()
 
 @pytest.fixture
 def client(app):
@@ -30,7 +53,6 @@ def client(app):
 
 @pytest.fixture
 def db_session(app):
-    """Proporciona acceso directo a la sesión transaccional de la base de datos."""
-    from extensions import db
-    with app.app_context():
-        yield db.session
\ No newline at end of file
+    """Proporciona acceso directo a la sesión de la base de datos de los tests."""
+    import base_datos
+    yield base_datos.Sesion()
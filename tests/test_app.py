@@ -63,7 +63,7 @@ def test_descargar_por_expediente_404_sin_datos(client, mocker):
     with client.session_transaction() as sess:
         sess["username"] = "test"
         sess["siped_cookies"] = {}
-    mocker.patch("db_manager.obtener_expedientes", return_value=[])
+    mocker.patch("db_manager.obtener_expediente_por_numero", return_value=None)
     mocker.patch("utils.leer_csv_a_diccionario", return_value=[])
     response = client.get("/descargar_por_expediente/000-2026")
     assert response.status_code == 404
@@ -72,7 +72,7 @@ def test_debug_expediente_no_encontrado(client, mocker):
     with client.session_transaction() as sess:
         sess["username"] = "test"
         sess["siped_cookies"] = {}
-    mocker.patch("db_manager.obtener_expedientes", return_value=[])
+    mocker.patch("db_manager.obtener_expediente_por_numero", return_value=None)
     response = client.get("/debug/999-2026")
     assert response.status_code == 200
     assert b"no encontrado en la base de datos" in response.data
@@ -81,9 +81,76 @@ def test_debug_expediente_exitoso(client, mocker):
     with client.session_transaction() as sess:
         sess["username"] = "test"
         sess["siped_cookies"] = {}
-    mocker.patch("db_manager.obtener_expedientes", return_value=[{"expediente": "123-2026", "id": 1}])
+    mocker.patch("db_manager.obtener_expediente_por_numero", return_value={"expediente": "123-2026", "id": 1})
     mocker.patch("db_manager.obtener_movimientos", return_value=[{"fecha_presentacion": "01/01", "nombre_escrito": "Demanda", "estado": "Despacho"}])
     response = client.get("/debug/123-2026")
     assert response.status_code == 200
     assert b"Diagn" in response.data
     assert b"Demanda" in response.data
+
+@pytest.fixture
+def cliente_siped(app):
+    """Cliente de la aplicación real, autenticado y con la base en memoria del fixture app."""
+    import app as aplicacion
+    cliente = aplicacion.app.test_client()
+    with cliente.session_transaction() as sess:
+        sess["username"] = "USR"
+        sess["siped_cookies"] = {}
+    return cliente
+
+def test_fragmento_expedientes_pagina_y_filtra_desde_la_base(cliente_siped, mocker):
+    import db_manager
+    mocker.patch("config.EXPEDIENTES_POR_PAGINA", 2)
+    db_manager.upsert_expedientes("USR", [{"expediente": f"{n}/2026", "caratula": f"PEREZ C/ {n}"} for n in range(1, 4)] + [{"expediente": "9/2025", "caratula": "GOMEZ S/ SUCESION"}])
+
+    primera = cliente_siped.get("/fragmento/expedientes").get_data(as_text=True)
+    assert primera.count('name="expediente_seleccionado"') == 2
+    assert "despues=2/2026" in primera.replace("%2F", "/")
+
+    id_2 = [e for e in db_manager.obtener_expedientes("USR") if e["expediente"] == "2/2026"][0]["id"]
+    ultima = cliente_siped.get(f"/fragmento/expedientes?despues=2/2026&despues_id={id_2}").get_data(as_text=True)
+    assert ultima.count('name="expediente_seleccionado"') == 2
+    assert 'value="3/2026"' in ultima and "despues=" not in ultima
+
+    filtrada = cliente_siped.get("/fragmento/expedientes?q=gomez").get_data(as_text=True)
+    assert 'value="9/2025"' in filtrada and filtrada.count('name="expediente_seleccionado"') == 1
+    por_palabras = cliente_siped.get("/fragmento/expedientes?q=per 3").get_data(as_text=True)
+    assert 'value="3/2026"' in por_palabras and por_palabras.count('name="expediente_seleccionado"') == 1
+    assert "Ningún expediente coincide" in cliente_siped.get("/fragmento/expedientes?q=erez").get_data(as_text=True)
+    assert "Ningún expediente coincide" in cliente_siped.get("/fragmento/expedientes?q=100%").get_data(as_text=True)
+
+def test_indice_no_incrusta_catalogos_y_los_sirve_aparte(cliente_siped, mocker):
+    mocker.patch("gestor_tareas.obtener_estado_tarea", return_value={"estado": "IDLE", "resultado": ""})
+    indice = cliente_siped.get("/").get_data(as_text=True)
+    assert "ABADIE" not in indice and "/catalogos/abogados" in indice
+
+    assert "ABADIE - GERALDIN NOEL" in cliente_siped.get("/catalogos/abogados").get_data(as_text=True)
+    dependencias = cliente_siped.get("/catalogos/dependencias?id_localidad=18").get_data(as_text=True)
+    assert dependencias.count("<option") > 1
+    assert cliente_siped.get("/catalogos/inexistente").status_code == 404
+
+def test_catalogos_con_etag_fuerte_y_304_si_no_cambiaron(cliente_siped):
+    respuesta = cliente_siped.get("/catalogos/localidades?seleccionado=18")
+    etag, _ = respuesta.get_etag()
+    assert etag and respuesta.cache_control.private and respuesta.cache_control.max_age == config.CATALOGOS_CACHE_SEGUNDOS
+    revalidada = cliente_siped.get("/catalogos/localidades?seleccionado=18", headers={"If-None-Match": f'"{etag}"'})
+    assert revalidada.status_code == 304 and revalidada.data == b""
+    assert cliente_siped.get("/catalogos/localidades", headers={"If-None-Match": f'"{etag}"'}).status_code == 200
+
+def test_catalogo_abogados_busca_por_prefijo_en_html_y_json(cliente_siped):
+    html = cliente_siped.get("/catalogos/abogados?q=acev").get_data(as_text=True)
+    assert "ACEVEDO - SERGIO EDGARDO" in html and "ABADIE" not in html
+    assert "Escriba para buscar" in cliente_siped.get("/catalogos/abogados?q=").get_data(as_text=True)
+    assert "Sin coincidencias" in cliente_siped.get("/catalogos/abogados?q=zzzz").get_data(as_text=True)
+
+    json_ = cliente_siped.get("/catalogos/abogados.json?q=acevedo serg").get_json()
+    assert list(json_) == ["1466"]
+    assert cliente_siped.get("/catalogos/dependencias.json").get_json()["18"]
+    assert cliente_siped.get("/catalogos/inexistente.json").status_code == 404
+
+def test_importar_app_no_inicializa_el_esquema(mocker):
+    import importlib
+    import app as aplicacion
+    inicializar = mocker.patch("base_datos.inicializar_esquema")
+    importlib.reload(aplicacion)
+    inicializar.assert_not_called()
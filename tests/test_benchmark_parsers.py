@@ -0,0 +1,21 @@
+import parsers
+from script import benchmark_parsers
+
+def test_corpus_escala_las_tablas():
+    corpus = benchmark_parsers.generar_corpus()
+    html_500 = corpus["movimientos"]["movimientos_500"]
+    assert len(parsers.parsear_movimientos_de_ajax_html(html_500, "x")) == 500
+    assert len(parsers.parsear_lista_publica(corpus["publica"]["publica_50"])) == 50
+
+def test_comparar_con_base_detecta_regresiones():
+    base = {"lxml | f | p": {"paginas_por_segundo": 100.0}}
+    assert benchmark_parsers.comparar_con_base({"lxml | f | p": {"paginas_por_segundo": 90.0}}, base, 0.2) == []
+    assert len(benchmark_parsers.comparar_con_base({"lxml | f | p": {"paginas_por_segundo": 70.0}}, base, 0.2)) == 1
+
+def test_main_guarda_base_y_compara(tmp_path, mocker):
+    mocker.patch("builtins.print")
+    mocker.patch.object(benchmark_parsers, "TAMANOS_MOVIMIENTOS", (10,))
+    ruta_base = str(tmp_path / "base.json")
+    argumentos = ["--tiempo", "0", "--motor", "html.parser", "--base", ruta_base]
+    assert benchmark_parsers.main(argumentos + ["--guardar-base"]) == 0
+    assert benchmark_parsers.main(argumentos + ["--tolerancia", "1"]) == 0
@@ -0,0 +1,99 @@
+import pytest
+import requests
+import cache_http
+import config
+
+URL = "https://intranet.jussantacruz.gob.ar/siped/expediente/ver.php"
+
+def _respuesta(texto="<html>detalle</html>", estado=200, cabeceras=None):
+    r = requests.Response()
+    r.status_code = estado
+    r._content = texto.encode("utf-8")
+    r.headers.update(cabeceras or {})
+    return r
+
+@pytest.fixture
+def cache_activa(monkeypatch):
+    monkeypatch.setattr(config, "CACHE_HTTP_HABILITADA", True)
+
+def test_segunda_lectura_se_sirve_desde_cache(cache_activa, mocker):
+    session = mocker.Mock(usuario="usr")
+    session.get.return_value = _respuesta(cabeceras={"Cache-Control": "max-age=600"})
+
+    assert cache_http.obtener_texto(session, URL, params={"id": 1}) == "<html>detalle</html>"
+    assert cache_http.obtener_texto(session, URL, params={"id": 1}) == "<html>detalle</html>"
+    session.get.assert_called_once()
+
+def test_sin_indicaciones_del_servidor_revalida_cada_lectura(cache_activa, mocker):
+    session = mocker.Mock(usuario="usr")
+    session.get.return_value = _respuesta(cabeceras={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+    cache_http.obtener_texto(session, URL)
+
+    session.get.return_value = _respuesta("", estado=304)
+    assert cache_http.obtener_texto(session, URL) == "<html>detalle</html>"
+    assert session.get.call_args.kwargs["headers"] == {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+def test_sesion_sin_usuario_no_usa_la_cache(cache_activa, mocker):
+    session = mocker.Mock(spec=["get"])
+    session.get.return_value = _respuesta(cabeceras={"Cache-Control": "max-age=600"})
+    cache_http.obtener_texto(session, URL)
+    cache_http.obtener_texto(session, URL)
+    assert session.get.call_count == 2
+    assert "headers" not in session.get.call_args.kwargs
+
+def test_no_guarda_respuestas_no_store(cache_activa, mocker, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_HTTP_TTL", 600)
+    session = mocker.Mock(usuario="usr")
+    session.get.return_value = _respuesta(cabeceras={"Cache-Control": "no-store", "ETag": '"v1"'})
+    cache_http.obtener_texto(session, URL)
+    cache_http.obtener_texto(session, URL)
+    assert session.get.call_count == 2
+    assert "If-None-Match" not in session.get.call_args.kwargs.get("headers", {})
+
+def test_poda_las_entradas_que_exceden_el_tamano(cache_activa, mocker, monkeypatch):
+    session = mocker.Mock(usuario="usr")
+    session.get.return_value = _respuesta("x" * 600_000, cabeceras={"ETag": '"v1"'})
+    cache_http.obtener_texto(session, URL, params={"id": 1})
+    cache_http.obtener_texto(session, URL, params={"id": 2})
+
+    monkeypatch.setattr(config, "CACHE_HTTP_MAX_MB", 1)
+    with cache_http._conectar() as conexion:
+        cache_http._podar(conexion)
+        urls = [f["url"] for f in conexion.execute("SELECT url FROM respuestas")]
+    assert urls == [URL + "?id=2"]
+
+def test_cache_separada_por_usuario(cache_activa, mocker):
+    a = mocker.Mock(usuario="a")
+    a.get.return_value = _respuesta("<html>de a</html>")
+    b = mocker.Mock(usuario="b")
+    b.get.return_value = _respuesta("<html>de b</html>")
+
+    cache_http.obtener_texto(a, URL)
+    assert cache_http.obtener_texto(b, URL) == "<html>de b</html>"
+
+def test_entrada_vencida_se_revalida_con_etag(cache_activa, mocker, monkeypatch):
+    session = mocker.Mock(usuario="usr")
+    session.get.return_value = _respuesta(cabeceras={"ETag": '"v1"'})
+    cache_http.obtener_texto(session, URL)
+
+    monkeypatch.setattr(config, "CACHE_HTTP_TTL", -1)
+    session.get.return_value = _respuesta("", estado=304)
+    assert cache_http.obtener_texto(session, URL) == "<html>detalle</html>"
+    assert session.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+def test_entrada_inmutable_no_vence(cache_activa, mocker, monkeypatch):
+    session = mocker.Mock(usuario="usr")
+    session.get.return_value = _respuesta()
+    cache_http.obtener_texto(session, URL)
+    cache_http.marcar_inmutable(session, URL)
+
+    monkeypatch.setattr(config, "CACHE_HTTP_TTL", -1)
+    cache_http.obtener_texto(session, URL)
+    session.get.assert_called_once()
+
+def test_no_cachea_paginas_de_login(cache_activa, mocker):
+    session = mocker.Mock(usuario="usr")
+    session.get.return_value = _respuesta('<input type="password" name="pass">')
+    cache_http.obtener_texto(session, URL)
+    cache_http.obtener_texto(session, URL)
+    assert session.get.call_count == 2
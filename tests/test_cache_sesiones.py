@@ -0,0 +1,97 @@
+import time
+import pytest
+import cache_sesiones
+import config
+import session_manager
+
+class RedisFalso:
+    def __init__(self):
+        self.datos = {}
+    def get(self, clave):
+        return self.datos.get(clave)
+    def set(self, clave, valor, ex=None):
+        self.datos[clave] = valor
+    def delete(self, clave):
+        self.datos.pop(clave, None)
+
+@pytest.fixture
+def redis_falso(mocker, monkeypatch):
+    monkeypatch.setattr(config, "CLAVE_CACHE_SESIONES", "clave-de-prueba")
+    falso = RedisFalso()
+    mocker.patch("cache_sesiones._obtener_cliente", return_value=falso)
+    return falso
+
+def test_guardar_cifra_y_obtener_verifica_clave(redis_falso):
+    cache_sesiones.guardar("usr", {"PHPSESSID": "abc"}, "secreta")
+    assert b"abc" not in list(redis_falso.datos.values())[0]
+    assert cache_sesiones.obtener("usr", "secreta")["cookies"] == {"PHPSESSID": "abc"}
+    assert cache_sesiones.obtener("usr", "otra") is None
+    assert cache_sesiones.obtener("usr")["cookies"] == {"PHPSESSID": "abc"}
+
+def test_invalidar_elimina_entrada(redis_falso):
+    cache_sesiones.guardar("usr", {"PHPSESSID": "abc"}, "secreta")
+    cache_sesiones.invalidar("usr")
+    assert cache_sesiones.obtener("usr", "secreta") is None
+
+def test_sin_clave_de_cifrado_no_cachea(mocker, monkeypatch):
+    monkeypatch.setattr(config, "CLAVE_CACHE_SESIONES", "")
+    mock_cliente = mocker.patch("cache_sesiones._obtener_cliente")
+    cache_sesiones.guardar("usr", {"a": "1"}, "x")
+    assert cache_sesiones.obtener("usr", "x") is None
+    mock_cliente.assert_not_called()
+
+def test_obtener_cookies_sesion_reutiliza_cache_reciente(redis_falso, mocker):
+    cache_sesiones.guardar("usr", {"PHPSESSID": "abc"}, "secreta")
+    mock_auth = mocker.patch("session_manager.autenticar_en_siped")
+    mock_sondeo = mocker.patch("session_manager.sesion_vigente")
+    assert session_manager.obtener_cookies_sesion("usr", "secreta") == {"PHPSESSID": "abc"}
+    mock_auth.assert_not_called()
+    mock_sondeo.assert_not_called()
+
+def test_obtener_cookies_sesion_sondea_y_reautentica_si_expiro(redis_falso, mocker, monkeypatch):
+    cache_sesiones.guardar("usr", {"PHPSESSID": "viejo"}, "secreta")
+    monkeypatch.setattr(config, "SESION_REVALIDAR_CADA", 0)
+    mocker.patch("session_manager.sesion_vigente", return_value=False)
+    mocker.patch("session_manager.autenticar_en_siped", return_value={"PHPSESSID": "nuevo"})
+    assert session_manager.obtener_cookies_sesion("usr", "secreta") == {"PHPSESSID": "nuevo"}
+    assert cache_sesiones.obtener("usr", "secreta")["cookies"] == {"PHPSESSID": "nuevo"}
+
+def test_obtener_cookies_sesion_sondeo_exitoso_renueva_marca(redis_falso, mocker, monkeypatch):
+    cache_sesiones.guardar("usr", {"PHPSESSID": "abc"}, "secreta")
+    monkeypatch.setattr(config, "SESION_REVALIDAR_CADA", 0)
+    mocker.patch("session_manager.sesion_vigente", return_value=True)
+    mock_auth = mocker.patch("session_manager.autenticar_en_siped")
+    antes = time.time()
+    assert session_manager.obtener_cookies_sesion("usr", "secreta") == {"PHPSESSID": "abc"}
+    mock_auth.assert_not_called()
+    assert cache_sesiones.obtener("usr")["validada"] >= antes
+
+def test_boveda_credenciales_solo_si_esta_habilitada(redis_falso, monkeypatch):
+    cache_sesiones.guardar("usr", {"a": "1"}, "secreta")
+    assert cache_sesiones.obtener_credencial("usr") is None
+
+    monkeypatch.setattr(config, "BOVEDA_CREDENCIALES", True)
+    monkeypatch.setattr(config, "CLAVE_BOVEDA", "clave-de-la-boveda")
+    cache_sesiones.guardar("usr", {"a": "1"}, "secreta")
+    assert cache_sesiones.obtener("usr")["clave"] != "secreta"
+    assert cache_sesiones.obtener_credencial("usr") == "secreta"
+
+def test_boveda_exige_una_clave_propia(redis_falso, monkeypatch):
+    monkeypatch.setattr(config, "BOVEDA_CREDENCIALES", True)
+    cache_sesiones.guardar("usr", {"a": "1"}, "secreta")
+    assert cache_sesiones.obtener("usr")["clave"] is None
+
+    monkeypatch.setattr(config, "CLAVE_BOVEDA", config.CLAVE_CACHE_SESIONES)
+    cache_sesiones.guardar("usr", {"a": "1"}, "secreta")
+    assert cache_sesiones.obtener("usr")["clave"] is None
+    assert cache_sesiones.obtener_credencial("usr") is None
+
+def test_renovar_cookies_reautentica_con_boveda(redis_falso, mocker, monkeypatch):
+    monkeypatch.setattr(config, "BOVEDA_CREDENCIALES", True)
+    monkeypatch.setattr(config, "CLAVE_BOVEDA", "clave-de-la-boveda")
+    cache_sesiones.guardar("usr", {"a": "vieja"}, "secreta")
+    mock_auth = mocker.patch("session_manager.autenticar_en_siped", return_value={"a": "nueva"})
+
+    assert session_manager.renovar_cookies("usr", {"a": "vieja"}) == {"a": "nueva"}
+    mock_auth.assert_called_once_with("usr", "secreta")
+    assert cache_sesiones.obtener("usr", "secreta")["cookies"] == {"a": "nueva"}
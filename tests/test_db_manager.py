@@ -17,7 +17,64 @@ def test_guardar_y_obtener_movimientos(app, db_session):
         db_manager.guardar_movimientos("2/2026", [{"fecha": "01", "tramite": "M1"}])
         
         # Obtenemos el expediente para sacar su ID
-        exp = Expediente.query.filter_by(numero_expediente="2/2026").first()
+        exp = db_session.query(Expediente).filter_by(numero_expediente="2/2026").first()
         movs = db_manager.obtener_movimientos(exp.id)
         assert len(movs) >= 1
-        assert movs[0]["tramite"] == "M1"
\ No newline at end of file
+        assert movs[0]["tramite"] == "M1"
+
+def test_upsert_movimientos_aplica_solo_las_diferencias(app, db_session, mocker):
+    exp = Expediente(usuario_asignado="USR", numero_expediente="3/2026", caratula="C")
+    db_session.add(exp)
+    db_session.commit()
+
+    historial = [
+        {"nombre_escrito": "B", "fecha_presentacion": "02/01/2026", "estado": "PENDIENTE"},
+        {"nombre_escrito": "A", "fecha_presentacion": "01/01/2026", "estado": "PUBLICA"},
+    ]
+    assert db_manager.upsert_movimientos(exp.id, historial) == 2
+    ids = {m.nombre_escrito: m.id for m in db_session.query(Movimiento).all()}
+
+    historial[0] = dict(historial[0], estado="PUBLICA")
+    nuevo = {"nombre_escrito": "C", "fecha_presentacion": "03/01/2026"}
+    assert db_manager.upsert_movimientos(exp.id, [nuevo] + historial) == 1
+
+    assert {m.nombre_escrito: m.id for m in db_session.query(Movimiento).all() if m.nombre_escrito != "C"} == ids
+    movs = db_manager.obtener_movimientos(exp.id)
+    assert [m["nombre_escrito"] for m in movs] == ["C", "B", "A"]
+    assert movs[1]["estado"] == "PUBLICA"
+    assert {m["expediente_nro"] for m in movs} == {"3/2026"}
+
+
+def test_upsert_expedientes_en_lote_conserva_campos_no_informados(app, db_session, mocker):
+    db_manager.upsert_expedientes("USR", [
+        {"expediente": "1/2026", "caratula": "A", "estado": "EN LETRA", "fec_ult_mov": "01/01/2026", "localidad": "RIO GALLEGOS"},
+        {"expediente": "2/2026", "caratula": "B"},
+    ])
+    ids = {e.numero_expediente: e.id for e in db_session.query(Expediente).all()}
+
+    db_manager.upsert_expedientes("USR", [
+        {"expediente": "1/2026", "fec_ult_mov": "05/01/2026", "localidad": "OTRA"},
+        {"expediente": "2/2026", "caratula": "B"},
+        {"expediente": "3/2026", "caratula": "C"},
+    ])
+
+    db_session.expire_all()
+    expedientes = {e.numero_expediente: e for e in db_session.query(Expediente).all()}
+    assert len(expedientes) == 3
+    assert expedientes["1/2026"].id == ids["1/2026"]
+    assert expedientes["1/2026"].caratula == "A"
+    assert expedientes["1/2026"].estado == "EN LETRA"
+    assert expedientes["1/2026"].fec_ult_mov == "05/01/2026"
+    assert expedientes["1/2026"].localidad == "RIO GALLEGOS"
+
+
+def test_obtener_expediente_puntual_por_numero_y_por_link(app, db_session, mocker):
+    db_manager.upsert_expedientes("USR", [{"expediente": "1/2026", "caratula": "A", "link_detalle": "ver_detalle.php?id=1"}], origen="BUSQUEDA_AVANZADA")
+    db_manager.upsert_expedientes("OTRO", [{"expediente": "1/2026", "caratula": "Z", "link_detalle": "ver_detalle.php?id=1"}], origen="BUSQUEDA_AVANZADA")
+
+    por_numero = db_manager.obtener_expediente_por_numero("USR", "1/2026", origen="BUSQUEDA_AVANZADA")
+    assert por_numero == db_manager.obtener_expedientes("USR", origen="BUSQUEDA_AVANZADA")[0]
+    assert db_manager.obtener_expediente_por_link("USR", "ver_detalle.php?id=1", origen="BUSQUEDA_AVANZADA") == por_numero
+    assert db_manager.obtener_expediente_por_numero("USR", "1/2026") is None
+    assert db_manager.obtener_expediente_por_link("USR", "ver_detalle.php?id=2", origen="BUSQUEDA_AVANZADA") is None
+
@@ -1,7 +1,9 @@
 import pytest
+import requests
 from fases.fase_1 import ejecutar_fase_1_lista
 from fases.fase_2 import ejecutar_fase_2_movimientos
 from fases.fase_3 import ejecutar_fase_3_documentos
+from fases.fase_descarga_publica import ejecutar_fase_descarga_publica
 from fases.fase_unico import ejecutar_fase_unico
 
 def test_fase_1_exitoso(mocker):
@@ -58,7 +60,7 @@ def test_fase_3_documentos_exitoso(mocker):
 
 def test_fase_unico_exitoso(mocker):
     mocker.patch("session_manager.crear_sesion_con_cookies", return_value=mocker.Mock())
-    mocker.patch("db_manager.obtener_expedientes", return_value=[{"expediente": "111/2026", "caratula": "TEST", "link_detalle": "http"}])
+    mocker.patch("db_manager.obtener_expediente_por_numero", return_value={"expediente": "111/2026", "caratula": "TEST", "link_detalle": "http"})
     mocker.patch("scraper_tasks.raspar_movimientos_de_expediente", return_value=[{"tramite": "TEST", "link_escrito": "http://doc"}])
     mocker.patch("utils.obtener_ruta_usuario", return_value="/tmp/test")
     mocker.patch("utils.guardar_a_csv")
@@ -73,6 +75,82 @@ def test_fase_unico_exitoso(mocker):
 
 def test_fase_unico_no_encontrado(mocker):
     mocker.patch("session_manager.crear_sesion_con_cookies", return_value=mocker.Mock())
-    mocker.patch("db_manager.obtener_expedientes", return_value=[{"expediente": "OTRO"}])
+    mocker.patch("db_manager.obtener_expediente_por_numero", return_value=None)
     resultado = ejecutar_fase_unico({"cookie": "ok"}, "FALSO", "user")
-    assert "No se encontro" in resultado or "No se encontró" in resultado
\ No newline at end of file
+    assert "No se encontro" in resultado or "No se encontró" in resultado
+
+def test_fase_2_incremental_omite_expedientes_sin_cambios(mocker):
+    mocker.patch("config.FASE2_INCREMENTAL", True)
+    mocker.patch("session_manager.crear_sesion_con_cookies", return_value=mocker.Mock())
+    mocker.patch("db_manager.obtener_expedientes", return_value=[
+        {"id": 1, "expediente": "A", "fec_ult_mov": "01/01/2024", "fec_ult_mov_sincronizado": "01/01/2024", "movimientos_sincronizados": 3},
+        {"id": 2, "expediente": "B", "fec_ult_mov": "02/02/2024", "fec_ult_mov_sincronizado": "01/01/2024", "movimientos_sincronizados": 1},
+    ])
+    mocker.patch("db_manager.obtener_movimientos", return_value=[{"nombre_escrito": "viejo"}])
+    raspar = mocker.patch(
+        "scraper_tasks.raspar_movimientos_de_expediente",
+        side_effect=lambda session, exp, previos=None: [{"nombre_escrito": "nuevo"}] + (previos or []),
+    )
+    mocker.patch("utils.obtener_ruta_usuario", return_value="/tmp/test")
+    mocker.patch("utils.guardar_a_csv")
+    upsert = mocker.patch("db_manager.upsert_movimientos")
+    marcar = mocker.patch("db_manager.marcar_expediente_sincronizado")
+
+    ejecutar_fase_2_movimientos({"cookie": "ok"}, username="user")
+
+    raspar.assert_called_once()
+    assert raspar.call_args.args[1]["expediente"] == "B"
+    upsert.assert_called_once_with(2, [{"nombre_escrito": "nuevo"}, {"nombre_escrito": "viejo"}])
+    marcar.assert_called_once_with(2, "02/02/2024", 2)
+
+def test_fase_2_incremental_guarda_cambios_de_estado_sin_movimientos_nuevos(mocker):
+    mocker.patch("config.FASE2_INCREMENTAL", True)
+    mocker.patch("session_manager.crear_sesion_con_cookies", return_value=mocker.Mock())
+    mocker.patch("db_manager.obtener_expedientes", return_value=[
+        {"id": 2, "expediente": "B", "fec_ult_mov": "02/02/2024", "fec_ult_mov_sincronizado": "01/01/2024", "movimientos_sincronizados": 1},
+    ])
+    mocker.patch("db_manager.obtener_movimientos", return_value=[{"nombre_escrito": "viejo", "estado": "PENDIENTE"}])
+    mocker.patch("scraper_tasks.raspar_movimientos_de_expediente", return_value=[{"nombre_escrito": "viejo", "estado": "FIRMADO"}])
+    mocker.patch("utils.obtener_ruta_usuario", return_value="/tmp/test")
+    mocker.patch("utils.guardar_a_csv")
+    upsert = mocker.patch("db_manager.upsert_movimientos")
+    mocker.patch("db_manager.marcar_expediente_sincronizado")
+
+    ejecutar_fase_2_movimientos({"cookie": "ok"}, username="user")
+
+    upsert.assert_called_once_with(2, [{"nombre_escrito": "viejo", "estado": "FIRMADO"}])
+
+def test_fase_2_marca_historial_vacio_pero_no_un_fallo(mocker):
+    mocker.patch("config.FASE2_INCREMENTAL", True)
+    mocker.patch("session_manager.crear_sesion_con_cookies", return_value=mocker.Mock())
+    mocker.patch("db_manager.obtener_expedientes", return_value=[
+        {"id": 1, "expediente": "VACIO", "fec_ult_mov": "01/01/2024"},
+        {"id": 2, "expediente": "CAIDO", "fec_ult_mov": "02/02/2024"},
+    ])
+    mocker.patch(
+        "scraper_tasks.raspar_movimientos_de_expediente",
+        side_effect=lambda session, exp, previos=None: [] if exp["expediente"] == "VACIO" else None,
+    )
+    mocker.patch("utils.obtener_ruta_usuario", return_value="/tmp/test")
+    upsert = mocker.patch("db_manager.upsert_movimientos")
+    marcar = mocker.patch("db_manager.marcar_expediente_sincronizado")
+
+    ejecutar_fase_2_movimientos({"cookie": "ok"}, username="user")
+
+    upsert.assert_not_called()
+    marcar.assert_called_once_with(1, "01/01/2024", 0)
+
+def test_fase_descarga_publica_error_de_red_deja_pendiente(mocker):
+    sesion = mocker.Mock()
+    mocker.patch("session_manager.crear_sesion_con_cookies", return_value=sesion)
+    mocker.patch("utils.obtener_ruta_usuario", return_value="/tmp/test")
+    mocker.patch("db_manager.obtener_expediente_por_link", return_value={"id": 1, "expediente": "5/2024", "caratula": "X"})
+    mocker.patch("parsers.PaginaSiped", return_value=mocker.Mock(marco_superior=None, ajax_params={"exp_id": "9"}))
+    mocker.patch("scraper_tasks.raspar_paginas_movimientos", side_effect=requests.ConnectionError("caído"))
+    obtener = mocker.patch("db_manager.obtener_movimientos")
+    upsert = mocker.patch("db_manager.upsert_movimientos")
+
+    resultado = ejecutar_fase_descarga_publica({"cookie": "ok"}, "http://detalle", "user")
+    assert "No se pudieron obtener los movimientos" in resultado
+    obtener.assert_not_called()
+    upsert.assert_not_called()
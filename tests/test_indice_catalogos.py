@@ -0,0 +1,29 @@
+import indice_catalogos
+
+def test_buscar_abogados_por_prefijo_sin_distinguir_mayusculas_ni_tildes():
+    resultados = indice_catalogos.buscar_abogados("acev")
+    assert resultados and all("ACEVEDO" in texto for _, texto in resultados)
+    assert ("1466", indice_catalogos.ABOGADOS["1466"]) in resultados
+    assert indice_catalogos.buscar_abogados("ÁCEV") == resultados
+
+def test_buscar_abogados_exige_todos_los_prefijos_y_respeta_el_limite():
+    assert [c for c, _ in indice_catalogos.buscar_abogados("acevedo serg")] == ["1466"]
+    assert [c for c, _ in indice_catalogos.buscar_abogados("121899")] == ["1466"]
+    assert indice_catalogos.buscar_abogados("acevedo inexistentexyz") == []
+    assert indice_catalogos.buscar_abogados("   ") == []
+    assert len(indice_catalogos.buscar_abogados("a", limite=5)) == 5
+
+def test_etag_cambia_con_el_catalogo_y_las_variantes(mocker):
+    base = indice_catalogos.etag("abogados", "html")
+    assert base == indice_catalogos.etag("abogados", "html")
+    assert base != indice_catalogos.etag("abogados", "json")
+    assert base != indice_catalogos.etag("abogados", "html", "q=acev")
+    mocker.patch.dict(indice_catalogos._VERSIONES, {"abogados": "otra"})
+    assert base != indice_catalogos.etag("abogados", "html")
+
+def test_etag_cambia_con_la_plantilla(mocker, tmp_path):
+    base = indice_catalogos.etag("localidades", "html")
+    plantilla = tmp_path / "_fragmento_opciones.html"
+    plantilla.write_text("<option>{{ texto }}</option>")
+    mocker.patch("indice_catalogos._VERSION_PRESENTACION", indice_catalogos._huella_archivos((str(plantilla),)))
+    assert base != indice_catalogos.etag("localidades", "html")
@@ -0,0 +1,34 @@
+import redis
+import config
+import limitador
+
+def test_categoria_de_url_por_endpoint():
+    assert limitador.categoria_de_url(config.LISTA_EXPEDIENTES_URL) == "lista"
+    assert limitador.categoria_de_url(config.AJAX_MOVIMIENTOS_URL) == "movimientos"
+    assert limitador.categoria_de_url(f"{config.BASE_URL}/siped/agrega_plantilla/x.pdf") == "descargas"
+    assert limitador.categoria_de_url(f"{config.BASE_URL}/siped/frame_principal.php") == "general"
+    assert limitador.categoria_de_url("https://otro.host/submit.php") is None
+
+def test_adquirir_usa_espera_informada_por_redis(mocker):
+    lim = limitador.LimitadorTasa(limites={"lista": 2.0}, capacidad=1)
+    lim._cliente = mocker.Mock()
+    lim._script = mocker.Mock(return_value=b"0.5")
+    mock_sleep = mocker.patch("time.sleep")
+    assert lim.adquirir("lista") == 0.5
+    mock_sleep.assert_called_once_with(0.5)
+    assert lim._script.call_args.kwargs["keys"] == ["siped:limitador:lista"]
+
+def test_adquirir_degrada_a_cubeta_local_sin_redis(mocker):
+    lim = limitador.LimitadorTasa(limites={"general": 10.0}, capacidad=2)
+    lim._cliente = mocker.Mock()
+    lim._script = mocker.Mock(side_effect=redis.ConnectionError("caído"))
+    mock_sleep = mocker.patch("time.sleep")
+    assert lim.adquirir("general") == 0.0
+    assert lim.adquirir("general") == 0.0
+    assert lim.adquirir("general") > 0
+    assert mock_sleep.call_count == 1
+    assert lim._script.call_count == 1
+
+def test_adquirir_sin_categoria_no_limita(mocker):
+    lim = limitador.LimitadorTasa()
+    assert lim.adquirir(None) == 0.0
@@ -0,0 +1,45 @@
+from sqlalchemy import create_engine, inspect, text
+
+import migraciones
+
+def _base_anterior(ruta):
+    engine = create_engine(f"sqlite:///{ruta}")
+    with engine.begin() as conexion:
+        conexion.execute(text(
+            "CREATE TABLE expedientes (id INTEGER PRIMARY KEY, usuario_asignado VARCHAR(50) NOT NULL, "
+            "numero_expediente VARCHAR(50) NOT NULL, caratula VARCHAR(255) NOT NULL, fec_ult_mov VARCHAR(20), "
+            "link_detalle VARCHAR(255), origen VARCHAR(50))"
+        ))
+        conexion.execute(text("CREATE INDEX ix_expedientes_origen ON expedientes (origen)"))
+        conexion.execute(text(
+            "CREATE TABLE movimientos (id INTEGER PRIMARY KEY, expediente_id INTEGER NOT NULL, nombre_escrito VARCHAR(255))"
+        ))
+        conexion.execute(text(
+            "INSERT INTO expedientes (id, usuario_asignado, numero_expediente, caratula, origen) VALUES "
+            "(1, 'u', '1/2026', 'A', 'PRIVADO'), (2, 'u', '1/2026', 'A', 'PRIVADO'), (3, 'u', '2/2026', 'B', 'PRIVADO')"
+        ))
+        conexion.execute(text("INSERT INTO movimientos (expediente_id, nombre_escrito) VALUES (1, 'X'), (2, 'X'), (2, 'Y')"))
+    return engine
+
+def test_migraciones_actualizan_una_base_existente(tmp_path):
+    engine = _base_anterior(tmp_path / "siped.db")
+
+    assert migraciones.aplicar_migraciones(engine) == len(migraciones.MIGRACIONES)
+    assert migraciones.obtener_version(engine) == migraciones.MIGRACIONES[-1][0]
+
+    inspector = inspect(engine)
+    assert {"clave", "posicion"} <= {c["name"] for c in inspector.get_columns("movimientos")}
+    indices = {i["name"] for i in inspector.get_indexes("expedientes")}
+    assert {"uq_expedientes_usuario_numero_origen", "ix_expedientes_usuario_origen_link"} <= indices
+    assert not {"ix_expedientes_origen", "ix_expedientes_usuario_origen"} & indices
+    assert "ix_movimientos_expediente_posicion" in {i["name"] for i in inspector.get_indexes("movimientos")}
+
+    with engine.connect() as conexion:
+        assert conexion.execute(text("SELECT id FROM expedientes ORDER BY id")).scalars().all() == [1, 3]
+        # La copia se fusiona: su movimiento repetido se descarta y el faltante pasa al primero.
+        assert conexion.execute(text("SELECT expediente_id, nombre_escrito FROM movimientos ORDER BY id")).all() == [(1, "X"), (1, "Y")]
+
+def test_migraciones_no_se_reaplican(tmp_path):
+    engine = _base_anterior(tmp_path / "siped.db")
+    migraciones.aplicar_migraciones(engine)
+    assert migraciones.aplicar_migraciones(engine) == 0
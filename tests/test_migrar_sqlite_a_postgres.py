@@ -0,0 +1,58 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import base_datos
+import db_manager
+import migraciones
+from script import migrar_sqlite_a_postgres
+
+POSTGRES_URI = os.environ.get("SIPED_TEST_POSTGRES_URI")
+
+def _base_origen(tmp_path):
+    url = f"sqlite:///{tmp_path / 'siped.db'}"
+    engine = create_engine(url)
+    base_datos.Base.metadata.create_all(engine)
+    with engine.begin() as conexion:
+        conexion.execute(text("INSERT INTO expedientes (id, usuario_asignado, numero_expediente, caratula, origen) VALUES (7, 'u', '1/2026', 'A', 'PRIVADO'), (9, 'u', '2/2026', 'B', 'PRIVADO')"))
+        conexion.execute(text("INSERT INTO movimientos (id, expediente_id, nombre_escrito, clave, posicion) VALUES (3, 9, 'X', 'k', 0)"))
+    migraciones.aplicar_migraciones(engine)
+    engine.dispose()
+    return url
+
+def test_migrar_copia_conservando_ids_y_rechaza_destino_con_datos(tmp_path):
+    origen = _base_origen(tmp_path)
+    destino = f"sqlite:///{tmp_path / 'destino.db'}"
+
+    assert migrar_sqlite_a_postgres.migrar(origen, destino, tamano_lote=1) == {"expedientes": 2, "movimientos": 1}
+    with create_engine(destino).connect() as conexion:
+        assert conexion.execute(text("SELECT id FROM expedientes ORDER BY id")).scalars().all() == [7, 9]
+        assert conexion.execute(text("SELECT expediente_id FROM movimientos")).scalars().all() == [9]
+
+    with pytest.raises(ValueError):
+        migrar_sqlite_a_postgres.migrar(origen, destino)
+
+def test_migrar_no_modifica_un_origen_desactualizado(tmp_path):
+    ruta = tmp_path / "siped.db"
+    engine = create_engine(f"sqlite:///{ruta}")
+    base_datos.Base.metadata.create_all(engine)
+    engine.dispose()
+    contenido = ruta.read_bytes()
+
+    with pytest.raises(ValueError, match="versión de esquema 0"):
+        migrar_sqlite_a_postgres.migrar(f"sqlite:///{ruta}", f"sqlite:///{tmp_path / 'destino.db'}")
+    assert ruta.read_bytes() == contenido
+
+@pytest.mark.skipif(not POSTGRES_URI, reason="Defina SIPED_TEST_POSTGRES_URI para probar contra PostgreSQL.")
+def test_postgres_migracion_y_upsert_de_expedientes(tmp_path, apuntar_base_datos):
+    engine = create_engine(POSTGRES_URI)
+    with engine.begin() as conexion:
+        conexion.execute(text("DROP TABLE IF EXISTS movimientos, expedientes, esquema_version"))
+    migrar_sqlite_a_postgres.migrar(_base_origen(tmp_path), POSTGRES_URI)
+
+    apuntar_base_datos(POSTGRES_URI)
+    db_manager.upsert_expedientes("u", [{"expediente": "2/2026", "fec_ult_mov": "01/01/2026"}, {"expediente": "3/2026", "caratula": "C"}])
+    exp = db_manager.obtener_expediente_por_numero("u", "2/2026")
+    assert (exp["id"], exp["caratula"], exp["fec_ult_mov"]) == (9, "B", "01/01/2026")
+    assert db_manager.obtener_expediente_por_numero("u", "3/2026")["id"] == 10
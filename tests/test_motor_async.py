@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+import motor_async
+from planificador import PlanificadorHost
+
+def test_planificador_respeta_concurrencia_maxima():
+    planificador = PlanificadorHost(max_concurrencia=2, demora_cortesia=0)
+    activos, maximo = [0], [0]
+    lock = threading.Lock()
+
+    def peticion():
+        with planificador.turno("https://siped/x"):
+            with lock:
+                activos[0] += 1
+                maximo[0] = max(maximo[0], activos[0])
+            time.sleep(0.02)
+            with lock:
+                activos[0] -= 1
+
+    hilos = [threading.Thread(target=peticion) for _ in range(6)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    assert maximo[0] == 2
+
+def test_planificador_espacia_inicios_por_host():
+    planificador = PlanificadorHost(max_concurrencia=4, demora_cortesia=0.05)
+    inicio = time.monotonic()
+    for _ in range(3):
+        with planificador.turno("https://siped/x"):
+            pass
+    with planificador.turno("https://otro-host/x"):
+        pass
+    assert 0.1 <= time.monotonic() - inicio < 0.2
+
+def test_raspar_movimientos_en_lote_captura_errores(mocker):
+    def falso(session, expediente):
+        if expediente["expediente"] == "MALO":
+            raise ValueError("fallo")
+        return [{"expediente_nro": expediente["expediente"]}]
+
+    mocker.patch("scraper_tasks.raspar_movimientos_de_expediente", side_effect=falso)
+    expedientes = [{"expediente": "1"}, {"expediente": "MALO"}, {"expediente": "2"}]
+
+    async def recolectar():
+        return [r async for r in motor_async.raspar_movimientos_en_lote(None, expedientes)]
+
+    resultados = {e["expediente"]: (m, err) for e, m, err in asyncio.run(recolectar())}
+    assert resultados["1"][0] == [{"expediente_nro": "1"}]
+    assert isinstance(resultados["MALO"][1], ValueError)
+    assert resultados["2"][1] is None
@@ -4,6 +4,7 @@ import os
 import sys
 import pytest
 from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -27,6 +28,19 @@ def cargar_fixture(nombre_archivo):
         return f.read()
 
 
+def _pagina_lista(filas, inicio_siguiente, extra=""):
+    """Genera una página de la bandeja privada con la cantidad de filas indicada."""
+    cuerpo = "".join(
+        f"<tr><td><a href='ver_detalle.php?id={i}'>{i}/2024</a></td>"
+        "<td>C</td><td>P</td><td>E</td><td>F</td><td>L</td></tr>"
+        for i in range(filas)
+    )
+    return (
+        f"<table class='table-striped'>{cuerpo}</table>{extra}"
+        f"<a href='?inicio={inicio_siguiente}'>SIGUIENTE</a>"
+    )
+
+
 class TestParsersHtml:
     """Set de pruebas exhaustivas sobre los analizadores BeautifulSoup del sistema."""
 
@@ -58,4 +72,152 @@ class TestParsersHtml:
         """Verifica el procesamiento del DOM dinámico correspondiente a las actuaciones del expediente."""
         html_content = cargar_fixture("movimientos.html")
         movs = parsers.parsear_movimientos_de_ajax_html(html_content, "1001/2023")
-        assert isinstance(movs, list)
\ No newline at end of file
+        assert isinstance(movs, list)
+
+    def test_es_pagina_login(self):
+        """Distingue la redirección al login de las páginas con contenido válido."""
+        assert parsers.es_pagina_login(
+            '<meta http-equiv="refresh" content="0;url=../servicios/login.php">'
+        )
+        assert parsers.es_pagina_login('<input type="password" name="pass">')
+        assert parsers.es_pagina_login('<form method="post" action="/servicios/controli2.php"><input type="password" name="clave"></form>')
+        assert not parsers.es_pagina_login('<form action="cambiar_clave.php"><input type="password" name="clave_nueva"></form>')
+        assert not parsers.es_pagina_login('<input type="password" name="password_firma">')
+        assert not parsers.es_pagina_login(cargar_fixture("movimientos.html"))
+        assert not parsers.es_pagina_login(cargar_fixture("meta_refresh.html"))
+
+    def test_detectar_paginacion_por_total_de_registros(self):
+        """Deduce el último inicio a partir del total de registros informado."""
+        html = _pagina_lista(10, 10, "<p>Mostrando 1 a 10 de 95 registros</p>")
+        assert parsers.detectar_paginacion(html, 0, 10) == (10, 90)
+
+    def test_detectar_paginacion_por_enlaces_numerados(self):
+        """Sin total, toma el mayor enlace numerado de la paginación."""
+        enlaces = "".join(f"<a href='?inicio={i}'>{i // 10 + 1}</a>" for i in (10, 20, 30))
+        assert parsers.detectar_paginacion(_pagina_lista(10, 10, enlaces), 0, 10) == (10, 30)
+
+    def test_detectar_paginacion_ambigua(self):
+        """Descarta estructuras que no permiten paginar en paralelo con seguridad."""
+        # Solo el botón SIGUIENTE: no se conoce el total.
+        assert parsers.detectar_paginacion(_pagina_lista(10, 10), 0, 10) is None
+        # El paso no coincide con las filas de la página.
+        html = _pagina_lista(8, 10, "<p>de 95 registros</p>")
+        assert parsers.detectar_paginacion(html, 0, 8) is None
+
+
+MOTORES_DISPONIBLES = [
+    motor
+    for motor in ("html.parser", "lxml")
+    if builder_registry.lookup(motor) is not None
+]
+
+CASOS_EQUIVALENCIA = [
+    ("lista_expedientes.html", parsers.parsear_lista_expedientes),
+    ("lista_publica.html", parsers.parsear_lista_publica),
+    ("documento.html", parsers.parsear_pagina_documento),
+    ("detalle.html", parsers.parsear_detalle_para_ajax_params),
+    ("movimientos.html", lambda html: parsers.parsear_movimientos_de_ajax_html(html, "1001/2023")),
+    ("lista_publica.html", parsers.encontrar_siguiente_inicio_universal),
+]
+
+
+@pytest.mark.parametrize("motor", MOTORES_DISPONIBLES)
+@pytest.mark.parametrize("fixture, funcion", CASOS_EQUIVALENCIA)
+def test_motores_de_parsing_equivalentes(monkeypatch, motor, fixture, funcion):
+    """Cada motor configurable produce exactamente los mismos datos que html.parser."""
+    html_content = cargar_fixture(fixture)
+    monkeypatch.setattr(config, "PARSER_HTML", "html.parser")
+    esperado = funcion(html_content)
+    assert esperado
+
+    monkeypatch.setattr(config, "PARSER_HTML", motor)
+    assert funcion(html_content) == esperado
+
+
+def test_motor_no_instalado_usa_html_parser(monkeypatch):
+    """Un motor inexistente no interrumpe el scraping."""
+    monkeypatch.setattr(config, "PARSER_HTML", "motor-inexistente")
+    assert parsers.crear_soup("<p>x</p>").builder.NAME == "html.parser"
+
+
+def test_pagina_siped_analiza_una_sola_vez(mocker):
+    """Filas y paginación se obtienen del mismo árbol DOM."""
+    espia = mocker.spy(parsers, "crear_soup")
+    pagina = parsers.PaginaSiped(cargar_fixture("lista_expedientes.html"))
+
+    assert len(pagina.expedientes) == 2
+    assert pagina.siguiente_inicio == 10
+    assert pagina.paginacion(0) is None
+    assert espia.call_count == 1
+
+
+@pytest.mark.parametrize("motor", MOTORES_DISPONIBLES)
+def test_regiones_equivalen_al_arbol_completo(monkeypatch, motor):
+    """Analizar solo la región necesaria no altera los datos extraídos."""
+    monkeypatch.setattr(config, "PARSER_HTML", motor)
+    movimientos = cargar_fixture("movimientos.html")
+    detalle = cargar_fixture("detalle.html")
+
+    assert parsers.parsear_movimientos_de_ajax_html(
+        movimientos, "1001/2023"
+    ) == parsers.parsear_movimientos_de_ajax_html(
+        parsers.crear_soup(movimientos), "1001/2023"
+    )
+    assert parsers.parsear_detalle_para_ajax_params(
+        detalle
+    ) == parsers.parsear_detalle_para_ajax_params(parsers.crear_soup(detalle))
+
+    soup = parsers.crear_soup(detalle, parsers.REGION_PARAMETROS)
+    assert soup.find("table") is None
+
+
+VARIANTES_META_REFRESH = [
+    cargar_fixture("meta_refresh.html"),
+    '<META CONTENT="0;URL=../siped/frame_principal.php?a=1&amp;b=2" HTTP-EQUIV="Refresh">',
+    "<meta http-equiv=refresh content='2; url=inicio.php'>",
+    '<!-- <meta http-equiv="refresh" content="0;url=viejo.php"> --><p>Sin redirección</p>',
+]
+
+VARIANTES_MENU = [
+    '<a href="menu.php">Menú</a><a href="../siped/index.php?token=ab12&amp;x=1">SIPED</a>',
+    "<A HREF='/SIPED/entrada.php?TOKEN=zz'>Ingresar</A>",
+    '<a href="otro.php?token=1">Otro sistema</a>',
+]
+
+VARIANTES_DETALLE = [
+    cargar_fixture("detalle.html"),
+    '<input value="77" name="exp_id"><script>x="tj_fuero=1&dependencia_ide=2";</script>',
+    '<!-- <input name="id" value="1"> --><input name="id" value="2">'
+    "<script>a='exp_organismo_origen=5'</script><script>b='dependencia_ide=9'</script>",
+]
+
+
+@pytest.mark.parametrize("html_content", VARIANTES_META_REFRESH)
+def test_escaneo_meta_refresh_coincide_con_dom(html_content):
+    """El camino rápido devuelve lo mismo que BeautifulSoup o cede al DOM."""
+    rapido = parsers._escanear_meta_refresh(html_content, "http://base.com/servicios")
+    dom = parsers._meta_refresh_dom(html_content, "http://base.com/servicios")
+    assert rapido == dom
+    assert parsers.obtener_url_meta_refresh(html_content, "http://base.com/servicios") == dom
+
+
+@pytest.mark.parametrize("html_content", VARIANTES_MENU)
+def test_escaneo_enlace_token_coincide_con_dom(html_content):
+    """El enlace con token se identifica igual con el escaneo y con el DOM."""
+    assert parsers._escanear_enlace_token(html_content) == parsers._enlace_token_dom(html_content)
+
+
+@pytest.mark.parametrize("html_content", VARIANTES_DETALLE)
+def test_escaneo_parametros_ajax_coincide_con_dom(html_content):
+    """Los parámetros AJAX del escaneo coinciden con los del árbol completo."""
+    assert parsers._escanear_parametros_ajax(html_content) == parsers.parsear_detalle_para_ajax_params(
+        parsers.crear_soup(html_content)
+    )
+
+
+def test_parametros_ajax_completos_no_construyen_dom(mocker):
+    """Cuando el escaneo encuentra todos los parámetros no se analiza el DOM."""
+    espia = mocker.spy(parsers, "crear_soup")
+    params = parsers.parsear_detalle_para_ajax_params(cargar_fixture("detalle.html"))
+    assert params["exp_id"] == "123456"
+    espia.assert_not_called()
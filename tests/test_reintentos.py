@@ -0,0 +1,63 @@
+import io
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+import limitador
+import reintentos
+import session_manager
+
+def _respuesta(estado, cabeceras=None):
+    r = requests.Response()
+    r.status_code = estado
+    r.raw = io.BytesIO(b"")
+    r.headers.update(cabeceras or {})
+    return r
+
+@pytest.fixture
+def adaptador(mocker):
+    mocker.patch("time.sleep")
+    adaptador = session_manager.AdaptadorSiped()
+    adaptador.limitador = mocker.Mock()
+    return adaptador
+
+def test_espera_respeta_retry_after():
+    politica = reintentos.PoliticaReintentos(espera_maxima=30)
+    assert politica.espera(0, _respuesta(503, {"Retry-After": "7"})) == 7.0
+    assert politica.espera(0, _respuesta(503, {"Retry-After": "600"})) == 30
+
+def test_espera_backoff_exponencial_con_jitter():
+    politica = reintentos.PoliticaReintentos(backoff_base=1, espera_maxima=60)
+    for intento in range(4):
+        assert 2**intento / 2 <= politica.espera(intento) <= 2**intento
+
+def test_adaptador_reintenta_502_y_devuelve_respuesta_valida(adaptador, mocker):
+    mock_send = mocker.patch.object(
+        HTTPAdapter, "send", side_effect=[_respuesta(502), _respuesta(200)]
+    )
+    request = requests.Request("GET", config.LISTA_EXPEDIENTES_URL).prepare()
+    assert adaptador.send(request).status_code == 200
+    assert mock_send.call_count == 2
+
+def test_adaptador_no_reintenta_post(adaptador, mocker):
+    mocker.patch.object(HTTPAdapter, "send", side_effect=requests.ConnectionError("caído"))
+    request = requests.Request("POST", config.LOGIN_URL).prepare()
+    with pytest.raises(requests.ConnectionError):
+        adaptador.send(request)
+
+def test_adaptador_agota_reintentos(adaptador, mocker):
+    adaptador.politica_reintentos = reintentos.PoliticaReintentos(maximo=2)
+    mock_send = mocker.patch.object(HTTPAdapter, "send", return_value=_respuesta(503))
+    request = requests.Request("GET", config.AJAX_MOVIMIENTOS_URL).prepare()
+    assert adaptador.send(request).status_code == 503
+    assert mock_send.call_count == 3
+
+def test_pacer_aimd_sube_aditivo_y_baja_multiplicativo():
+    pacer = limitador.PacerAIMD(latencia_objetivo=1, tasa_minima=1, tasa_maxima=8)
+    pacer.registrar(3.0)
+    assert pacer.tasa == 4
+    pacer.registrar(0.2, sobrecarga=True)
+    assert pacer.tasa == 2
+    pacer.registrar(0.2)
+    assert pacer.tasa == 2.5
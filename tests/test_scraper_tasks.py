@@ -21,12 +21,12 @@ def test_raspar_lista_excepciones_red(mocker):
 def test_raspar_movimientos_sin_link(mocker):
     mock_session = mocker.Mock()
     # Expediente no tiene "link_detalle"
-    assert scraper_tasks.raspar_movimientos_de_expediente(mock_session, {"expediente": "123"}) == []
+    assert scraper_tasks.raspar_movimientos_de_expediente(mock_session, {"expediente": "123"}) is None
 
 def test_raspar_movimientos_falla_frameset(mocker):
     mock_session = mocker.Mock()
     mock_session.get.side_effect = requests.exceptions.RequestException("Fallo en frameset")
-    assert scraper_tasks.raspar_movimientos_de_expediente(mock_session, {"link_detalle": "http://x"}) == []
+    assert scraper_tasks.raspar_movimientos_de_expediente(mock_session, {"link_detalle": "http://x"}) is None
 
 def test_raspar_contenido_doc_invalido(mocker):
     mock_session = mocker.Mock()
@@ -60,3 +60,98 @@ def test_raspar_busqueda_parametrizada_prevencion_bucle_infinito(mocker):
     # Por tanto solo debe haber 1 resultado en lugar de quedarse congelado
     assert len(res) == 1
     assert res[0]["expediente"] == "EXP-BUCLE"
+
+def test_raspar_lista_descarga_paginas_restantes_en_paralelo(mocker):
+    mock_session = mocker.Mock()
+    mock_session.get.return_value.text = "<html></html>"
+    mocker.patch("scraper_tasks.parsers.parsear_lista_expedientes", return_value=[{"expediente": "x"}] * 10)
+    mocker.patch("scraper_tasks.parsers.detectar_paginacion", return_value=(10, 30))
+    mocker.patch("scraper_tasks.parsers.encontrar_siguiente_inicio_universal", side_effect=[10, None])
+
+    async def paginas(session, url, lista_params):
+        assert lista_params == [{"inicio": 10}, {"inicio": 20}, {"inicio": 30}]
+        return [("<html></html>", None)] * 3
+
+    mocker.patch("motor_async.obtener_paginas", side_effect=paginas)
+
+    assert len(scraper_tasks.raspar_lista_expedientes(mock_session)) == 40
+    mock_session.get.assert_called_once()
+
+def test_raspar_paginas_movimientos_ventana_especulativa(mocker):
+    mock_session = mocker.Mock()
+
+    def respuesta(url, params, timeout):
+        r = mocker.Mock()
+        r.text = f"<table><tr><td>pagina-{params['numerodemas']}</td></tr></table>".ljust(300) if params["numerodemas"] <= 3 else ""
+        assert params["offset"] == (params["numerodemas"] - 1) * 10
+        return r
+
+    mock_session.get.side_effect = respuesta
+    mocker.patch(
+        "scraper_tasks.parsers.parsear_movimientos_de_ajax_html",
+        side_effect=lambda soup, nro: [{"pagina": soup.get_text().strip()}],
+    )
+
+    movimientos = scraper_tasks.raspar_paginas_movimientos(mock_session, {"exp_id": "1"}, "1/2024", ventana=3)
+
+    assert [m["pagina"] for m in movimientos] == ["pagina-1", "pagina-2", "pagina-3"]
+    assert mock_session.get.call_count <= 6
+
+def _tabla_movimientos(ids):
+    filas = "".join(
+        f'<tr><td>{i}</td><td><form action="ver_escrito.php?id={i}"><input type="submit" value="ESCRITO {i}" /></form></td>'
+        "<td>01/01/2024</td><td>DESPACHO</td><td>PUBLICA</td><td>JUEZ</td><td>texto</td></tr>"
+        for i in ids
+    )
+    return f'<table class="table-hover"><tr><th>...</th></tr>{filas}</table>'
+
+def test_raspar_movimientos_incremental_se_detiene_en_el_primero_conocido(mocker):
+    historial = list(range(25, 0, -1))
+    mocker.patch(
+        "scraper_tasks.cache_http.obtener_texto",
+        side_effect=[
+            '<frameset><frame name="sup" src="detalle_sup.php?id=7" /></frameset>',
+            '<input name="id" value="7" /><script>$.get("x.php?dependencia_ide=1&tj_fuero=2&exp_organismo_origen=3");</script>',
+        ],
+    )
+    mock_session = mocker.Mock()
+
+    def respuesta(url, params, timeout):
+        r = mocker.Mock()
+        r.text = _tabla_movimientos(historial[params["offset"]:params["offset"] + 10])
+        return r
+
+    mock_session.get.side_effect = respuesta
+    previos = scraper_tasks.parsers.parsear_movimientos_de_ajax_html(_tabla_movimientos(historial[5:]), "1/2024")
+
+    movimientos = scraper_tasks.raspar_movimientos_de_expediente(
+        mock_session, {"expediente": "1/2024", "link_detalle": "http://siped/ver_detalle.php?id=7"}, previos
+    )
+
+    assert [m["nombre_escrito"] for m in movimientos[:6]] == [f"ESCRITO {i}" for i in (25, 24, 23, 22, 21, 20)]
+    assert len(movimientos) == 25
+    mock_session.get.assert_called_once()
+
+def test_raspar_movimientos_incremental_actualiza_los_conocidos_de_la_pagina(mocker):
+    historial = list(range(25, 0, -1))
+    mocker.patch(
+        "scraper_tasks.cache_http.obtener_texto",
+        side_effect=[
+            '<frameset><frame name="sup" src="detalle_sup.php?id=7" /></frameset>',
+            '<input name="id" value="7" /><script>$.get("x.php?dependencia_ide=1&tj_fuero=2&exp_organismo_origen=3");</script>',
+        ],
+    )
+    mock_session = mocker.Mock()
+    mock_session.get.return_value.text = _tabla_movimientos(historial[:10])
+    previos = scraper_tasks.parsers.parsear_movimientos_de_ajax_html(_tabla_movimientos(historial[5:]), "1/2024")
+    for previo in previos:
+        previo["estado"] = "PENDIENTE"
+
+    movimientos = scraper_tasks.raspar_movimientos_de_expediente(
+        mock_session, {"expediente": "1/2024", "link_detalle": "http://siped/ver_detalle.php?id=7"}, previos
+    )
+
+    assert len(movimientos) == 25
+    # Los conocidos de la página descargada (20 a 16) traen el estado actual de SIPED.
+    assert [m["estado"] for m in movimientos[5:10]] == ["PUBLICA"] * 5
+    assert [m["estado"] for m in movimientos[10:]] == ["PENDIENTE"] * 15
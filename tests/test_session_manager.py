@@ -1,3 +1,4 @@
+import threading
 import pytest
 import requests
 import session_manager
@@ -44,3 +45,81 @@ def test_crear_sesion_sin_cookies():
     s = session_manager.crear_sesion_con_cookies(None)
     assert isinstance(s, requests.Session)
     assert len(s.cookies) == 0
+
+def test_sesiones_comparten_pool_de_conexiones():
+    s1 = session_manager.crear_sesion_con_cookies({"a": "1"})
+    s2 = session_manager.crear_sesion_con_cookies({"b": "2"})
+    assert s1.get_adapter("https://intranet") is s2.get_adapter("https://intranet")
+    assert s1.cookies.get("b") is None
+
+def test_cerrar_sesion_no_cierra_pool_compartido(mocker):
+    adaptador = session_manager.obtener_adaptador_compartido()
+    mock_close = mocker.patch.object(adaptador, "close")
+    session_manager.crear_sesion_con_cookies(None).close()
+    mock_close.assert_not_called()
+
+def _respuesta_html(texto, url="https://intranet.jussantacruz.gob.ar/siped/lista.php"):
+    r = requests.Response()
+    r.status_code = 200
+    r.url = url
+    r.headers["Content-Type"] = "text/html"
+    r._content = texto.encode("utf-8")
+    return r
+
+PAGINA_LOGIN = '<form action="login.php"><input type="password" name="pass"></form>'
+
+def test_sesion_expirada_se_renueva_y_repite_la_peticion(mocker):
+    mock_request = mocker.patch(
+        "requests.Session.request",
+        side_effect=[_respuesta_html(PAGINA_LOGIN), _respuesta_html("<table></table>")],
+    )
+    mocker.patch("session_manager.renovar_cookies", return_value={"PHPSESSID": "nueva"})
+
+    s = session_manager.crear_sesion_con_cookies({"PHPSESSID": "vieja"}, "usr")
+    r = s.get("https://intranet.jussantacruz.gob.ar/siped/lista.php")
+
+    assert r.text == "<table></table>"
+    assert mock_request.call_count == 2
+    assert s.cookies.get("PHPSESSID") == "nueva"
+
+def test_sesion_expirada_sin_renovacion_lanza_error(mocker):
+    mocker.patch("requests.Session.request", return_value=_respuesta_html(PAGINA_LOGIN))
+    mock_renovar = mocker.patch("session_manager.renovar_cookies", return_value=None)
+
+    s = session_manager.crear_sesion_con_cookies({"PHPSESSID": "vieja"}, "usr")
+    for _ in range(2):
+        with pytest.raises(session_manager.SesionExpiradaError):
+            s.get("https://intranet.jussantacruz.gob.ar/siped/lista.php")
+    mock_renovar.assert_called_once()
+
+def test_sesion_sin_usuario_no_intenta_renovar(mocker):
+    mocker.patch("requests.Session.request", return_value=_respuesta_html(PAGINA_LOGIN))
+    mock_renovar = mocker.patch("session_manager.renovar_cookies")
+
+    s = session_manager.crear_sesion_con_cookies({"PHPSESSID": "vieja"})
+    s.get("https://intranet.jussantacruz.gob.ar/siped/lista.php")
+    mock_renovar.assert_not_called()
+
+def test_hilos_que_comparten_la_sesion_la_renuevan_una_sola_vez(mocker):
+    barrera = threading.Barrier(4)
+    hilo = threading.local()
+
+    def responder(*args, **kwargs):
+        if getattr(hilo, "renovado", False):
+            return _respuesta_html("<table></table>")
+        hilo.renovado = True
+        barrera.wait(timeout=5)
+        return _respuesta_html(PAGINA_LOGIN)
+
+    mocker.patch("requests.Session.request", side_effect=responder)
+    mock_renovar = mocker.patch("session_manager.renovar_cookies", return_value={"PHPSESSID": "nueva"})
+    s = session_manager.crear_sesion_con_cookies({"PHPSESSID": "vieja"}, "usr")
+
+    textos = []
+    hilos = [threading.Thread(target=lambda: textos.append(s.get("https://intranet.jussantacruz.gob.ar/siped/lista.php").text)) for _ in range(4)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    assert textos == ["<table></table>"] * 4
+    mock_renovar.assert_called_once()
@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+import config
+import parsers
+import scraper_tasks
+import session_manager
+from script import simulador_siped
+
+_URLS_CONFIG = ("BASE_URL", "LOGIN_URL", "LISTA_EXPEDIENTES_URL", "AJAX_MOVIMIENTOS_URL", "VERIFICACION_SESION_URL")
+
+@pytest.fixture
+def simulador(monkeypatch):
+    """Levanta el simulador en un puerto libre y apunta la configuración hacia él."""
+    for nombre in _URLS_CONFIG:
+        monkeypatch.setattr(config, nombre, getattr(config, nombre))
+    estado = simulador_siped.EstadoSimulador(expedientes=25, movimientos=12, kb_por_pdf=1)
+    servidor = make_server("127.0.0.1", 0, simulador_siped.crear_app(estado), threaded=True)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    simulador_siped.apuntar_configuracion(f"http://127.0.0.1:{servidor.server_port}")
+    yield estado
+    servidor.shutdown()
+
+def test_recorrido_de_punta_a_punta(simulador, tmp_path):
+    cookies = session_manager.autenticar_en_siped("usuario", "clave")
+    assert cookies
+    session = session_manager.crear_sesion_con_cookies(cookies, "usuario")
+
+    expedientes = scraper_tasks.raspar_lista_expedientes(session)
+    assert len({e["expediente"] for e in expedientes}) == 25
+
+    movimientos = scraper_tasks.raspar_movimientos_de_expediente(session, expedientes[0])
+    assert len(movimientos) == 12
+
+    documento = scraper_tasks.raspar_contenido_documento(session, movimientos[0]["link_escrito"])
+    ruta_pdf = str(tmp_path / "escrito.pdf")
+    assert scraper_tasks.descargar_archivo(session, documento["url_pdf_principal"], ruta_pdf)
+    with open(ruta_pdf, "rb") as f:
+        assert f.read(4) == b"%PDF"
+
+def test_sesion_vencida_devuelve_el_login():
+    estado = simulador_siped.EstadoSimulador(duracion_sesion=0)
+    cliente = simulador_siped.crear_app(estado).test_client()
+    cliente.post("/servicios/controli2.php", data={"usuario": "u", "pass": "p"})
+
+    respuesta = cliente.get(f"{simulador_siped.RUTA_BUSCAR}/submit_buscar_abogado.php")
+    assert parsers.es_pagina_login(respuesta.get_data(as_text=True))
+
+def test_tasa_de_errores_responde_503_con_retry_after():
+    cliente = simulador_siped.crear_app(simulador_siped.EstadoSimulador(tasa_errores=1)).test_client()
+    respuesta = cliente.get("/siped/frame_principal.php")
+    assert respuesta.status_code == 503
+    assert respuesta.headers["Retry-After"] == "1"
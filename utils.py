@@ -2,6 +2,7 @@
 
 import csv
 import functools
+import hashlib
 import os
 import re
 import time
@@ -107,6 +108,34 @@ def guardar_a_csv(
         logger.error("Error al guardar CSV: %s", e)
 
 
+_CAMPOS_CLAVE_MOVIMIENTO = (
+    "fecha_presentacion",
+    "nombre_escrito",
+    "tipo",
+    "generado_por",
+    "link_escrito",
+)
+
+
+def generar_clave_movimiento(movimiento: Dict[str, Any]) -> str:
+    """
+    Calcula una clave estable que identifica a un movimiento entre sincronizaciones.
+
+    Solo intervienen los campos que SIPED no modifica una vez publicado el escrito,
+    de modo que el mismo movimiento conserva su clave aunque cambie su estado.
+
+    Args:
+        movimiento: Diccionario con los datos del movimiento.
+
+    Returns:
+        Hash hexadecimal de los campos identificatorios.
+    """
+    partes = (
+        str(movimiento.get(campo) or "").strip() for campo in _CAMPOS_CLAVE_MOVIMIENTO
+    )
+    return hashlib.sha1("\x1f".join(partes).encode("utf-8")).hexdigest()
+
+
 def leer_csv_a_diccionario(filepath: str) -> Optional[List[Dict[str, str]]]:
     """
     Lee un archivo CSV y retorna su contenido.
@@ -185,7 +214,9 @@ def manejar_fase_con_sesion(nombre_fase: str) -> Callable:
         def wrapper(cookies: dict, *args: Any, **kwargs: Any) -> Any:
             logger.info("--- INICIANDO %s ---", nombre_fase)
             try:
-                session = session_manager.crear_sesion_con_cookies(cookies)
+                session = session_manager.crear_sesion_con_cookies(
+                    cookies, kwargs.get("username")
+                )
                 mensaje = funcion_nucleo(session, *args, **kwargs)
                 logger.info(mensaje)
                 return mensaje